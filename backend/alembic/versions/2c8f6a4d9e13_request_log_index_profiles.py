@@ -0,0 +1,87 @@
+"""request_logs index profiles
+
+Revision ID: 2c8f6a4d9e13
+Revises: 7b3e0d91c4a6
+Create Date: 2026-10-18 18:05:44.671203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+
+from backend.app.database.indexes import IndexSpec, apply_index_profile
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2c8f6a4d9e13"
+down_revision: Union[str, None] = "7b3e0d91c4a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One index per column, before the profiles
+LEGACY_INDEXES = [
+    IndexSpec("ix_request_logs_relo_id", ("relo_id",)),
+    IndexSpec("ix_request_logs_relo_inserted_at", ("relo_inserted_at",)),
+    IndexSpec("ix_request_logs_relo_method", ("relo_method",)),
+    IndexSpec("ix_request_logs_relo_url", ("relo_url",)),
+    IndexSpec("ix_request_logs_relo_status_code", ("relo_status_code",)),
+    IndexSpec("ix_request_logs_relo_ip_address", ("relo_ip_address",)),
+    IndexSpec("ix_request_logs_relo_response_size", ("relo_response_size",)),
+    IndexSpec(
+        "ix_request_logs_latency",
+        ("relo_inserted_at",),
+        include=("relo_route", "relo_request_duration_seconds"),
+    ),
+]
+
+
+# The profiles as of this revision, on the relo_route template column
+INDEX_PROFILES = {
+    "ingest": [
+        IndexSpec("ix_request_logs_inserted_at_brin", ("relo_inserted_at",), "brin"),
+    ],
+    "query": [
+        IndexSpec(
+            "ix_request_logs_latency",
+            ("relo_inserted_at",),
+            include=("relo_route", "relo_request_duration_seconds"),
+        ),
+        IndexSpec(
+            "ix_request_logs_route_inserted_at", ("relo_route", "relo_inserted_at")
+        ),
+        IndexSpec(
+            "ix_request_logs_status_inserted_at",
+            ("relo_status_code", "relo_inserted_at"),
+        ),
+        IndexSpec(
+            "ix_request_logs_ip_inserted_at", ("relo_ip_address", "relo_inserted_at")
+        ),
+    ],
+}
+
+
+def index_profile() -> str:
+    # alembic -x index_profile=ingest upgrade head; the "custom" profile is
+    # applied after the migrations: python -m backend.app.database.indexes custom
+    profile = context.get_x_argument(as_dictionary=True).get("index_profile", "query")
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Invalid index profile for the migrations: {profile}")
+    return profile
+
+
+def upgrade() -> None:
+    # Later switches do not need a migration:
+    # python -m backend.app.database.indexes <profile>
+    with op.get_context().autocommit_block():
+        print(
+            apply_index_profile(
+                op.get_bind(), "request_logs", INDEX_PROFILES[index_profile()]
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        print(apply_index_profile(op.get_bind(), "request_logs", LEGACY_INDEXES))
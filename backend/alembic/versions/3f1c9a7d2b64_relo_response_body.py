@@ -0,0 +1,29 @@
+"""relo_response_body
+
+Revision ID: 3f1c9a7d2b64
+Revises: 57ccd08e7414
+Create Date: 2026-10-18 09:12:41.208311
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7d2b64"
+down_revision: Union[str, None] = "57ccd08e7414"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "request_logs", sa.Column("relo_response_body", sa.String(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("request_logs", "relo_response_body")
@@ -0,0 +1,54 @@
+"""storage_snapshots
+
+Revision ID: 4e8b2c6f0a71
+Revises: 7c3e1f8a9d24
+Create Date: 2026-10-18 22:17:36.094512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8b2c6f0a71"
+down_revision: Union[str, None] = "7c3e1f8a9d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "storage_snapshots",
+        sa.Column("stsn_id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("stsn_taken_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("stsn_table", sa.String(), nullable=False),
+        sa.Column("stsn_relation", sa.String(), nullable=False),
+        sa.Column("stsn_table_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("stsn_indexes_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("stsn_toast_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("stsn_live_tuples", sa.BigInteger(), nullable=False),
+        sa.Column("stsn_dead_tuples", sa.BigInteger(), nullable=False),
+        sa.Column("stsn_dead_ratio", sa.Float(), nullable=False),
+        sa.Column("stsn_modified_since_analyze", sa.BigInteger(), nullable=False),
+        sa.Column("stsn_last_vacuum", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("stsn_last_analyze", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("stsn_action", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("stsn_id"),
+    )
+    op.create_index(
+        "ix_storage_snapshots_table_taken_at",
+        "storage_snapshots",
+        ["stsn_table", "stsn_taken_at"],
+    )
+    op.create_index(
+        "ix_storage_snapshots_taken_at", "storage_snapshots", ["stsn_taken_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_storage_snapshots_taken_at", table_name="storage_snapshots")
+    op.drop_index("ix_storage_snapshots_table_taken_at", table_name="storage_snapshots")
+    op.drop_table("storage_snapshots")
@@ -0,0 +1,42 @@
+"""request_stats
+
+Revision ID: 5a7c2e9f1b38
+Revises: e83b5f1a2c47
+Create Date: 2026-10-18 18:26:41.207395
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5a7c2e9f1b38"
+down_revision: Union[str, None] = "e83b5f1a2c47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "request_stats",
+        sa.Column("rsta_id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("rsta_bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("rsta_node", sa.String(), nullable=False),
+        sa.Column("rsta_route_id", sa.SmallInteger(), nullable=False),
+        sa.Column("rsta_status_code", sa.SmallInteger(), nullable=False),
+        sa.Column("rsta_count", sa.BigInteger(), nullable=False),
+        sa.Column("rsta_duration_sum", sa.Float(), nullable=False),
+        sa.Column("rsta_duration_max", sa.Float(), nullable=False),
+        sa.Column("rsta_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("rsta_sketch", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("rsta_id"),
+    )
+    op.create_index("ix_request_stats_bucket", "request_stats", ["rsta_bucket"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_request_stats_bucket", table_name="request_stats")
+    op.drop_table("request_stats")
@@ -0,0 +1,235 @@
+"""partition request_logs by range on relo_inserted_at
+
+Revision ID: 7b3e0d91c4a6
+Revises: f4a19c2e7d50
+Create Date: 2026-10-18 16:40:12.305918
+
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import Connection, text
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b3e0d91c4a6"
+down_revision: Union[str, None] = "f4a19c2e7d50"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Indexes of the partitioned table, created on every partition
+INDEXES = {
+    "ix_request_logs_relo_id": "(relo_id)",
+    "ix_request_logs_relo_inserted_at": "(relo_inserted_at)",
+    "ix_request_logs_relo_method": "(relo_method)",
+    "ix_request_logs_relo_url": "(relo_url)",
+    "ix_request_logs_relo_status_code": "(relo_status_code)",
+    "ix_request_logs_relo_ip_address": "(relo_ip_address)",
+    "ix_request_logs_relo_response_size": "(relo_response_size)",
+    "ix_request_logs_latency": (
+        "(relo_inserted_at) INCLUDE (relo_route, relo_request_duration_seconds)"
+    ),
+}
+
+# Rows of the NULL insertion time backfill per transaction
+BACKFILL_BATCH_SIZE = 10000
+
+REQUEST_LOG_HEADERS_VIEW = """
+CREATE OR REPLACE VIEW request_log_headers AS
+SELECT
+    r.relo_id,
+    r.relo_inserted_at,
+    COALESCE(h.hese_headers, '{}'::jsonb)
+        || COALESCE(r.relo_headers, '{}'::jsonb) AS relo_headers
+FROM request_logs r
+LEFT JOIN request_header_sets h ON h.hese_hash = r.relo_headers_hash
+"""
+
+
+def upgrade() -> None:
+    """
+    Convert request_logs online: the existing table becomes the partition of
+    everything before `boundary`, and new rows go to the partitions the
+    maintenance task creates from there on.
+
+    Everything that scans or rewrites the table runs first, in short
+    transactions or concurrently, without blocking writes: the NULL
+    insertion time backfill, the validation of the partition range, and
+    the build of the primary key and the indexes the partition will need.
+    The swap then only takes short metadata locks: ATTACH PARTITION reuses
+    the indexes and constraints that match those of the partitioned table.
+    """
+    # Far enough ahead that no row reaches the boundary before the swap
+    boundary = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+
+        # Enforced on new rows at once, so that the backfill below is final.
+        # A validated CHECK lets SET NOT NULL and ATTACH PARTITION skip their
+        # full table scans under an exclusive lock
+        op.execute(
+            "ALTER TABLE request_logs ADD CONSTRAINT request_logs_legacy_range "
+            "CHECK (relo_inserted_at IS NOT NULL "
+            f"AND relo_inserted_at < '{boundary.isoformat()}') NOT VALID"
+        )
+
+        # The partition key cannot be NULL
+        updated = BACKFILL_BATCH_SIZE
+        while updated == BACKFILL_BATCH_SIZE:
+            updated = connection.execute(
+                text(
+                    """
+                    UPDATE request_logs SET relo_inserted_at = 'epoch'
+                    WHERE ctid IN (
+                        SELECT ctid FROM request_logs
+                        WHERE relo_inserted_at IS NULL
+                        LIMIT :batch_size
+                    )
+                    """
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE},
+            ).rowcount
+
+        op.execute(
+            "ALTER TABLE request_logs VALIDATE CONSTRAINT request_logs_legacy_range"
+        )
+
+        # The index of the primary key of the partition, and the indexes of
+        # the partitioned table: an index attached as is must have the same
+        # definition, or ATTACH PARTITION builds another one
+        _build_index(
+            connection,
+            "request_logs_legacy_key",
+            "(relo_id, relo_inserted_at)",
+            unique=True,
+        )
+        for name, definition in INDEXES.items():
+            _build_index(connection, name, definition)
+
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("ALTER TABLE request_logs ALTER COLUMN relo_inserted_at SET NOT NULL")
+
+    # Only an index backing a constraint is reused for the primary key of the
+    # partitioned table; renames the index to request_logs_legacy_pkey
+    op.execute(
+        "ALTER TABLE request_logs DROP CONSTRAINT request_logs_pkey, "
+        "ADD CONSTRAINT request_logs_legacy_pkey "
+        "PRIMARY KEY USING INDEX request_logs_legacy_key"
+    )
+
+    # Views are bound to the table, not to its name
+    op.execute("DROP VIEW IF EXISTS request_log_headers")
+
+    op.execute("ALTER TABLE request_logs RENAME TO request_logs_legacy")
+    op.execute(
+        """
+        DO $$
+        DECLARE index_name text;
+        BEGIN
+            FOR index_name IN
+                SELECT indexname FROM pg_indexes
+                WHERE schemaname = current_schema()
+                  AND tablename = 'request_logs_legacy'
+                  AND indexname LIKE '%request_logs%'
+                  AND indexname <> 'request_logs_legacy_pkey'
+            LOOP
+                EXECUTE format(
+                    'ALTER INDEX %I RENAME TO %I',
+                    index_name,
+                    left(index_name || '_legacy', 63)
+                );
+            END LOOP;
+        END $$
+        """
+    )
+
+    op.execute(
+        "CREATE TABLE request_logs (LIKE request_logs_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (relo_inserted_at)"
+    )
+    op.execute(
+        "ALTER TABLE request_logs ADD CONSTRAINT request_logs_pkey "
+        "PRIMARY KEY (relo_id, relo_inserted_at)"
+    )
+    op.execute(
+        "ALTER TABLE request_logs ADD CONSTRAINT request_logs_relo_headers_hash_fkey "
+        "FOREIGN KEY (relo_headers_hash) REFERENCES request_header_sets (hese_hash)"
+    )
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON request_logs {definition}")
+
+    # Existing indexes and constraints of the legacy table are attached as they are
+    op.execute(
+        "ALTER TABLE request_logs ATTACH PARTITION request_logs_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    )
+    op.execute("CREATE TABLE request_logs_default PARTITION OF request_logs DEFAULT")
+
+    op.execute(REQUEST_LOG_HEADERS_VIEW)
+
+
+def _build_index(
+    connection: Connection, name: str, definition: str, unique: bool = False
+):
+    """
+    Build an index of request_logs concurrently, unless a valid index of the
+    same name and definition is there; an index that differs, or left
+    invalid by an interrupted build, is rebuilt.
+    """
+    existing = connection.execute(
+        text(
+            """
+            SELECT pg_get_indexdef(x.indexrelid), x.indisvalid
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE i.relname = :name
+              AND x.indrelid = CAST('request_logs' AS regclass)
+            """
+        ),
+        {"name": name},
+    ).first()
+    if existing is not None:
+        # CREATE [UNIQUE] INDEX <name> ON <schema>.request_logs USING btree (...)
+        indexdef, valid = existing
+        if (
+            valid
+            and indexdef.startswith("CREATE UNIQUE ") == unique
+            and indexdef.split(" USING ", 1)[1] == f"btree {definition}"
+        ):
+            return
+        connection.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+
+    connection.execute(
+        text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY {name} "
+            f"ON request_logs {definition}"
+        )
+    )
+
+
+def downgrade() -> None:
+    # Copies every row back into a plain table: offline
+    op.execute("DROP VIEW IF EXISTS request_log_headers")
+    op.execute("CREATE TABLE request_logs_heap (LIKE request_logs INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO request_logs_heap SELECT * FROM request_logs")
+    op.execute("DROP TABLE request_logs")
+    op.execute("ALTER TABLE request_logs_heap RENAME TO request_logs")
+
+    op.execute("ALTER TABLE request_logs ALTER COLUMN relo_inserted_at DROP NOT NULL")
+    op.execute(
+        "ALTER TABLE request_logs ADD CONSTRAINT request_logs_pkey PRIMARY KEY (relo_id)"
+    )
+    op.execute(
+        "ALTER TABLE request_logs ADD CONSTRAINT request_logs_relo_headers_hash_fkey "
+        "FOREIGN KEY (relo_headers_hash) REFERENCES request_header_sets (hese_hash)"
+    )
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON request_logs {definition}")
+
+    op.execute(REQUEST_LOG_HEADERS_VIEW)
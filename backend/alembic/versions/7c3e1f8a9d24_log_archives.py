@@ -0,0 +1,49 @@
+"""log_archives
+
+Revision ID: 7c3e1f8a9d24
+Revises: b61e4d8a3f29
+Create Date: 2026-10-18 21:04:12.538716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3e1f8a9d24"
+down_revision: Union[str, None] = "b61e4d8a3f29"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "log_archives",
+        sa.Column("loar_id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("loar_table", sa.String(), nullable=False),
+        sa.Column("loar_day", sa.Date(), nullable=False),
+        sa.Column("loar_path", sa.String(), nullable=False),
+        sa.Column("loar_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("loar_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("loar_rows", sa.Integer(), nullable=False),
+        sa.Column("loar_bytes", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "loar_inserted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("loar_id"),
+        sa.UniqueConstraint("loar_path"),
+    )
+    op.create_index(
+        "ix_log_archives_table_end", "log_archives", ["loar_table", "loar_end"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_log_archives_table_end", table_name="log_archives")
+    op.drop_table("log_archives")
@@ -0,0 +1,152 @@
+"""routes dimension table, relo_route_id and relo_query_string
+
+Revision ID: 9d41c7b2e805
+Revises: 2c8f6a4d9e13
+Create Date: 2026-10-18 19:26:03.918552
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from backend.app.database.indexes import IndexSpec, apply_index_profile
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d41c7b2e805"
+down_revision: Union[str, None] = "2c8f6a4d9e13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The profiles as of this revision, on the relo_route_id column
+INDEX_PROFILES = {
+    "ingest": [
+        IndexSpec("ix_request_logs_inserted_at_brin", ("relo_inserted_at",), "brin"),
+    ],
+    "query": [
+        IndexSpec(
+            "ix_request_logs_latency",
+            ("relo_inserted_at",),
+            include=("relo_route_id", "relo_request_duration_seconds"),
+        ),
+        IndexSpec(
+            "ix_request_logs_route_inserted_at", ("relo_route_id", "relo_inserted_at")
+        ),
+        IndexSpec(
+            "ix_request_logs_status_inserted_at",
+            ("relo_status_code", "relo_inserted_at"),
+        ),
+        IndexSpec(
+            "ix_request_logs_ip_inserted_at", ("relo_ip_address", "relo_inserted_at")
+        ),
+    ],
+}
+
+# The profiles of the previous revision, on the relo_route template column
+PREVIOUS_INDEX_PROFILES = {
+    "ingest": INDEX_PROFILES["ingest"],
+    "query": [
+        IndexSpec(
+            "ix_request_logs_latency",
+            ("relo_inserted_at",),
+            include=("relo_route", "relo_request_duration_seconds"),
+        ),
+        IndexSpec(
+            "ix_request_logs_route_inserted_at", ("relo_route", "relo_inserted_at")
+        ),
+        *INDEX_PROFILES["query"][2:],
+    ],
+}
+
+
+def index_profile() -> str:
+    # alembic -x index_profile=ingest upgrade head; the "custom" profile is
+    # applied after the migrations: python -m backend.app.database.indexes custom
+    profile = context.get_x_argument(as_dictionary=True).get("index_profile", "query")
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Invalid index profile for the migrations: {profile}")
+    return profile
+
+
+def upgrade() -> None:
+    op.create_table(
+        "routes",
+        sa.Column("rout_id", sa.SmallInteger(), autoincrement=True, nullable=False),
+        sa.Column("rout_template", sa.String(), nullable=False),
+        sa.Column(
+            "rout_inserted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("rout_id"),
+        sa.UniqueConstraint("rout_template"),
+    )
+    op.execute(
+        "INSERT INTO routes (rout_template) "
+        "SELECT DISTINCT relo_route FROM request_logs WHERE relo_route IS NOT NULL"
+    )
+
+    op.add_column(
+        "request_logs", sa.Column("relo_route_id", sa.SmallInteger(), nullable=True)
+    )
+    op.add_column(
+        "request_logs", sa.Column("relo_query_string", sa.String(), nullable=True)
+    )
+    op.create_foreign_key(
+        "request_logs_relo_route_id_fkey",
+        "request_logs",
+        "routes",
+        ["relo_route_id"],
+        ["rout_id"],
+    )
+
+    # Only rows logged since relo_route was added have a template. Older rows
+    # keep their full URL in relo_url, with the query string.
+    op.execute(
+        """
+        UPDATE request_logs r
+        SET relo_route_id = t.rout_id
+        FROM routes t
+        WHERE t.rout_template = r.relo_route
+        """
+    )
+
+    # Also drops the indexes on relo_route, rebuilt on relo_route_id below
+    op.drop_column("request_logs", "relo_route")
+
+    with op.get_context().autocommit_block():
+        print(
+            apply_index_profile(
+                op.get_bind(), "request_logs", INDEX_PROFILES[index_profile()]
+            )
+        )
+
+
+def downgrade() -> None:
+    op.add_column("request_logs", sa.Column("relo_route", sa.String(), nullable=True))
+    op.execute(
+        """
+        UPDATE request_logs r
+        SET relo_route = t.rout_template
+        FROM routes t
+        WHERE t.rout_id = r.relo_route_id
+        """
+    )
+    op.drop_constraint(
+        "request_logs_relo_route_id_fkey", "request_logs", type_="foreignkey"
+    )
+    op.drop_column("request_logs", "relo_route_id")
+    op.drop_column("request_logs", "relo_query_string")
+    op.drop_table("routes")
+
+    # The indexes of the profile, on the template column again
+    with op.get_context().autocommit_block():
+        print(
+            apply_index_profile(
+                op.get_bind(), "request_logs", PREVIOUS_INDEX_PROFILES[index_profile()]
+            )
+        )
@@ -0,0 +1,38 @@
+"""relo_body_size_and_hashes
+
+Revision ID: a84e2d0c5f17
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 10:03:17.552904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a84e2d0c5f17"
+down_revision: Union[str, None] = "3f1c9a7d2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "request_logs", sa.Column("relo_body_size", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "request_logs", sa.Column("relo_body_hash", sa.String(32), nullable=True)
+    )
+    op.add_column(
+        "request_logs",
+        sa.Column("relo_response_body_hash", sa.String(32), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("request_logs", "relo_response_body_hash")
+    op.drop_column("request_logs", "relo_body_hash")
+    op.drop_column("request_logs", "relo_body_size")
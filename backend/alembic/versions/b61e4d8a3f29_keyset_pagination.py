@@ -0,0 +1,118 @@
+"""keyset pagination indexes
+
+Revision ID: b61e4d8a3f29
+Revises: 5a7c2e9f1b38
+Create Date: 2026-10-18 19:03:17.845520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+
+from backend.app.database.indexes import IndexSpec, apply_index_profile
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b61e4d8a3f29"
+down_revision: Union[str, None] = "5a7c2e9f1b38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The profiles as of this revision
+INDEX_PROFILES = {
+    "ingest": [
+        IndexSpec("ix_request_logs_inserted_at_brin", ("relo_inserted_at",), "brin"),
+    ],
+    "query": [
+        # Keyset pagination, and index-only scans of the latency percentiles
+        IndexSpec(
+            "ix_request_logs_inserted_at",
+            ("relo_inserted_at", "relo_id"),
+            include=("relo_route_id", "relo_request_duration_seconds"),
+        ),
+        IndexSpec(
+            "ix_request_logs_route_inserted_at", ("relo_route_id", "relo_inserted_at")
+        ),
+        IndexSpec(
+            "ix_request_logs_status_inserted_at",
+            ("relo_status_code", "relo_inserted_at"),
+        ),
+        IndexSpec(
+            "ix_request_logs_ip_inserted_at", ("relo_ip_address", "relo_inserted_at")
+        ),
+    ],
+}
+
+# The profiles of the previous revision: ix_request_logs_inserted_at replaced
+# ix_request_logs_latency
+PREVIOUS_INDEX_PROFILES = {
+    "ingest": INDEX_PROFILES["ingest"],
+    "query": [
+        IndexSpec(
+            "ix_request_logs_latency",
+            ("relo_inserted_at",),
+            include=("relo_route_id", "relo_request_duration_seconds"),
+        ),
+        *INDEX_PROFILES["query"][1:],
+    ],
+}
+
+
+def index_profile() -> str:
+    # alembic -x index_profile=ingest upgrade head; the "custom" profile is
+    # applied after the migrations: python -m backend.app.database.indexes custom
+    profile = context.get_x_argument(as_dictionary=True).get("index_profile", "query")
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Invalid index profile for the migrations: {profile}")
+    return profile
+
+
+def upgrade() -> None:
+    # Cursors compare (inserted_at, id) row values, which NULLs would break
+    op.execute("UPDATE tasks SET task_created_at = now() WHERE task_created_at IS NULL")
+    op.execute(
+        "UPDATE task_logs SET talo_inserted_at = now() WHERE talo_inserted_at IS NULL"
+    )
+    op.alter_column("tasks", "task_created_at", nullable=False)
+    op.alter_column("task_logs", "talo_inserted_at", nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_created_at_id",
+            "tasks",
+            ["task_created_at", "task_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_task_logs_inserted_at_id",
+            "task_logs",
+            ["talo_inserted_at", "talo_id"],
+            postgresql_concurrently=True,
+        )
+        print(
+            apply_index_profile(
+                op.get_bind(), "request_logs", INDEX_PROFILES[index_profile()]
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        print(
+            apply_index_profile(
+                op.get_bind(), "request_logs", PREVIOUS_INDEX_PROFILES[index_profile()]
+            )
+        )
+        op.drop_index(
+            "ix_task_logs_inserted_at_id",
+            table_name="task_logs",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_created_at_id", table_name="tasks", postgresql_concurrently=True
+        )
+
+    op.alter_column("task_logs", "talo_inserted_at", nullable=True)
+    op.alter_column("tasks", "task_created_at", nullable=True)
@@ -0,0 +1,31 @@
+"""relo_sample_weight
+
+Revision ID: c2d7e95b1a38
+Revises: a84e2d0c5f17
+Create Date: 2026-10-18 11:21:06.931470
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d7e95b1a38"
+down_revision: Union[str, None] = "a84e2d0c5f17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows were not sampled: each of them stands for one request
+    op.add_column(
+        "request_logs",
+        sa.Column("relo_sample_weight", sa.Float(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("request_logs", "relo_sample_weight")
@@ -0,0 +1,78 @@
+"""request_header_sets
+
+Revision ID: d5b08f3e6c92
+Revises: c2d7e95b1a38
+Create Date: 2026-10-18 13:47:52.114086
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5b08f3e6c92"
+down_revision: Union[str, None] = "c2d7e95b1a38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "request_header_sets",
+        sa.Column("hese_hash", sa.String(32), nullable=False),
+        sa.Column("hese_headers", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "hese_inserted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("hese_hash"),
+    )
+    op.add_column(
+        "request_logs",
+        sa.Column("relo_headers_hash", sa.String(32), nullable=True),
+    )
+    op.create_foreign_key(
+        "request_logs_relo_headers_hash_fkey",
+        "request_logs",
+        "request_header_sets",
+        ["relo_headers_hash"],
+        ["hese_hash"],
+    )
+
+    # Existing rows keep their full headers in relo_headers
+    op.execute(
+        """
+        CREATE OR REPLACE VIEW request_log_headers AS
+        SELECT
+            r.relo_id,
+            r.relo_inserted_at,
+            COALESCE(h.hese_headers, '{}'::jsonb)
+                || COALESCE(r.relo_headers, '{}'::jsonb) AS relo_headers
+        FROM request_logs r
+        LEFT JOIN request_header_sets h ON h.hese_hash = r.relo_headers_hash
+        """
+    )
+
+
+def downgrade() -> None:
+    # Put the interned headers back into the rows before dropping them
+    op.execute(
+        """
+        UPDATE request_logs r
+        SET relo_headers = h.hese_headers || COALESCE(r.relo_headers, '{}'::jsonb)
+        FROM request_header_sets h
+        WHERE h.hese_hash = r.relo_headers_hash
+        """
+    )
+    op.execute("DROP VIEW IF EXISTS request_log_headers")
+    op.drop_constraint(
+        "request_logs_relo_headers_hash_fkey", "request_logs", type_="foreignkey"
+    )
+    op.drop_column("request_logs", "relo_headers_hash")
+    op.drop_table("request_header_sets")
@@ -0,0 +1,58 @@
+"""request_log_rollups
+
+Revision ID: e83b5f1a2c47
+Revises: 9d41c7b2e805
+Create Date: 2026-10-18 17:42:09.531862
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e83b5f1a2c47"
+down_revision: Union[str, None] = "9d41c7b2e805"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_watermarks",
+        sa.Column("jowa_name", sa.String(), nullable=False),
+        sa.Column("jowa_value", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "jowa_updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("jowa_name"),
+    )
+    # Existing logs are aggregated by the first runs of the rollup task,
+    # starting from the oldest one
+    op.create_table(
+        "request_log_rollups",
+        sa.Column("rlup_bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("rlup_route_id", sa.SmallInteger(), nullable=False),
+        sa.Column("rlup_method", sa.String(), nullable=False),
+        sa.Column("rlup_status_class", sa.SmallInteger(), nullable=False),
+        sa.Column("rlup_count", sa.Float(), nullable=False),
+        sa.Column("rlup_errors", sa.Float(), nullable=False),
+        sa.Column("rlup_duration_sum", sa.Float(), nullable=False),
+        sa.Column("rlup_duration_max", sa.Float(), nullable=True),
+        sa.Column("rlup_histogram", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("rlup_bytes", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "rlup_bucket", "rlup_route_id", "rlup_method", "rlup_status_class"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("request_log_rollups")
+    op.drop_table("job_watermarks")
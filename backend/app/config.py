@@ -1,7 +1,7 @@
 # app/config.py
 from pydantic_settings import BaseSettings
 from pydantic import Field, PostgresDsn, field_validator, ValidationInfo
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import timedelta
 from os import path, getcwd
 
@@ -41,6 +41,37 @@ class Settings(BaseSettings):
             path=f"{values.data.get('POSTGRES_DBNAME') or ''}",
         ).unicode_string()
 
+    # Same database through asyncpg, for the async repositories of the API
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    @field_validator("SQLALCHEMY_ASYNC_DATABASE_URI", mode="before")
+    @classmethod
+    def async_database_url(cls, v: Optional[str], values: ValidationInfo):
+        if isinstance(v, str):
+            return v
+        return values.data.get("SQLALCHEMY_DATABASE_URI").replace(
+            "postgresql://", "postgresql+asyncpg://", 1
+        )
+
+    # Connection pools, one per workload so that none can starve the others:
+    # "api" (async engine of the API routes), "writer" (request log writer,
+    # spool replay and request statistics) and "scheduler" (job store,
+    # scheduled tasks and maintenance). Each pool takes the keys of
+    # DATABASE_POOL_DEFAULTS, which it overrides; pool_timeout is the time a
+    # checkout waits for a free connection before failing.
+    DATABASE_POOL_DEFAULTS: Dict[str, Any] = {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 3600,
+        "pool_pre_ping": False,
+    }
+    DATABASE_POOLS: Dict[str, Dict[str, Any]] = {
+        "api": {"pool_size": 20, "max_overflow": 10, "pool_timeout": 10},
+        "writer": {"pool_size": 4, "max_overflow": 2},
+        "scheduler": {"pool_size": 5, "max_overflow": 5},
+    }
+
     # Rate limits
     DEFAULT_RATE_LIMIT: str
     DEFAULT_BURST_RATE_LIMIT: str
@@ -61,10 +92,89 @@ class Settings(BaseSettings):
         "month": "*",  # Every month
         "day_of_week": "*",  # Every day of the week
     }
-    REQUEST_CLEANUP_MAX_ROWS: int = 5
-
     # Define the age of request logs to be cleaned up
     REQUEST_CLEANUP_AGE: Dict[str, Any] = {"days": 7}
+    # Retention policies of the request logs by status class, duration
+    # (min_duration, in seconds) and route template, each with its own age;
+    # logs no policy matches are kept for REQUEST_CLEANUP_AGE. A log matching
+    # several policies is kept for the longest age, and policies with a
+    # route override the others for that route, e.g.
+    # {"name": "health", "route": "/api/health", "age": {"hours": 6}}.
+    # Partitions are dropped past the longest age.
+    REQUEST_RETENTION_POLICIES: List[Dict[str, Any]] = [
+        {"name": "server_errors", "status_class": 5, "age": {"days": 90}},
+        {"name": "slow", "min_duration": 1.0, "age": {"days": 90}},
+        {"name": "client_errors", "status_class": 4, "age": {"days": 30}},
+        {"name": "success", "status_class": 2, "age": {"days": 2}},
+    ]
+    # Approximate cap on the rows of request_logs, enforced after the age
+    # retention by the cleanup task; None disables it
+    REQUEST_CLEANUP_MAX_ROWS: Optional[int] = None
+
+    # Retention deletes rows in batches of RETENTION_BATCH_SIZE, one
+    # transaction each, RETENTION_BATCH_PAUSE seconds apart so that vacuum,
+    # replicas and inserts keep up. No batch is started after
+    # RETENTION_TIME_BUDGET seconds: the next run resumes where it stopped.
+    RETENTION_BATCH_SIZE: int = 5000
+    RETENTION_BATCH_PAUSE: float = 0.1
+    RETENTION_TIME_BUDGET: float = 600.0
+
+    # Cold archive: with LOG_ARCHIVE_ENABLED, the retention tasks write the
+    # expiring logs to zstd Parquet files under LOG_ARCHIVE_DIR, one
+    # directory per table and day, before deleting them, and record the files
+    # in log_archives. The request log listing reads them past the hot table.
+    # Files are deleted after LOG_ARCHIVE_RETENTION. Archives need pyarrow.
+    LOG_ARCHIVE_ENABLED: bool = False
+    LOG_ARCHIVE_DIR: str = path.join("backend", "archive")
+    LOG_ARCHIVE_RETENTION: Dict[str, Any] = {"days": 365}
+
+    # request_logs is partitioned by range on relo_inserted_at: the
+    # maintenance task creates the partitions of the next intervals ahead of
+    # time, and detaches and drops the partitions older than the longest
+    # retention, REQUEST_CLEANUP_AGE or REQUEST_RETENTION_POLICIES
+    REQUEST_LOG_PARTITION_INTERVAL: Literal["day", "hour"] = "day"
+    REQUEST_LOG_PARTITION_PREMAKE: int = 3  # Future partitions to keep ready
+    REQUEST_LOG_PARTITION_SCHEDULE_KWARGS: Dict[str, int] = {"hours": 1}
+
+    # Per-minute rollups of request_logs, maintained incrementally past a
+    # high-water mark. Rows inserted less than REQUEST_ROLLUP_SETTLE_SECONDS
+    # ago wait for the next run, so that transactions still in flight are
+    # not skipped. Rollups are kept longer than the raw logs.
+    REQUEST_ROLLUP_SCHEDULE_KWARGS: Dict[str, int] = {"minutes": 1}
+    REQUEST_ROLLUP_SETTLE_SECONDS: int = 60
+    REQUEST_ROLLUP_CHUNK_MINUTES: int = 60  # Minutes aggregated per transaction
+    REQUEST_ROLLUP_RETENTION: Dict[str, Any] = {"days": 180}
+
+    # In-process request statistics: every request, sampled or not, is
+    # counted per time bucket, route and status code with a latency sketch
+    # of REQUEST_STATS_RELATIVE_ACCURACY, and closed buckets are flushed to
+    # request_stats every REQUEST_STATS_FLUSH_INTERVAL seconds. Statistics
+    # are deleted along with the rollups, after REQUEST_STATS_RETENTION.
+    REQUEST_STATS_ENABLED: bool = True
+    REQUEST_STATS_BUCKET_SECONDS: int = 60
+    REQUEST_STATS_FLUSH_INTERVAL: float = 10.0
+    REQUEST_STATS_RELATIVE_ACCURACY: float = 0.01
+    # Closed buckets kept in memory while the database is unreachable
+    REQUEST_STATS_MAX_PENDING_BUCKETS: int = 60
+    REQUEST_STATS_RETENTION: Dict[str, Any] = {"days": 180}
+
+    # Secondary indexes of request_logs: "ingest" (BRIN on the insertion
+    # time only), "query" (composite indexes of the query API) or "custom"
+    # (REQUEST_LOG_CUSTOM_INDEXES, e.g.
+    # [{"name": "ix_request_logs_url", "columns": ["relo_url"]}]).
+    # Switch with `python -m backend.app.database.indexes`.
+    REQUEST_LOG_INDEX_PROFILE: Literal["ingest", "query", "custom"] = "query"
+    REQUEST_LOG_CUSTOM_INDEXES: List[Dict[str, Any]] = []
+
+    # Request log queries. Filters on columns that lead no index of the
+    # profile (e.g. method or duration) need a time range of at most
+    # REQUEST_LOG_QUERY_MAX_SCAN_WINDOW, and every query is cancelled after
+    # REQUEST_LOG_QUERY_TIMEOUT (a PostgreSQL duration) by the server.
+    REQUEST_LOG_QUERY_MAX_SCAN_WINDOW: Dict[str, Any] = {"hours": 24}
+    REQUEST_LOG_QUERY_TIMEOUT: str = "5s"
+    # Rows fetched per round trip by the log exports, and per Parquet row
+    # group. Parquet exports need pyarrow.
+    LOG_EXPORT_BATCH_SIZE: int = 5000
 
     # Define cron parameters for task logs cleanup
     TASK_CLEANUP_CRON_KWARGS: Dict[str, str] = {
@@ -77,7 +187,111 @@ class Settings(BaseSettings):
 
     # Define the age of task logs to be cleaned up
     TASK_CLEANUP_AGE: timedelta = timedelta(days=30)
-    TASK_CLEANUP_MAX_ROWS: int = 5
+    # Approximate cap on the rows of task_logs; None disables it
+    TASK_CLEANUP_MAX_ROWS: Optional[int] = None
+
+    # Storage maintenance: every run records the sizes and dead tuples of
+    # STORAGE_MAINTENANCE_TABLES (per partition) in storage_snapshots, then
+    # runs VACUUM (ANALYZE) on the relations with at least
+    # STORAGE_MAINTENANCE_MIN_TUPLES dead tuples making up
+    # STORAGE_VACUUM_DEAD_RATIO of their tuples, and ANALYZE on those with as
+    # many tuples changed since the last analyze, STORAGE_ANALYZE_MODIFIED_RATIO
+    # of their live tuples. Runs after the nightly cleanup, and every hour for
+    # the partition maintenance.
+    STORAGE_MAINTENANCE_CRON_KWARGS: Dict[str, str] = {
+        "minute": "30",
+        "hour": "*",  # Every hour, at half past
+        "day": "*",
+        "month": "*",
+        "day_of_week": "*",
+    }
+    STORAGE_MAINTENANCE_TABLES: List[str] = [
+        "request_logs",
+        "request_header_sets",
+        "request_log_rollups",
+        "request_stats",
+        "task_logs",
+    ]
+    STORAGE_VACUUM_DEAD_RATIO: float = 0.1
+    STORAGE_ANALYZE_MODIFIED_RATIO: float = 0.1
+    STORAGE_MAINTENANCE_MIN_TUPLES: int = 10000
+    STORAGE_SNAPSHOT_RETENTION: Dict[str, Any] = {"days": 90}
+
+    # Background request log writer
+    LOG_WRITER_FLUSH_SIZE: int = 500  # Rows per multi-row insert
+    LOG_WRITER_FLUSH_INTERVAL: float = 1.0  # Seconds to wait before a partial flush
+    LOG_WRITER_QUEUE_CAPACITY: int = 10000  # Records buffered in memory
+    # What to do when the queue is full: "drop", "block" or "spill" (to the spool)
+    LOG_WRITER_OVERFLOW_POLICY: Literal["drop", "block", "spill"] = "spill"
+    LOG_WRITER_SHUTDOWN_TIMEOUT: float = 10.0  # Seconds to drain on shutdown
+
+    # Local spool for request logs while the database is slow or down
+    LOG_SPOOL_ENABLED: bool = True
+    LOG_SPOOL_DIR: str = path.join("backend", "spool", "request_logs")
+    LOG_SPOOL_SEGMENT_SIZE: int = 64 * 1024 * 1024  # Bytes per segment file
+    LOG_SPOOL_MAX_DISK_USAGE: int = 1024 * 1024 * 1024  # Bytes for all segments
+    # When to fsync segments: "always", "interval" or "never"
+    LOG_SPOOL_FSYNC_POLICY: Literal["always", "interval", "never"] = "interval"
+    LOG_SPOOL_FSYNC_INTERVAL: float = 1.0  # Seconds
+    # Seconds between replays, and before retrying a failing database
+    LOG_SPOOL_REPLAY_INTERVAL: float = 5.0
+    # Failed replays after which a segment is set aside as "<segment>.failed"
+    LOG_SPOOL_MAX_REPLAY_ATTEMPTS: int = 5
+
+    # Request/response body capture. Bodies larger than the limit, or with a
+    # content type that is not allowed, are stored as size and hash only.
+    LOG_CAPTURE_MAX_REQUEST_BYTES: int = 4096
+    LOG_CAPTURE_MAX_RESPONSE_BYTES: int = 0  # 0 disables response capture
+    LOG_CAPTURE_CONTENT_TYPE_ALLOWLIST: List[str] = [
+        "application/json",
+        "application/*+json",
+        "application/x-www-form-urlencoded",
+        "application/xml",
+        "text/*",
+    ]
+    LOG_CAPTURE_CONTENT_TYPE_DENYLIST: List[str] = [
+        "multipart/*",
+        "application/octet-stream",
+        "text/event-stream",
+    ]
+    # Per-route overrides keyed by path prefix, e.g.
+    # {"/api/logs": {"max_request_bytes": 0, "max_response_bytes": 0}}
+    LOG_CAPTURE_ROUTE_OVERRIDES: Dict[str, Dict[str, int]] = {}
+    # Query strings are stored apart from the path, in relo_query_string
+    LOG_CAPTURE_QUERY_STRING: bool = True
+
+    # Headers stored with each request log; the other headers are interned
+    # as shared header sets, cached by hash in each worker
+    LOG_HEADERS_VOLATILE: List[str] = [
+        "content-length",
+        "cookie",
+        "authorization",
+        "referer",
+        "if-none-match",
+        "if-modified-since",
+        "x-request-id",
+        "x-forwarded-for",
+    ]
+    LOG_HEADER_CACHE_SIZE: int = 10000
+
+    # Request log sampling. Rules are evaluated in order and the first match
+    # wins; every condition is optional, e.g.
+    # {"route": "/api/misc/hello", "methods": ["GET"], "status_class": [2],
+    #  "min_duration": 0.5, "rate": 0.01}
+    # "tail" decides after the response, "head" before the request is handled.
+    LOG_SAMPLING_MODE: Literal["head", "tail"] = "tail"
+    LOG_SAMPLING_DEFAULT_RATE: float = 1.0
+    LOG_SAMPLING_RULES: List[Dict[str, Any]] = [
+        {"status_class": [5], "rate": 1.0},  # Keep every server error
+        {"min_duration": 1.0, "rate": 1.0},  # Keep every slow request
+    ]
+
+    # Prometheus metrics. With several workers, set a directory shared by
+    # them: each worker syncs its metrics there and any worker can serve the
+    # merged metrics of all of them.
+    METRICS_DIR: Optional[str] = None
+    METRICS_SYNC_INTERVAL: float = 5.0  # Seconds between syncs
+    METRICS_STALE_AFTER: float = 60.0  # Seconds before a worker is left out
 
 
 # Create an instance of the settings
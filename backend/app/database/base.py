@@ -1,16 +1,22 @@
 # app/database.py
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from psycopg2 import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy_utils import database_exists, create_database
-from sqlalchemy import pool, text, inspect
+from sqlalchemy import text, inspect
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from backend.app.config import settings
+from backend.app.database.pools import (
+    listen_pool_events,
+    pool_class,
+    pool_options,
+)
 
 Base = declarative_base()
 
@@ -22,18 +28,41 @@ class Database:
 
     - engine: A callable that represents the database engine.
     - session_maker: A callable that represents the session maker.
+    - engines, session_makers: the sync engine and session maker of each
+      workload pool, "writer" and "scheduler"; `engine` is the scheduler's.
+    - async_engine, async_session_maker: their asyncio counterparts, on
+      asyncpg and the "api" pool, used by the API routes.
+
+    Pool sizes come from DATABASE_POOLS, see `backend.app.database.pools`.
     """
 
-    def __init__(self, uri):
+    SYNC_POOLS = ("writer", "scheduler")
+
+    def __init__(self, uri, async_uri=None):
         self.uri = uri
-        self.engine = create_engine(
-            uri,
-            poolclass=pool.QueuePool,  # Use connection pooling
-            pool_size=20,  # Adjust pool size based on your workload
-            max_overflow=10,  # Adjust maximum overflow connections
-            pool_recycle=3600,  # Periodically recycle connections (optional)
+        # Connections are only opened on first use
+        self.engines = {
+            name: create_engine(uri, poolclass=pool_class(name), **pool_options(name))
+            for name in self.SYNC_POOLS
+        }
+        for name, engine in self.engines.items():
+            listen_pool_events(engine, name)
+        self.session_makers = {
+            name: sessionmaker(bind=engine, expire_on_commit=False)
+            for name, engine in self.engines.items()
+        }
+        self.engine = self.engines["scheduler"]
+        self.session_maker = self.session_makers["scheduler"]
+
+        self.async_engine = create_async_engine(
+            async_uri or uri.replace("postgresql://", "postgresql+asyncpg://", 1),
+            poolclass=pool_class("api", asynchronous=True),
+            **pool_options("api"),
+        )
+        listen_pool_events(self.async_engine.sync_engine, "api")
+        self.async_session_maker = async_sessionmaker(
+            bind=self.async_engine, expire_on_commit=False
         )
-        self.session_maker = sessionmaker(bind=self.engine, expire_on_commit=False)
 
     def get_session(self):
         with self.session_maker() as session:
@@ -142,12 +171,23 @@ class Database:
         Clean up and close the database connection and session maker.
         """
         try:
-            # Close all connections in the pool
-            self.engine.dispose()
+            # Close all connections in the pools
+            for engine in self.engines.values():
+                engine.dispose()
             print("Database connections closed.")
         except Exception as e:
             print(f"Error closing database connections: {str(e)}")
 
+    async def disconnect_async(self):
+        """
+        Close the connections of the async engine.
+        """
+        try:
+            await self.async_engine.dispose()
+            print("Async database connections closed.")
+        except Exception as e:
+            print(f"Error closing async database connections: {str(e)}")
+
     def __repr__(self):
         return f"<Database(uri={self.uri})>"
 
@@ -157,9 +197,21 @@ database = None
 
 
 def init_database() -> Database:
+    """
+    The database of the process, created and initialized on the first call.
+
+    Every later call returns the same instance, so that the process opens
+    one set of the pools of DATABASE_POOLS. Disconnecting disposes of the
+    connections only: the engines open new ones on their next use.
+    """
     global database
 
-    database = Database(settings.SQLALCHEMY_DATABASE_URI)
+    if database is not None:
+        return database
+
+    database = Database(
+        settings.SQLALCHEMY_DATABASE_URI, settings.SQLALCHEMY_ASYNC_DATABASE_URI
+    )
     database.init()
 
     return database
@@ -187,18 +239,37 @@ async def get_db():
 
 
 @contextmanager
-def get_session() -> Generator[Session, None, None]:
+def get_session(pool: str = "scheduler") -> Generator[Session, None, None]:
     """
     Define a dependency to create a database session asynchronously.
 
+    Args:
+        pool (str): The connection pool of the session, "writer" or
+            "scheduler".
+
     Returns:
         AsyncSession: An async session for interacting with the database.
     """
     if database is None:
         init_database()
 
-    with database.session_maker() as session:
+    with database.session_makers[pool]() as session:
         try:
             yield session
         finally:
             session.close()
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create an async session on the asyncpg engine.
+
+    Returns:
+        AsyncSession: An async session for interacting with the database.
+    """
+    if database is None:
+        init_database()
+
+    async with database.async_session_maker() as session:
+        yield session
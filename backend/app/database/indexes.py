@@ -0,0 +1,219 @@
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Connection, Index, text
+
+from backend.app.config import settings
+
+
+class IndexSpec(NamedTuple):
+    name: str
+    columns: Tuple[str, ...]
+    using: str = "btree"
+    include: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> "IndexSpec":
+        return cls(
+            name=spec["name"],
+            columns=tuple(spec["columns"]),
+            using=spec.get("using", "btree"),
+            include=tuple(spec.get("include", ())),
+        )
+
+    def to_index(self) -> Index:
+        kwargs = {"postgresql_using": self.using}
+        if self.include:
+            kwargs["postgresql_include"] = list(self.include)
+        return Index(self.name, *self.columns, **kwargs)
+
+    def create_sql(
+        self,
+        table_name: str,
+        index_name: Optional[str] = None,
+        only: bool = False,
+        concurrently: bool = False,
+    ) -> str:
+        """
+        Render the CREATE INDEX statement of the index on `table_name`.
+
+        Args:
+            index_name (str, optional): Defaults to the name of the spec.
+            only (bool): Create the index on the partitioned table only.
+            concurrently (bool): Build the index without blocking writes.
+        """
+        statement = "CREATE INDEX {}IF NOT EXISTS {} ON {}{} USING {} ({})".format(
+            "CONCURRENTLY " if concurrently else "",
+            index_name or self.name,
+            "ONLY " if only else "",
+            table_name,
+            self.using,
+            ", ".join(self.columns),
+        )
+        if self.include:
+            statement += f" INCLUDE ({', '.join(self.include)})"
+        return statement
+
+
+# Index profiles of request_logs, on top of its primary key:
+#
+# - ingest: a BRIN index on the insertion time, a few pages for the whole
+#   table, which keeps inserts close to the cost of the heap alone.
+# - query: composite indexes matched to the query API (time windows and
+#   pages, per route, per status code and per client).
+# - custom: the indexes of REQUEST_LOG_CUSTOM_INDEXES.
+REQUEST_LOG_INDEX_PROFILES: Dict[str, List[IndexSpec]] = {
+    "ingest": [
+        IndexSpec("ix_request_logs_inserted_at_brin", ("relo_inserted_at",), "brin"),
+    ],
+    "query": [
+        # Keyset pagination, and index-only scans of the latency percentiles
+        IndexSpec(
+            "ix_request_logs_inserted_at",
+            ("relo_inserted_at", "relo_id"),
+            include=("relo_route_id", "relo_request_duration_seconds"),
+        ),
+        IndexSpec(
+            "ix_request_logs_route_inserted_at", ("relo_route_id", "relo_inserted_at")
+        ),
+        IndexSpec(
+            "ix_request_logs_status_inserted_at",
+            ("relo_status_code", "relo_inserted_at"),
+        ),
+        IndexSpec(
+            "ix_request_logs_ip_inserted_at", ("relo_ip_address", "relo_inserted_at")
+        ),
+    ],
+}
+
+
+def request_log_indexes(profile: Optional[str] = None) -> List[IndexSpec]:
+    profile = profile or settings.REQUEST_LOG_INDEX_PROFILE
+    if profile == "custom":
+        return [
+            IndexSpec.from_dict(spec) for spec in settings.REQUEST_LOG_CUSTOM_INDEXES
+        ]
+
+    if profile not in REQUEST_LOG_INDEX_PROFILES:
+        raise ValueError(f"Invalid index profile: {profile}")
+
+    return REQUEST_LOG_INDEX_PROFILES[profile]
+
+
+def apply_index_profile(
+    connection: Connection,
+    table_name: str,
+    indexes: Sequence[IndexSpec],
+    lock_timeout: str = "10s",
+) -> Dict[str, List[str]]:
+    """
+    Create the missing indexes of a profile and drop the indexes it does not
+    list; the primary key and constraint indexes are left alone.
+
+    Indexes are built with CREATE INDEX CONCURRENTLY. A partitioned table
+    cannot be indexed concurrently, so its index is created on the parent
+    only, built concurrently on each partition and attached partition by
+    partition; it becomes valid once every partition is attached. Drops are
+    not concurrent on partitioned tables, `lock_timeout` bounds their wait.
+
+    Args:
+        connection (Connection): A connection in AUTOCOMMIT isolation level.
+        table_name (str): The table to index.
+        indexes (Sequence[IndexSpec]): The indexes of the profile.
+
+    Returns:
+        Dict[str, List[str]]: The names of the indexes created and dropped.
+    """
+    existing = {
+        name: valid
+        for name, valid in connection.execute(
+            text(
+                """
+                SELECT i.relname, x.indisvalid
+                FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                JOIN pg_class t ON t.oid = x.indrelid
+                LEFT JOIN pg_constraint c ON c.conindid = i.oid
+                WHERE t.relname = :table_name AND c.oid IS NULL
+                """
+            ),
+            {"table_name": table_name},
+        )
+    }
+    partitioned = connection.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE relname = :table_name"),
+        {"table_name": table_name},
+    ).scalar()
+    partitions = [
+        name
+        for (name,) in connection.execute(
+            text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class p ON p.oid = i.inhparent
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE p.relname = :table_name
+                """
+            ),
+            {"table_name": table_name},
+        )
+    ]
+
+    wanted = {index.name for index in indexes}
+    dropped = sorted(set(existing) - wanted)
+    for name in dropped:
+        connection.execute(text(f"SET lock_timeout = '{lock_timeout}'"))
+        connection.execute(
+            text(f"DROP INDEX {'' if partitioned else 'CONCURRENTLY '}IF EXISTS {name}")
+        )
+        connection.execute(text("RESET lock_timeout"))
+
+    created = []
+    for index in indexes:
+        # An invalid index is the leftover of an interrupted build: resume it
+        if existing.get(index.name):
+            continue
+
+        if not partitioned:
+            if index.name in existing:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY {index.name}"))
+            connection.execute(text(index.create_sql(table_name, concurrently=True)))
+            created.append(index.name)
+            continue
+
+        connection.execute(text(index.create_sql(table_name, only=True)))
+        for partition in partitions:
+            partition_index = _partition_index_name(partition, index.name, table_name)
+            connection.execute(
+                text(index.create_sql(partition, partition_index, concurrently=True))
+            )
+            connection.execute(
+                text(f"ALTER INDEX {index.name} ATTACH PARTITION {partition_index}")
+            )
+        created.append(index.name)
+
+    return {"created": created, "dropped": dropped}
+
+
+def _partition_index_name(partition: str, index_name: str, table_name: str) -> str:
+    # ix_request_logs_inserted_at on request_logs_p20261018: request_logs_p20261018_inserted_at
+    suffix = index_name.removeprefix(f"ix_{table_name}_")
+    return f"{partition}_{suffix}"[:63]
+
+
+if __name__ == "__main__":
+    # Switch request_logs to a profile (default: REQUEST_LOG_INDEX_PROFILE):
+    #     python -m backend.app.database.indexes [ingest|query|custom]
+    from backend.app.database.base import init_database
+
+    profile = sys.argv[1] if len(sys.argv) > 1 else None
+    database = init_database()
+    with database.engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as connection:
+        print(
+            apply_index_profile(
+                connection, "request_logs", request_log_indexes(profile)
+            )
+        )
@@ -1,38 +1,205 @@
 import uuid
 
-from sqlalchemy import ForeignKey, Column, Integer, String, DateTime, Boolean, Text
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import (
+    DDL,
+    event,
+    ForeignKey,
+    Column,
+    Integer,
+    SmallInteger,
+    Float,
+    String,
+    DateTime,
+    Boolean,
+    Text,
+    BigInteger,
+    Date,
+    Index,
+    LargeBinary,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from backend.app.database.base import Base
+from backend.app.database.indexes import request_log_indexes
 
 
 class RequestLog(Base):
     __tablename__ = "request_logs"
 
-    relo_id = Column(
-        UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
-    )
+    # Partitioned by range on relo_inserted_at, which must therefore be part
+    # of the primary key (see scheduler/tasks/logs.py for the partitions)
+    relo_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     relo_inserted_at = Column(
-        DateTime(timezone=True), index=True, server_default=func.now()
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
     )
-    relo_method = Column(String, index=True)
-    relo_url = Column(String, index=True)
+    relo_method = Column(String)
+    relo_url = Column(String)  # Path, without host nor query string
+    # Only the volatile headers are stored per row, the rest is interned in
+    # request_header_sets (see the request_log_headers view)
     relo_headers = Column(JSONB)
+    relo_headers_hash = Column(
+        String(32), ForeignKey("request_header_sets.hese_hash"), nullable=True
+    )
     relo_body = Column(String)
-    relo_status_code = Column(Integer, index=True)
-    relo_ip_address = Column(String, index=True)
+    relo_body_size = Column(Integer, nullable=True)
+    relo_body_hash = Column(String(32), nullable=True)
+    relo_response_body = Column(String, nullable=True)
+    relo_response_body_hash = Column(String(32), nullable=True)
+    relo_status_code = Column(Integer)
+    relo_ip_address = Column(String)
     relo_device_info = Column(String)
-    relo_absolute_path = Column(String)
-    relo_request_duration_seconds = Column(Integer, index=True)
-    relo_response_size = Column(Integer, index=True)
+    relo_absolute_path = Column(String)  # Full URL, without query string
+    relo_query_string = Column(String, nullable=True)
+    relo_route_id = Column(SmallInteger, ForeignKey("routes.rout_id"), nullable=True)
+    relo_request_duration_seconds = Column(Float)
+    relo_response_size = Column(Integer)
+    relo_sample_weight = Column(Float, nullable=False, server_default="1")
+
+    header_set = relationship("RequestHeaderSet")
+    route = relationship("Route")
+
+    # Secondary indexes come from the configured index profile
+    __table_args__ = (
+        *(index.to_index() for index in request_log_indexes()),
+        {"postgresql_partition_by": "RANGE (relo_inserted_at)"},
+    )
 
     def __repr__(self):
         params = f"id={self.relo_id}, method={self.relo_method}, url={self.relo_url}, status_code={self.relo_status_code}"
         return f"<RequestLog({params})>"
 
 
+# Catches rows outside of the range partitions, which are created ahead of
+# time by the partition maintenance task
+event.listen(
+    RequestLog.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS request_logs_default PARTITION OF request_logs DEFAULT"
+    ),
+)
+
+
+class Route(Base):
+    __tablename__ = "routes"
+
+    # Route templates of the application, e.g. /api/tasks/{task_id}
+    rout_id = Column(SmallInteger, primary_key=True, autoincrement=True)
+    rout_template = Column(String, nullable=False, unique=True)
+    rout_inserted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<Route(id={self.rout_id}, template={self.rout_template})>"
+
+
+# Upper bounds in seconds of the rollup latency histogram buckets, the last
+# bucket counts everything above. Stored histograms depend on them: changing
+# them needs a migration of request_log_rollups.
+ROLLUP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestLogRollup(Base):
+    __tablename__ = "request_log_rollups"
+
+    # Requests aggregated per minute, route, method and status class. Counts
+    # include the sample weights, so they estimate the requests served.
+    rlup_bucket = Column(DateTime(timezone=True), primary_key=True)
+    rlup_route_id = Column(SmallInteger, primary_key=True)  # 0: no route matched
+    rlup_method = Column(String, primary_key=True)
+    rlup_status_class = Column(SmallInteger, primary_key=True)  # 2 for 2xx...
+    rlup_count = Column(Float, nullable=False)
+    rlup_errors = Column(Float, nullable=False)  # Status code 500 and above
+    rlup_duration_sum = Column(Float, nullable=False)
+    rlup_duration_max = Column(Float, nullable=True)
+    rlup_histogram = Column(ARRAY(Float), nullable=False)  # ROLLUP_LATENCY_BUCKETS
+    rlup_bytes = Column(Float, nullable=False)
+
+    def __repr__(self):
+        params = f"bucket={self.rlup_bucket}, route_id={self.rlup_route_id}, method={self.rlup_method}, status_class={self.rlup_status_class}"
+        return f"<RequestLogRollup({params})>"
+
+
+class RequestStat(Base):
+    __tablename__ = "request_stats"
+
+    # Request statistics aggregated in the memory of one worker (rsta_node)
+    # per time bucket, route and status code, flushed when the bucket closes.
+    # Every request is counted, sampled out or not; the rows of the workers
+    # are merged at query time.
+    rsta_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    rsta_bucket = Column(DateTime(timezone=True), nullable=False)
+    rsta_node = Column(String, nullable=False)  # host:pid
+    rsta_route_id = Column(SmallInteger, nullable=False)  # 0: no route matched
+    rsta_status_code = Column(SmallInteger, nullable=False)
+    rsta_count = Column(BigInteger, nullable=False)
+    rsta_duration_sum = Column(Float, nullable=False)
+    rsta_duration_max = Column(Float, nullable=False)
+    rsta_bytes = Column(BigInteger, nullable=False)
+    rsta_sketch = Column(LargeBinary, nullable=False)  # LatencySketch.to_bytes
+
+    __table_args__ = (Index("ix_request_stats_bucket", "rsta_bucket"),)
+
+    def __repr__(self):
+        params = f"bucket={self.rsta_bucket}, node={self.rsta_node}, route_id={self.rsta_route_id}, status_code={self.rsta_status_code}"
+        return f"<RequestStat({params})>"
+
+
+class LogArchive(Base):
+    __tablename__ = "log_archives"
+
+    # Manifest of the cold archive: Parquet files of the rows retention
+    # deleted, one or more per table and day (see utils/archive.py)
+    loar_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    loar_table = Column(String, nullable=False)
+    loar_day = Column(Date, nullable=False)
+    loar_path = Column(String, nullable=False, unique=True)
+    loar_start = Column(DateTime(timezone=True), nullable=False)  # Oldest row
+    loar_end = Column(DateTime(timezone=True), nullable=False)  # Newest row
+    loar_rows = Column(Integer, nullable=False)
+    loar_bytes = Column(BigInteger, nullable=False)
+    loar_inserted_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (Index("ix_log_archives_table_end", "loar_table", "loar_end"),)
+
+    def __repr__(self):
+        params = f"table={self.loar_table}, day={self.loar_day}, rows={self.loar_rows}"
+        return f"<LogArchive({params})>"
+
+
+class RequestHeaderSet(Base):
+    __tablename__ = "request_header_sets"
+
+    # Hash of the normalized header set, see ingestion/headers.py
+    hese_hash = Column(String(32), primary_key=True)
+    hese_headers = Column(JSONB, nullable=False)
+    hese_inserted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<RequestHeaderSet(hash={self.hese_hash})>"
+
+
+# Request logs with their interned and volatile headers merged back together
+REQUEST_LOG_HEADERS_VIEW = """
+CREATE OR REPLACE VIEW request_log_headers AS
+SELECT
+    r.relo_id,
+    r.relo_inserted_at,
+    COALESCE(h.hese_headers, '{}'::jsonb)
+        || COALESCE(r.relo_headers, '{}'::jsonb) AS relo_headers
+FROM request_logs r
+LEFT JOIN request_header_sets h ON h.hese_hash = r.relo_headers_hash
+"""
+
+event.listen(Base.metadata, "after_create", DDL(REQUEST_LOG_HEADERS_VIEW))
+
+
 class TaskLog(Base):
     __tablename__ = "task_logs"
 
@@ -57,10 +224,17 @@ class TaskLog(Base):
     talo_success = Column(Boolean, default=False)
     talo_error_message = Column(Text, nullable=True)
     talo_error_trace = Column(Text, nullable=True)
-    talo_inserted_at = Column(DateTime(timezone=True), server_default=func.now())
+    talo_inserted_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
     task = relationship("Task", back_populates="logs")
 
+    # Keyset pagination (see BaseRepository.paginate)
+    __table_args__ = (
+        Index("ix_task_logs_inserted_at_id", "talo_inserted_at", "talo_id"),
+    )
+
     def __repr__(self):
         params = f"id={self.talo_id}, name={self.talo_name}, status={self.talo_status}, success={self.talo_success}"
         return f"<TaskLog({params})>"
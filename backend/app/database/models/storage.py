@@ -0,0 +1,36 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, String
+
+from backend.app.database.base import Base
+
+
+class StorageSnapshot(Base):
+    __tablename__ = "storage_snapshots"
+
+    # Size and dead tuples of a relation at one run of the storage maintenance
+    # task, from pg_stat_user_tables; a partitioned table has one row per
+    # partition, stsn_table being the partitioned table
+    stsn_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    stsn_taken_at = Column(DateTime(timezone=True), nullable=False)
+    stsn_table = Column(String, nullable=False)
+    stsn_relation = Column(String, nullable=False)
+    stsn_table_bytes = Column(BigInteger, nullable=False)  # Main fork
+    stsn_indexes_bytes = Column(BigInteger, nullable=False)
+    stsn_toast_bytes = Column(BigInteger, nullable=False)
+    stsn_live_tuples = Column(BigInteger, nullable=False)
+    stsn_dead_tuples = Column(BigInteger, nullable=False)
+    stsn_dead_ratio = Column(Float, nullable=False)
+    stsn_modified_since_analyze = Column(BigInteger, nullable=False)
+    stsn_last_vacuum = Column(DateTime(timezone=True))  # Manual or autovacuum
+    stsn_last_analyze = Column(DateTime(timezone=True))
+    # What the task ran after the snapshot: "vacuum_analyze", "analyze" or
+    # None
+    stsn_action = Column(String)
+
+    __table_args__ = (
+        Index("ix_storage_snapshots_table_taken_at", "stsn_table", "stsn_taken_at"),
+        Index("ix_storage_snapshots_taken_at", "stsn_taken_at"),
+    )
+
+    def __repr__(self):
+        params = f"relation={self.stsn_relation}, taken_at={self.stsn_taken_at}, dead_ratio={self.stsn_dead_ratio}"
+        return f"<StorageSnapshot({params})>"
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import uuid
 
-from sqlalchemy import Column, String, Boolean, DateTime, func
+from sqlalchemy import Column, String, Boolean, DateTime, Index, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
@@ -14,7 +14,9 @@ class Task(Base):
     task_id = Column(
         UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4
     )
-    task_created_at = Column(DateTime(timezone=True), server_default=func.now())
+    task_created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
     task_schedule_type = Column(String, index=True)
     task_schedule_params = Column(JSONB)
     task_name = Column(String, index=True)
@@ -27,6 +29,24 @@ class Task(Base):
         "TaskLog", back_populates="task", cascade="all, delete", passive_updates=False
     )
 
+    # Keyset pagination (see BaseRepository.paginate)
+    __table_args__ = (Index("ix_tasks_created_at_id", "task_created_at", "task_id"),)
+
     def __repr__(self):
         params = f"id={self.task_id}, name={self.task_name}, type={self.task_type}, active={self.task_is_active}"
         return f"<Task({params})>"
+
+
+class JobWatermark(Base):
+    __tablename__ = "job_watermarks"
+
+    # High-water marks of incremental jobs, e.g. the request log rollups, and
+    # the positions of retention runs that ran out of time
+    jowa_name = Column(String, primary_key=True)
+    jowa_value = Column(DateTime(timezone=True), nullable=True)
+    jowa_updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<JobWatermark(name={self.jowa_name}, value={self.jowa_value})>"
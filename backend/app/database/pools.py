@@ -0,0 +1,141 @@
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from backend.app.config import settings
+from backend.app.metrics import db_pool_checkout_wait, metrics_registry
+
+# Connection pools, one per workload: the API routes (async engine), the
+# request log writer and the scheduler
+POOL_NAMES = ("api", "writer", "scheduler")
+
+
+class PoolStats:
+    """
+    Live state of a named pool, read from its current QueuePool, and counts
+    of its connection events since startup.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[QueuePool] = None
+
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        if pool is None:
+            return {"pool": self.name, "created": False}
+
+        return {
+            "pool": self.name,
+            "created": True,
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Negative while the pool has not opened pool_size connections yet
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+        }
+
+
+pool_stats = {name: PoolStats(name) for name in POOL_NAMES}
+
+
+class _TimedPool:
+    """
+    Pool mixin timing the wait for a connection, from the checkout request
+    until a connection is free or opened, in db_pool_checkout_wait_seconds.
+    """
+
+    STATS: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Engines recreate their pool on dispose: follow the current one
+        self.STATS.pool = self
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.STATS.timeouts += 1
+            raise
+        finally:
+            db_pool_checkout_wait.observe(perf_counter() - start, self.STATS.name)
+
+
+@lru_cache(maxsize=None)
+def pool_class(name: str, asynchronous: bool = False) -> Type[QueuePool]:
+    """QueuePool class of the pool `name`, reporting to `pool_stats[name]`."""
+    base = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    return type(
+        f"{name.title()}{base.__name__}",
+        (_TimedPool, base),
+        {"STATS": pool_stats[name]},
+    )
+
+
+def listen_pool_events(engine: Engine, name: str):
+    """
+    Count the checkouts and new connections of the pool of `engine` from
+    its pool events, which carry over when the engine recreates its pool.
+    """
+    stats = pool_stats[name]
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+
+def pool_options(name: str) -> Dict[str, Any]:
+    """Engine arguments of the pool `name`, its settings over the defaults."""
+    return {**settings.DATABASE_POOL_DEFAULTS, **settings.DATABASE_POOLS.get(name, {})}
+
+
+def _register_metrics():
+    gauges = (
+        ("db_pool_size", "Connections kept open by the pool.", "size"),
+        ("db_pool_checked_out", "Connections in use.", "checked_out"),
+        ("db_pool_checked_in", "Idle connections held by the pool.", "checked_in"),
+        ("db_pool_overflow", "Connections open beyond the pool size.", "overflow"),
+    )
+    counters = (
+        ("db_pool_checkouts_total", "Connections checked out.", "checkouts"),
+        ("db_pool_connects_total", "Database connections opened.", "connects"),
+        (
+            "db_pool_timeouts_total",
+            "Checkouts that gave up waiting for a connection.",
+            "timeouts",
+        ),
+    )
+
+    for register, metrics in (
+        (metrics_registry.gauge, gauges),
+        (metrics_registry.counter, counters),
+    ):
+        for metric, documentation, key in metrics:
+            for name, stats in pool_stats.items():
+                register(
+                    metric,
+                    documentation,
+                    lambda stats=stats, key=key: stats.stats().get(key, 0),
+                    labels={"pool": name},
+                )
+
+
+_register_metrics()
@@ -0,0 +1,162 @@
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import ColumnElement, and_, column, false, func, not_, or_, true
+from sqlalchemy.engine import Dialect
+
+from backend.app.config import settings
+
+# Name of the policy of the request logs no other policy matches
+DEFAULT_POLICY = "default"
+
+
+class RetentionPolicy(NamedTuple):
+    """
+    How long the request logs matching all the given criteria are kept.
+
+    Rows matching several policies are kept for the longest of their ages.
+    Policies with a `route` override the others for the rows they match:
+    the rows of that route they do not match fall back to the policies
+    without a route.
+    """
+
+    name: str
+    age: timedelta
+    status_class: Optional[int] = None  # First digit of the status code
+    min_duration: Optional[float] = None  # Slow requests, in seconds
+    route: Optional[str] = None  # Route template
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "RetentionPolicy":
+        return cls(
+            name=spec["name"],
+            age=timedelta(**spec["age"]),
+            status_class=spec.get("status_class"),
+            min_duration=spec.get("min_duration"),
+            route=spec.get("route"),
+        )
+
+    def match(self, route_id: Optional[int] = None) -> ColumnElement:
+        """
+        The rows of the policy, on unqualified columns so that the condition
+        applies to any partition; `route_id` is the id of `route`.
+        """
+        clauses = []
+        if self.status_class is not None:
+            # A range, to keep using the status code index
+            clauses.append(
+                column("relo_status_code").between(
+                    self.status_class * 100, self.status_class * 100 + 99
+                )
+            )
+        if self.min_duration is not None:
+            clauses.append(column("relo_request_duration_seconds") >= self.min_duration)
+        if self.route is not None:
+            clauses.append(column("relo_route_id") == route_id)
+
+        return and_(true(), *clauses)
+
+
+class RetentionRule(NamedTuple):
+    """A policy and the rows it expires, see `compile_policies`."""
+
+    policy: RetentionPolicy
+    condition: Optional[ColumnElement]  # None for every row
+
+    def sql(self, dialect: Dialect) -> Optional[str]:
+        """The condition as SQL, for `utils.database.delete_in_batches`."""
+        if self.condition is None:
+            return None
+
+        return str(
+            self.condition.compile(
+                dialect=dialect, compile_kwargs={"literal_binds": True}
+            )
+        )
+
+
+def request_retention_policies() -> List[RetentionPolicy]:
+    """
+    The policies of REQUEST_RETENTION_POLICIES.
+
+    Raises:
+        ValueError: If two policies have the same name; the name keys the
+            progress of their deletions.
+    """
+    policies = [
+        RetentionPolicy.from_dict(spec) for spec in settings.REQUEST_RETENTION_POLICIES
+    ]
+    names = [policy.name for policy in policies]
+    if len(set(names)) != len(names) or DEFAULT_POLICY in names:
+        raise ValueError(f"Retention policy names must be unique: {names}")
+
+    return policies
+
+
+def retention_horizon(
+    default_age: timedelta, policies: Sequence[RetentionPolicy]
+) -> timedelta:
+    """The age past which no request log is kept, when partitions are dropped."""
+    return max([default_age, *(policy.age for policy in policies)])
+
+
+def compile_policies(
+    default_age: timedelta,
+    policies: Sequence[RetentionPolicy],
+    route_ids: Dict[str, int],
+) -> List[RetentionRule]:
+    """
+    Compile the policies to one condition each, the rows that expire after
+    its age and no later; together with the "default" policy, the rows no
+    policy matches, which expire after `default_age`.
+
+    Each condition is the policy's own criteria minus those of the longer
+    policies that take precedence, so every deletion is a range of the
+    insertion time index filtered by a few column comparisons. Policies on
+    routes missing from `route_ids` match no row and are left out.
+
+    Returns:
+        List[RetentionRule]: The rules, shortest age first.
+    """
+
+    def matches(candidates: Sequence[RetentionPolicy]) -> ColumnElement:
+        # NULL columns match no policy, instead of making NOT (...) NULL
+        return func.coalesce(
+            or_(
+                false(),
+                *(policy.match(route_ids.get(policy.route)) for policy in candidates),
+            ),
+            false(),
+        )
+
+    policies = [
+        policy
+        for policy in policies
+        if policy.route is None or policy.route in route_ids
+    ]
+    overrides = [policy for policy in policies if policy.route is not None]
+
+    rules = []
+    for policy in policies:
+        # Policies take precedence over the longer ones of their own tier
+        # only: the policies of the same route, or those without a route
+        longer = [
+            other
+            for other in policies
+            if other.route == policy.route and other.age > policy.age
+        ]
+        clauses = [policy.match(route_ids.get(policy.route))]
+        if longer:
+            clauses.append(not_(matches(longer)))
+        if policy.route is None and overrides:
+            clauses.append(not_(matches(overrides)))
+        rules.append(RetentionRule(policy, and_(*clauses)))
+
+    if policies:
+        default = RetentionRule(
+            RetentionPolicy(DEFAULT_POLICY, default_age), not_(matches(policies))
+        )
+    else:
+        default = RetentionRule(RetentionPolicy(DEFAULT_POLICY, default_age), None)
+
+    return sorted([*rules, default], key=lambda rule: rule.policy.age)
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime, timezone
+from os import getpid
+from socket import gethostname
+from time import time
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app.config import settings
+from backend.app.database.base import get_session
+from backend.app.ingestion.routes import RouteCache
+from backend.app.ingestion.routes import route_cache as default_route_cache
+from backend.app.ingestion.sketch import LatencySketch
+from backend.app.metrics import metrics_registry
+from backend.app.repositories.logs import RequestLogRepository, RequestStatRepository
+
+# Bucket start (epoch seconds), route template, status code
+SeriesKey = Tuple[int, Optional[str], int]
+
+
+class RequestSeries:
+    __slots__ = ("count", "duration_sum", "duration_max", "bytes", "sketch")
+
+    def __init__(self, relative_accuracy: float):
+        self.count = 0
+        self.duration_sum = 0.0
+        self.duration_max = 0.0
+        self.bytes = 0
+        self.sketch = LatencySketch(relative_accuracy)
+
+    def merge(self, other: "RequestSeries"):
+        self.count += other.count
+        self.duration_sum += other.duration_sum
+        self.duration_max = max(self.duration_max, other.duration_max)
+        self.bytes += other.bytes
+        self.sketch.merge(other.sketch)
+
+
+class RequestAggregator:
+    """
+    Aggregates every request in memory per time bucket, route and status
+    code: exact counts, duration sum and max, response bytes and a latency
+    sketch, see `LatencySketch`.
+
+    A series has a fixed size, whatever the traffic, and only the buckets
+    not flushed yet are held. A background task writes the closed buckets to
+    request_stats every `flush_interval` seconds, one row per series and
+    worker, and the open bucket is written on stop. Series that fail to be
+    written are kept for the next flush, up to `max_pending_buckets` buckets
+    back, older ones are dropped.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 60,
+        flush_interval: float = 10.0,
+        relative_accuracy: float = 0.01,
+        max_pending_buckets: int = 60,
+        route_cache: Optional[RouteCache] = None,
+        node: Optional[str] = None,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.flush_interval = flush_interval
+        self.relative_accuracy = relative_accuracy
+        self.max_pending_buckets = max_pending_buckets
+        self.route_cache = route_cache or default_route_cache
+        self.node = node or f"{gethostname()}:{getpid()}"
+
+        self.series: Dict[SeriesKey, RequestSeries] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushed = 0
+        self.dropped = 0
+
+    def observe(
+        self,
+        route: Optional[str],
+        status_code: int,
+        duration: float,
+        size: int,
+        now: Optional[float] = None,
+    ):
+        bucket = int(now if now is not None else time())
+        key = (bucket - bucket % self.bucket_seconds, route, status_code)
+
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = RequestSeries(self.relative_accuracy)
+
+        series.count += 1
+        series.duration_sum += duration
+        if duration > series.duration_max:
+            series.duration_max = duration
+        series.bytes += size
+        series.sketch.add(duration)
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write every pending series, open bucket included."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        self._task = None
+        await self.flush(closed_only=False)
+
+        print(
+            f"Request aggregator stopped: flushed={self.flushed}, "
+            f"dropped={self.dropped}"
+        )
+
+    async def flush(self, closed_only: bool = True):
+        current = int(time()) // self.bucket_seconds * self.bucket_seconds
+        pending = {
+            key: self.series.pop(key)
+            for key in list(self.series)
+            if not closed_only or key[0] < current
+        }
+        if not pending:
+            return
+
+        try:
+            # The database driver is synchronous: keep it off the event loop
+            self.flushed += await asyncio.to_thread(self._write, pending)
+        except Exception as e:
+            print(f"Error writing {len(pending)} request stats: {e}")
+            self._restore(pending, current)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _write(self, pending: Dict[SeriesKey, RequestSeries]) -> int:
+        with get_session("writer") as db_session:
+            self.route_cache.resolve(
+                RequestLogRepository(db_session), (route for _, route, _ in pending)
+            )
+            return RequestStatRepository(db_session).create_many(
+                [self._row(key, series) for key, series in pending.items()]
+            )
+
+    def _row(self, key: SeriesKey, series: RequestSeries) -> Dict[str, Any]:
+        bucket, route, status_code = key
+        return {
+            "rsta_bucket": datetime.fromtimestamp(bucket, timezone.utc),
+            "rsta_node": self.node,
+            "rsta_route_id": self.route_cache.get(route) or 0,
+            "rsta_status_code": status_code,
+            "rsta_count": series.count,
+            "rsta_duration_sum": series.duration_sum,
+            "rsta_duration_max": series.duration_max,
+            "rsta_bytes": series.bytes,
+            "rsta_sketch": series.sketch.to_bytes(),
+        }
+
+    def _restore(self, pending: Dict[SeriesKey, RequestSeries], current: int):
+        oldest = current - self.max_pending_buckets * self.bucket_seconds
+        for key, series in pending.items():
+            if key[0] < oldest:
+                self.dropped += series.count
+                continue
+
+            kept = self.series.get(key)
+            if kept is None:
+                self.series[key] = series
+            else:
+                series.merge(kept)
+                self.series[key] = series
+
+
+request_aggregator = RequestAggregator(
+    bucket_seconds=settings.REQUEST_STATS_BUCKET_SECONDS,
+    flush_interval=settings.REQUEST_STATS_FLUSH_INTERVAL,
+    relative_accuracy=settings.REQUEST_STATS_RELATIVE_ACCURACY,
+    max_pending_buckets=settings.REQUEST_STATS_MAX_PENDING_BUCKETS,
+)
+
+metrics_registry.gauge(
+    "request_stats_series",
+    "Request statistic series held in memory by the aggregator.",
+    lambda: len(request_aggregator.series),
+)
+metrics_registry.counter(
+    "request_stats_dropped_total",
+    "Requests whose statistics were dropped after failed flushes.",
+    lambda: request_aggregator.dropped,
+)
@@ -0,0 +1,143 @@
+from fnmatch import fnmatchcase
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.app.config import settings
+
+
+class BodyCapture:
+    """
+    Incrementally captures a request or response body as its chunks pass by.
+
+    At most `limit` bytes are ever kept in memory. Every chunk is counted and,
+    unless `digest` is disabled, hashed so a body that was skipped or exceeded
+    the limit can still be correlated through its size and digest.
+    """
+
+    __slots__ = ("limit", "buffer", "size", "hasher")
+
+    def __init__(self, limit: int, digest: bool = True):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.size = 0
+        self.hasher = blake2b(digest_size=16) if digest else None
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+
+        self.size += len(chunk)
+        if self.hasher is not None:
+            self.hasher.update(chunk)
+
+        room = self.limit - len(self.buffer)
+        if room > 0:
+            self.buffer.extend(chunk[:room])
+
+    @property
+    def complete(self) -> bool:
+        return self.size <= self.limit
+
+    def result(self) -> Tuple[Optional[str], int, Optional[str]]:
+        """
+        Returns:
+            Tuple[Optional[str], int, Optional[str]]: The decoded body (only
+            when it was captured in full), its size in bytes and, when the
+            body is not stored, its blake2b digest (unless digests are
+            disabled).
+        """
+        if self.size == 0:
+            return None, 0, None
+
+        if self.complete:
+            body = self.buffer.decode(errors="replace")
+            # PostgreSQL text cannot hold NUL: such bodies are only hashed
+            if "\x00" not in body:
+                return body, self.size, None
+
+        digest = self.hasher.hexdigest() if self.hasher is not None else None
+        return None, self.size, digest
+
+
+class BodyCapturePolicy:
+    """
+    Decides how many bytes of each body may be captured.
+
+    Content types are matched with shell-style wildcards (e.g. "text/*"); the
+    denylist wins over the allowlist and an empty allowlist allows every
+    type. Route overrides are keyed by path prefix, the longest prefix wins.
+    """
+
+    def __init__(
+        self,
+        max_request_bytes: int,
+        max_response_bytes: int,
+        allowlist: Iterable[str] = (),
+        denylist: Iterable[str] = (),
+        route_overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.max_request_bytes = max_request_bytes
+        self.max_response_bytes = max_response_bytes
+        self.allowlist = [pattern.lower() for pattern in allowlist]
+        self.denylist = [pattern.lower() for pattern in denylist]
+
+        # Longest prefixes first so the most specific override wins
+        self.route_overrides: List[Tuple[str, Dict[str, Any]]] = sorted(
+            (route_overrides or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+        self._content_type_cache: Dict[str, bool] = {}
+
+    def request_capture(self, path: str, content_type: Optional[str]) -> BodyCapture:
+        limit = self._override(path, "max_request_bytes", self.max_request_bytes)
+        return self._capture(limit, content_type)
+
+    def response_capture(self, path: str, content_type: Optional[str]) -> BodyCapture:
+        limit = self._override(path, "max_response_bytes", self.max_response_bytes)
+        return self._capture(limit, content_type)
+
+    def _capture(self, limit: int, content_type: Optional[str]) -> BodyCapture:
+        # A zero limit disables capture, only the size and digest are kept
+        if limit <= 0:
+            return BodyCapture(0)
+
+        return BodyCapture(limit if self.allows(content_type) else 0)
+
+    def allows(self, content_type: Optional[str]) -> bool:
+        media_type = (content_type or "").split(";", 1)[0].strip().lower()
+
+        allowed = self._content_type_cache.get(media_type)
+        if allowed is None:
+            allowed = self._match(media_type)
+
+            # Content types come from clients: keep the cache bounded
+            if len(self._content_type_cache) >= 256:
+                self._content_type_cache.clear()
+            self._content_type_cache[media_type] = allowed
+
+        return allowed
+
+    def _match(self, media_type: str) -> bool:
+        if any(fnmatchcase(media_type, pattern) for pattern in self.denylist):
+            return False
+
+        if not self.allowlist:
+            return True
+
+        return any(fnmatchcase(media_type, pattern) for pattern in self.allowlist)
+
+    def _override(self, path: str, key: str, default: int) -> int:
+        for prefix, override in self.route_overrides:
+            if path.startswith(prefix) and key in override:
+                return override[key]
+
+        return default
+
+
+body_capture_policy = BodyCapturePolicy(
+    max_request_bytes=settings.LOG_CAPTURE_MAX_REQUEST_BYTES,
+    max_response_bytes=settings.LOG_CAPTURE_MAX_RESPONSE_BYTES,
+    allowlist=settings.LOG_CAPTURE_CONTENT_TYPE_ALLOWLIST,
+    denylist=settings.LOG_CAPTURE_CONTENT_TYPE_DENYLIST,
+    route_overrides=settings.LOG_CAPTURE_ROUTE_OVERRIDES,
+)
@@ -0,0 +1,134 @@
+import json
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.app.config import settings
+from backend.app.ingestion.record import RequestLogRecord
+
+
+class HeaderInterner:
+    """
+    Interns the repetitive part of request headers in request_header_sets.
+
+    Headers listed as volatile (content length, cookies, request ids...) stay
+    in the row; the others form a header set keyed by the hash of its
+    normalized JSON form, and the row only stores that hash. An in-process LRU
+    of hashes already known to exist in the database avoids a round trip for
+    the header sets every client sends over and over.
+    """
+
+    def __init__(self, volatile_headers: Iterable[str], cache_size: int):
+        self.volatile_headers = frozenset(name.lower() for name in volatile_headers)
+        self.cache_size = cache_size
+
+        self._known: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def split(
+        self, headers: Dict[str, str]
+    ) -> Tuple[Optional[str], Optional[Dict[str, str]], Optional[Dict[str, str]]]:
+        """
+        Split headers into their interned and volatile parts.
+
+        Returns:
+            Tuple: The header set hash, the interned headers and the volatile
+                headers; each is None when empty.
+        """
+        interned = {}
+        volatile = {}
+        for name, value in headers.items():
+            name = name.lower()
+            if name in self.volatile_headers:
+                volatile[name] = value
+            else:
+                interned[name] = value
+
+        if not interned:
+            return None, None, volatile or None
+
+        normalized = json.dumps(interned, sort_keys=True, separators=(",", ":"))
+        header_hash = blake2b(normalized.encode(), digest_size=16).hexdigest()
+        return header_hash, interned, volatile or None
+
+    def prepare(self, record: RequestLogRecord) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Replace the headers of a record with its header set hash and its
+        volatile headers. The interned headers stay on the record, so a
+        record that is spooled after a failed write can still be interned.
+
+        Returns:
+            Optional[Tuple[str, Dict[str, str]]]: The header set hash and
+                headers, None when the record has no header set to intern.
+        """
+        if record.relo_headers_hash is None and record.relo_headers:
+            header_hash, interned, volatile = self.split(record.relo_headers)
+            record.relo_headers_hash = header_hash
+            record.relo_headers = volatile
+            record.header_set = interned
+
+        if record.relo_headers_hash is None or record.header_set is None:
+            return None
+
+        return record.relo_headers_hash, record.header_set
+
+    def prepared(
+        self, records: Iterable[RequestLogRecord]
+    ) -> Iterator[RequestLogRecord]:
+        for record in records:
+            self.prepare(record)
+            yield record
+
+    def intern(self, repository, records: Iterable[RequestLogRecord]) -> List[str]:
+        """
+        Prepare records and insert the header sets the cache does not know.
+
+        The header sets are inserted in the repository's transaction: once it
+        commits, pass the returned hashes to `remember`.
+
+        Args:
+            repository (RequestLogRepository): Repository bound to the session
+                that will insert the records.
+            records (Iterable[RequestLogRecord]): The records to prepare.
+
+        Returns:
+            List[str]: The hashes of the header sets that were inserted.
+        """
+        unknown = {}
+        for record in records:
+            prepared = self.prepare(record)
+            if prepared is None:
+                continue
+
+            header_hash, interned = prepared
+            if header_hash not in unknown and not self._is_known(header_hash):
+                unknown[header_hash] = interned
+
+        if unknown:
+            repository.create_header_sets(unknown)
+
+        return list(unknown)
+
+    def remember(self, header_hashes: Iterable[str]):
+        with self._lock:
+            for header_hash in header_hashes:
+                self._known[header_hash] = None
+                self._known.move_to_end(header_hash)
+
+            while len(self._known) > self.cache_size:
+                self._known.popitem(last=False)
+
+    def _is_known(self, header_hash: str) -> bool:
+        with self._lock:
+            if header_hash not in self._known:
+                return False
+
+            self._known.move_to_end(header_hash)
+            return True
+
+
+header_interner = HeaderInterner(
+    volatile_headers=settings.LOG_HEADERS_VOLATILE,
+    cache_size=settings.LOG_HEADER_CACHE_SIZE,
+)
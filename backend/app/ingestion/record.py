@@ -0,0 +1,88 @@
+from typing import Any, Dict, Optional
+
+
+class RequestLogRecord:
+    """
+    Compact request log record filled by the logging middleware.
+
+    It is a plain `__slots__` object: no validation and no per-instance dict
+    on the request path. The writer reads its attributes straight into bulk
+    insert rows; `RequestLogCreate` stays the schema of external input.
+    """
+
+    __slots__ = (
+        "relo_method",
+        "relo_url",
+        "relo_body",
+        "relo_body_size",
+        "relo_body_hash",
+        "relo_response_body",
+        "relo_response_body_hash",
+        "relo_headers",
+        "relo_headers_hash",
+        "relo_status_code",
+        "relo_ip_address",
+        "relo_device_info",
+        "relo_absolute_path",
+        "relo_query_string",
+        "relo_route_id",
+        "relo_request_duration_seconds",
+        "relo_response_size",
+        "relo_sample_weight",
+        "relo_route",
+        "header_set",
+    )
+
+    def __init__(
+        self,
+        relo_method: str,
+        relo_url: str,
+        relo_headers: Optional[Dict[str, str]],
+        relo_status_code: int,
+        relo_body: Optional[str] = None,
+        relo_body_size: Optional[int] = None,
+        relo_body_hash: Optional[str] = None,
+        relo_response_body: Optional[str] = None,
+        relo_response_body_hash: Optional[str] = None,
+        relo_headers_hash: Optional[str] = None,
+        relo_ip_address: Optional[str] = None,
+        relo_device_info: Optional[str] = None,
+        relo_absolute_path: Optional[str] = None,
+        relo_query_string: Optional[str] = None,
+        relo_route_id: Optional[int] = None,
+        relo_request_duration_seconds: Optional[float] = None,
+        relo_response_size: Optional[int] = None,
+        relo_sample_weight: float = 1.0,
+        relo_route: Optional[str] = None,
+        header_set: Optional[Dict[str, str]] = None,
+    ):
+        self.relo_method = relo_method
+        self.relo_url = relo_url
+        self.relo_body = relo_body
+        self.relo_body_size = relo_body_size
+        self.relo_body_hash = relo_body_hash
+        self.relo_response_body = relo_response_body
+        self.relo_response_body_hash = relo_response_body_hash
+        self.relo_headers = relo_headers
+        self.relo_headers_hash = relo_headers_hash
+        self.relo_status_code = relo_status_code
+        self.relo_ip_address = relo_ip_address
+        self.relo_device_info = relo_device_info
+        self.relo_absolute_path = relo_absolute_path
+        self.relo_query_string = relo_query_string
+        self.relo_route_id = relo_route_id
+        self.relo_request_duration_seconds = relo_request_duration_seconds
+        self.relo_response_size = relo_response_size
+        self.relo_sample_weight = relo_sample_weight
+
+        # Route template, resolved to relo_route_id by the writer
+        self.relo_route = relo_route
+        # Interned headers, kept until the header set is known to be stored
+        self.header_set = header_set
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        params = f"method={self.relo_method}, url={self.relo_url}, status_code={self.relo_status_code}"
+        return f"<RequestLogRecord({params})>"
@@ -0,0 +1,60 @@
+import threading
+from typing import Dict, Iterable, Iterator, Optional
+
+from backend.app.ingestion.record import RequestLogRecord
+
+
+class RouteCache:
+    """
+    Maps route templates to their id in the routes dimension table.
+
+    The set of templates is bounded by the routes of the application, so the
+    mapping is kept whole in memory and never evicted. Templates seen for the
+    first time are inserted, committed and cached before the logs that
+    reference them are written.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, template: Optional[str]) -> Optional[int]:
+        if template is None:
+            return None
+
+        return self._ids.get(template)
+
+    def resolve(self, repository, templates: Iterable[Optional[str]]):
+        """
+        Make sure every template has an id in the cache.
+
+        Args:
+            repository (RequestLogRepository): Repository used to insert the
+                unknown templates; the insert is committed right away.
+            templates (Iterable[Optional[str]]): The templates to resolve.
+        """
+        unknown = {
+            template
+            for template in templates
+            if template is not None and template not in self._ids
+        }
+        if not unknown:
+            return
+
+        route_ids = repository.get_or_create_routes(unknown)
+        with self._lock:
+            self._ids.update(route_ids)
+
+    def prepare(self, record: RequestLogRecord) -> RequestLogRecord:
+        if record.relo_route_id is None:
+            record.relo_route_id = self.get(record.relo_route)
+        return record
+
+    def prepared(
+        self, records: Iterable[RequestLogRecord]
+    ) -> Iterator[RequestLogRecord]:
+        for record in records:
+            yield self.prepare(record)
+
+
+route_cache = RouteCache()
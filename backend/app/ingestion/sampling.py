@@ -0,0 +1,199 @@
+from fnmatch import fnmatchcase
+from random import random
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from backend.app.config import settings
+
+
+class SamplingRule:
+    """
+    A request log sampling rule.
+
+    Every condition is optional; a rule without conditions matches every
+    request. Route patterns match route templates (or raw paths in head mode)
+    either exactly or, when they contain wildcards, with shell-style matching.
+    """
+
+    __slots__ = ("route", "methods", "status_classes", "min_duration", "rate")
+
+    FIELDS = {"route", "methods", "status_class", "min_duration", "rate"}
+
+    def __init__(
+        self,
+        rate: float,
+        route: Optional[str] = None,
+        methods: Optional[List[str]] = None,
+        status_class: Optional[List[int]] = None,
+        min_duration: Optional[float] = None,
+    ):
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Sampling rate must be between 0 and 1, got {rate}")
+
+        self.rate = rate
+        self.route = route
+        self.methods: Optional[FrozenSet[str]] = (
+            frozenset(method.upper() for method in methods) if methods else None
+        )
+        self.status_classes: Optional[FrozenSet[int]] = (
+            frozenset(status_class) if status_class else None
+        )
+        self.min_duration = min_duration
+
+    @classmethod
+    def from_dict(cls, rule: Dict[str, Any]) -> "SamplingRule":
+        invalid_keys = set(rule) - cls.FIELDS
+        if invalid_keys:
+            raise ValueError(f"Invalid sampling rule parameters: {invalid_keys}")
+
+        status_class = rule.get("status_class")
+        if isinstance(status_class, int):
+            status_class = [status_class]
+
+        return cls(
+            rate=rule.get("rate", 1.0),
+            route=rule.get("route"),
+            methods=rule.get("methods"),
+            status_class=status_class,
+            min_duration=rule.get("min_duration"),
+        )
+
+    @property
+    def is_tail(self) -> bool:
+        """Whether the rule needs the response to be evaluated."""
+        return self.status_classes is not None or self.min_duration is not None
+
+    def matches_request(self, method: str, route: Optional[str]) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+
+        if self.route is None:
+            return True
+
+        if route is None:
+            return False
+
+        if "*" in self.route or "?" in self.route:
+            return fnmatchcase(route, self.route)
+
+        return route == self.route
+
+    def matches_response(self, status_code: int, duration: float) -> bool:
+        if (
+            self.status_classes is not None
+            and status_code // 100 not in self.status_classes
+        ):
+            return False
+
+        if self.min_duration is not None and duration < self.min_duration:
+            return False
+
+        return True
+
+
+class RequestLogSampler:
+    """
+    Decides which request logs are persisted and with which sample weight.
+
+    Rules are evaluated in order and the first match wins; requests matching
+    no rule use `default_rate`. A kept row stores the weight 1 / rate so
+    aggregates can be re-scaled to the real traffic.
+
+    In "tail" mode the decision is taken after the response, so status and
+    latency rules apply (e.g. keep every 5xx and every slow request). In
+    "head" mode it is taken before the request is handled, from the method
+    and raw path only: rules with status or latency conditions are ignored,
+    and requests that are dropped are neither captured nor logged.
+
+    The rules applicable to each (method, route) pair are resolved once and
+    cached, so a decision only walks the few rules that can match.
+    """
+
+    MAX_CACHED_KEYS = 4096
+
+    def __init__(
+        self,
+        rules: List[Dict[str, Any]],
+        default_rate: float = 1.0,
+        mode: str = "tail",
+    ):
+        if mode not in ("head", "tail"):
+            raise ValueError(f"Invalid sampling mode: {mode}")
+
+        self.mode = mode
+        self.default_rate = default_rate
+        self.rules = [SamplingRule.from_dict(rule) for rule in rules]
+        if mode == "head":
+            self.rules = [rule for rule in self.rules if not rule.is_tail]
+
+        self._candidates: Dict[Tuple[str, Optional[str]], Tuple[SamplingRule, ...]] = {}
+
+    def head(self, method: str, path: str) -> Optional[float]:
+        """
+        Take the sampling decision before the request is handled.
+
+        Returns:
+            Optional[float]: The sample weight of a kept request, None when the
+                request must not be logged. Always 1.0 in tail mode.
+        """
+        if self.mode != "head":
+            return 1.0
+
+        rules = self._rules_for(method, path)
+        return self._sample(rules[0].rate if rules else self.default_rate)
+
+    def tail(
+        self,
+        method: str,
+        route: Optional[str],
+        status_code: int,
+        duration: float,
+        head_weight: float = 1.0,
+    ) -> Optional[float]:
+        """
+        Take the sampling decision once the response is known.
+
+        Returns:
+            Optional[float]: The sample weight of a kept request, None when the
+                request must not be logged. In head mode the head weight is
+                returned unchanged.
+        """
+        if self.mode != "tail":
+            return head_weight
+
+        for rule in self._rules_for(method, route):
+            if rule.matches_response(status_code, duration):
+                return self._sample(rule.rate)
+
+        return self._sample(self.default_rate)
+
+    def _rules_for(self, method: str, route: Optional[str]) -> Tuple[SamplingRule, ...]:
+        key = (method, route)
+        rules = self._candidates.get(key)
+        if rules is None:
+            rules = tuple(
+                rule for rule in self.rules if rule.matches_request(method, route)
+            )
+
+            # Raw paths (head mode, unmatched routes) are unbounded
+            if len(self._candidates) >= self.MAX_CACHED_KEYS:
+                self._candidates.clear()
+            self._candidates[key] = rules
+
+        return rules
+
+    @staticmethod
+    def _sample(rate: float) -> Optional[float]:
+        if rate >= 1:
+            return 1.0
+
+        if rate <= 0 or random() >= rate:
+            return None
+
+        return 1 / rate
+
+
+request_log_sampler = RequestLogSampler(
+    rules=settings.LOG_SAMPLING_RULES,
+    default_rate=settings.LOG_SAMPLING_DEFAULT_RATE,
+    mode=settings.LOG_SAMPLING_MODE,
+)
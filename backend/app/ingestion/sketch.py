@@ -0,0 +1,111 @@
+import struct
+import sys
+from array import array
+from math import ceil, floor, log
+from typing import Optional
+
+# Durations outside of this range are clamped into the first or last bin
+SKETCH_MIN_VALUE = 1e-5  # 10 microseconds
+SKETCH_MAX_VALUE = 1e3  # 1000 seconds
+
+# Relative accuracy, index of the first bin, number of bins
+_HEADER = struct.Struct("<dhH")
+
+
+class LatencySketch:
+    """
+    Mergeable quantile sketch of durations, with logarithmically spaced bins
+    (the layout of DDSketch).
+
+    Bin `k` counts the values in (gamma^(k-1), gamma^k] with
+    gamma = (1 + a) / (1 - a), so any quantile is estimated within the
+    relative accuracy `a`. The bins cover SKETCH_MIN_VALUE to
+    SKETCH_MAX_VALUE and are allocated once: the memory of a sketch is fixed
+    by its accuracy, about 3.7 KB at 1%, whatever the number of values.
+    Sketches merge by adding their bins, so the sketches of several workers
+    or time buckets combine into the sketch of all their values.
+    """
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "offset", "counts")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Invalid relative accuracy: {relative_accuracy}")
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = log(self.gamma)
+        self.offset = floor(log(SKETCH_MIN_VALUE) / self._log_gamma)
+        size = ceil(log(SKETCH_MAX_VALUE) / self._log_gamma) - self.offset + 1
+        self.counts = array("I", bytes(4 * size))
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def add(self, value: float, count: int = 1):
+        self.counts[self._index(value)] += count
+
+    def merge(self, other: "LatencySketch"):
+        if other.relative_accuracy == self.relative_accuracy:
+            for index, count in enumerate(other.counts):
+                if count:
+                    self.counts[index] += count
+            return
+
+        # Sketches of another accuracy are re-binned by their bin values
+        for index, count in enumerate(other.counts):
+            if count:
+                self.add(other._value(index), count)
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        total = self.count
+        if not total:
+            return None
+
+        rank = quantile * (total - 1)
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative > rank:
+                return self._value(index)
+
+        return self._value(len(self.counts) - 1)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch, leaving out its leading and trailing empty bins."""
+        used = [index for index, count in enumerate(self.counts) if count]
+        first, last = (used[0], used[-1] + 1) if used else (0, 0)
+
+        counts = self.counts[first:last]
+        if sys.byteorder != "little":
+            counts.byteswap()
+        return (
+            _HEADER.pack(self.relative_accuracy, self.offset + first, last - first)
+            + counts.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LatencySketch":
+        relative_accuracy, first, length = _HEADER.unpack_from(data)
+        sketch = cls(relative_accuracy)
+
+        counts = array("I")
+        counts.frombytes(data[_HEADER.size : _HEADER.size + 4 * length])
+        if sys.byteorder != "little":
+            counts.byteswap()
+
+        start = first - sketch.offset
+        sketch.counts[start : start + length] = counts
+        return sketch
+
+    def _index(self, value: float) -> int:
+        if value <= SKETCH_MIN_VALUE:
+            return 0
+
+        index = ceil(log(value) / self._log_gamma) - self.offset
+        return min(index, len(self.counts) - 1)
+
+    def _value(self, index: int) -> float:
+        # The point of the bin with the same relative error to both its bounds
+        return 2 * self.gamma ** (index + self.offset) / (self.gamma + 1)
@@ -0,0 +1,279 @@
+import json
+import struct
+import threading
+from os import fsync, listdir, makedirs, path, remove, rename
+from time import monotonic
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from backend.app.config import settings
+
+# Every record is a big-endian unsigned length followed by a JSON payload
+RECORD_HEADER = struct.Struct(">I")
+SEGMENT_SUFFIX = ".seg"
+# Appended to the segments set aside after failing to be replayed
+QUARANTINE_SUFFIX = ".failed"
+
+
+class Spool:
+    """
+    Durable local spool for request logs, used while the database is slow or
+    down.
+
+    Records are appended to segment files of at most `segment_size` bytes,
+    through a buffered file object. Only sealed segments are replayed: the
+    active one is sealed by `rotate`. The spool refuses records once its
+    segments would take more than `max_disk_usage` bytes.
+
+    `fsync_policy` controls durability:
+
+    - always: fsync after every append.
+    - interval: fsync at most every `fsync_interval` seconds; the owner calls
+      `flush` every `fsync_interval` seconds so that the tail of a burst is
+      synced too.
+    - never: leave it to the operating system.
+
+    Segments that keep failing to be replayed are renamed by `quarantine` and
+    are no longer replayed nor counted in the disk usage; renaming them back
+    puts them in the spool again at the next start.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int,
+        max_disk_usage: int,
+        fsync_policy: str = "interval",
+        fsync_interval: float = 1.0,
+    ):
+        if fsync_policy not in ("always", "interval", "never"):
+            raise ValueError(f"Invalid fsync policy: {fsync_policy}")
+
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_disk_usage = max_disk_usage
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._active: Optional[BinaryIO] = None
+        self._active_path: Optional[str] = None
+        self._active_size = 0
+        self._active_records = 0
+        self._last_fsync = monotonic()
+        self._unsynced = False
+        self._next_sequence = 0
+
+        # Sealed segment path -> (size in bytes, records)
+        self._sealed: Dict[str, Tuple[int, int]] = {}
+        self._sealed_size = 0
+        self._sealed_records = 0
+
+        self.appended = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.quarantined = 0
+
+    def open(self):
+        """Create the spool directory and recover segments left by a previous run."""
+        makedirs(self.directory, exist_ok=True)
+
+        with self._lock:
+            for name in sorted(listdir(self.directory)):
+                if not name.endswith(SEGMENT_SUFFIX):
+                    continue
+
+                segment = path.join(self.directory, name)
+                self._add_sealed(
+                    segment,
+                    path.getsize(segment),
+                    sum(1 for _ in self.read_segment(segment)),
+                )
+                self._next_sequence = max(
+                    self._next_sequence, int(name[: -len(SEGMENT_SUFFIX)]) + 1
+                )
+
+    def close(self):
+        with self._lock:
+            self._seal()
+
+    def append(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append records to the active segment.
+
+        Returns:
+            int: The number of records accepted; the rest hit the disk usage
+                ceiling and are counted in `rejected`.
+        """
+        accepted = 0
+
+        with self._lock:
+            for record in records:
+                payload = json.dumps(record, default=str).encode()
+                size = RECORD_HEADER.size + len(payload)
+
+                if self.disk_usage + size > self.max_disk_usage:
+                    break
+
+                if self._active is None or self._active_size + size > self.segment_size:
+                    self._seal()
+                    self._open_segment()
+
+                self._active.write(RECORD_HEADER.pack(len(payload)))
+                self._active.write(payload)
+                self._active_size += size
+                self._active_records += 1
+                accepted += 1
+
+            if accepted:
+                self._unsynced = True
+                self._sync()
+
+        self.appended += accepted
+        self.rejected += len(records) - accepted
+        return accepted
+
+    def rotate(self):
+        """Seal the active segment so that its records can be replayed."""
+        with self._lock:
+            self._seal()
+
+    def flush(self):
+        """Flush and fsync the records appended since the last fsync, if any."""
+        with self._lock:
+            if self._active is None or not self._unsynced:
+                return
+
+            self._active.flush()
+            if self.fsync_policy != "never":
+                fsync(self._active.fileno())
+            self._last_fsync = monotonic()
+            self._unsynced = False
+
+    def sealed_segments(self) -> List[str]:
+        with self._lock:
+            return sorted(self._sealed)
+
+    def remove_segment(self, segment: str):
+        with self._lock:
+            size, records = self._sealed.pop(segment, (0, 0))
+            self._sealed_size -= size
+            self._sealed_records -= records
+            remove(segment)
+
+        self.replayed += records
+
+    def quarantine(self, segment: str) -> str:
+        """
+        Set a sealed segment aside, so that it is no longer replayed.
+
+        Returns:
+            str: The new path of the segment.
+        """
+        quarantined = segment + QUARANTINE_SUFFIX
+        with self._lock:
+            size, records = self._sealed.pop(segment, (0, 0))
+            self._sealed_size -= size
+            self._sealed_records -= records
+            rename(segment, quarantined)
+
+        self.quarantined += records
+        return quarantined
+
+    @staticmethod
+    def read_segment(segment: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read the records of a segment. A record truncated by a crash in the
+        middle of a write ends the segment.
+        """
+        with open(segment, "rb") as segment_file:
+            while True:
+                header = segment_file.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+
+                (length,) = RECORD_HEADER.unpack(header)
+                payload = segment_file.read(length)
+                if len(payload) < length:
+                    return
+
+                yield json.loads(payload)
+
+    @property
+    def disk_usage(self) -> int:
+        return self._active_size + self._sealed_size
+
+    @property
+    def depth(self) -> int:
+        """Records waiting to be replayed."""
+        return self._active_records + self._sealed_records
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segments": len(self._sealed) + (1 if self._active else 0),
+            "depth": self.depth,
+            "disk_usage": self.disk_usage,
+            "max_disk_usage": self.max_disk_usage,
+            "appended": self.appended,
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+            "quarantined": self.quarantined,
+        }
+
+    def _open_segment(self):
+        self._active_path = path.join(
+            self.directory, f"{self._next_sequence:012d}{SEGMENT_SUFFIX}"
+        )
+        self._next_sequence += 1
+        self._active = open(self._active_path, "ab")
+        self._active_size = 0
+        self._active_records = 0
+
+    def _seal(self):
+        if self._active is None:
+            return
+
+        self._active.flush()
+        if self.fsync_policy != "never":
+            fsync(self._active.fileno())
+        self._active.close()
+        self._unsynced = False
+
+        if self._active_records:
+            self._add_sealed(self._active_path, self._active_size, self._active_records)
+        else:
+            remove(self._active_path)
+
+        self._active = None
+        self._active_path = None
+        self._active_size = 0
+        self._active_records = 0
+
+    def _add_sealed(self, segment: str, size: int, records: int):
+        self._sealed[segment] = (size, records)
+        self._sealed_size += size
+        self._sealed_records += records
+
+    def _sync(self):
+        if self.fsync_policy == "never":
+            return
+
+        now = monotonic()
+        if (
+            self.fsync_policy == "interval"
+            and now - self._last_fsync < self.fsync_interval
+        ):
+            return
+
+        self._active.flush()
+        fsync(self._active.fileno())
+        self._last_fsync = now
+        self._unsynced = False
+
+
+request_log_spool = Spool(
+    directory=settings.LOG_SPOOL_DIR,
+    segment_size=settings.LOG_SPOOL_SEGMENT_SIZE,
+    max_disk_usage=settings.LOG_SPOOL_MAX_DISK_USAGE,
+    fsync_policy=settings.LOG_SPOOL_FSYNC_POLICY,
+    fsync_interval=settings.LOG_SPOOL_FSYNC_INTERVAL,
+)
@@ -0,0 +1,373 @@
+import asyncio
+from time import monotonic, perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.app.config import settings
+from backend.app.database.base import get_session
+from backend.app.ingestion.headers import HeaderInterner
+from backend.app.ingestion.headers import header_interner as default_header_interner
+from backend.app.ingestion.record import RequestLogRecord
+from backend.app.ingestion.routes import RouteCache
+from backend.app.ingestion.routes import route_cache as default_route_cache
+from backend.app.ingestion.spool import Spool, request_log_spool
+from backend.app.metrics import (
+    metrics_registry,
+    request_log_write_batch_size,
+    request_log_write_duration,
+)
+from backend.app.repositories.logs import RequestLogRepository
+
+
+class RequestLogWriter:
+    """
+    Buffers request logs in a bounded in-process queue and writes them to the
+    database from a background flusher task, using bulk inserts.
+
+    A batch is flushed when it reaches `flush_size` rows or when
+    `flush_interval` seconds have passed since the flusher started collecting
+    it, whichever comes first. When the queue is full, `overflow_policy`
+    decides what happens to new records:
+
+    - drop: the record is discarded and counted in `dropped`.
+    - block: the caller waits until the flusher frees a slot.
+    - spill: the record is appended to the local spool.
+
+    Batches that fail to be written are appended to the spool as well, and
+    for `retry_interval` seconds after a failure batches go straight to the
+    spool instead of waiting on an unhealthy database. A replay task drains
+    the spool back into the database once writes succeed again; a segment
+    that fails `max_replay_attempts` replays in a row is quarantined, so that
+    it does not hold back the newer ones.
+
+    Request headers are interned as shared header sets and route templates
+    resolved to route ids when the records are written, see `HeaderInterner`
+    and `RouteCache`.
+    """
+
+    def __init__(
+        self,
+        flush_size: int,
+        flush_interval: float,
+        capacity: int,
+        overflow_policy: str = "drop",
+        spool: Optional[Spool] = None,
+        retry_interval: float = 5.0,
+        max_replay_attempts: int = 5,
+        header_interner: Optional[HeaderInterner] = None,
+        route_cache: Optional[RouteCache] = None,
+    ):
+        if overflow_policy not in ("drop", "block", "spill"):
+            raise ValueError(f"Invalid overflow policy: {overflow_policy}")
+
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+        self.overflow_policy = overflow_policy
+        self.spool = spool
+        self.retry_interval = retry_interval
+        self.max_replay_attempts = max_replay_attempts
+        self.header_interner = header_interner or default_header_interner
+        self.route_cache = route_cache or default_route_cache
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self._task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._unhealthy_until = 0.0
+        # Sealed segment path -> failed replays in a row
+        self._replay_failures: Dict[str, int] = {}
+
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        self._stopping = False
+        if self.spool is not None:
+            self.spool.open()
+            self._replay_task = asyncio.create_task(self._replay())
+            if self.spool.fsync_policy == "interval":
+                self._sync_task = asyncio.create_task(self._sync_spool())
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stop accepting new flush cycles and wait for the queue to drain.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for the drain.
+                Records still queued afterwards are spooled or dropped.
+        """
+        if self._task is None:
+            return
+
+        self._stopping = True
+        for task in (self._replay_task, self._sync_task):
+            if task is not None:
+                task.cancel()
+        self._replay_task = None
+        self._sync_task = None
+
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            print("Request log writer did not drain in time.")
+            await self._discard_pending()
+        finally:
+            self._task = None
+
+        if self.spool is not None:
+            self.spool.close()
+
+        print(
+            f"Request log writer stopped: written={self.written}, "
+            f"dropped={self.dropped}, spilled={self.spilled}, failed={self.failed}"
+        )
+
+    async def enqueue(self, record: RequestLogRecord):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy == "block":
+            await self.queue.put(record)
+        elif self.overflow_policy == "spill":
+            await self._spill([record])
+        else:
+            self.dropped += 1
+
+    @property
+    def healthy(self) -> bool:
+        return monotonic() >= self._unhealthy_until
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.capacity,
+            "healthy": self.healthy,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "failed": self.failed,
+            "spool": self.spool.stats() if self.spool is not None else None,
+        }
+
+    async def _run(self):
+        while not (self._stopping and self.queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> List[RequestLogRecord]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+
+        while len(batch) < self.flush_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0 or self._stopping:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _flush(self, batch: List[RequestLogRecord]):
+        # Do not wait on a database that just failed, spool straight away
+        if not self.healthy and self.spool is not None:
+            await self._spill(batch)
+            return
+
+        request_log_write_batch_size.observe(len(batch))
+        write_start = perf_counter()
+        try:
+            # The database driver is synchronous: keep it off the event loop
+            self.written += await asyncio.to_thread(self._write, batch)
+            request_log_write_duration.observe(perf_counter() - write_start)
+        except Exception as e:
+            print(f"Error writing {len(batch)} request logs: {e}")
+            self._unhealthy_until = monotonic() + self.retry_interval
+            if self.spool is not None:
+                await self._spill(batch)
+            else:
+                self.failed += len(batch)
+
+    def _write(self, batch: List[RequestLogRecord]) -> int:
+        with get_session("writer") as db_session:
+            repository = RequestLogRepository(db_session)
+            self.route_cache.resolve(repository, (r.relo_route for r in batch))
+            interned = self.header_interner.intern(repository, batch)
+            written = repository.create_many(self.route_cache.prepared(batch))
+
+        self.header_interner.remember(interned)
+        return written
+
+    async def _replay(self):
+        """Drain sealed spool segments into the database, oldest first."""
+        while True:
+            await asyncio.sleep(self.retry_interval)
+
+            if not self.healthy or not self.spool.depth:
+                continue
+
+            self.spool.rotate()
+            for segment in self.spool.sealed_segments():
+                try:
+                    # One transaction per segment: a failed replay leaves the
+                    # segment in place and nothing half-written
+                    written = await asyncio.to_thread(self._replay_segment, segment)
+                except Exception as e:
+                    print(f"Error replaying spool segment {segment}: {e}")
+                    failures = self._replay_failures.get(segment, 0) + 1
+                    if failures < self.max_replay_attempts:
+                        self._replay_failures[segment] = failures
+                        self._unhealthy_until = monotonic() + self.retry_interval
+                        break
+
+                    # Most likely the segment itself is at fault: set it aside
+                    # and go on with the newer ones
+                    self._replay_failures.pop(segment, None)
+                    quarantined = self.spool.quarantine(segment)
+                    print(
+                        f"Quarantined spool segment {segment} as {quarantined} "
+                        f"after {failures} failed replays."
+                    )
+                    continue
+
+                self._replay_failures.pop(segment, None)
+                self.spool.remove_segment(segment)
+                self.written += written
+
+    async def _sync_spool(self):
+        """Sync the records spilled since the last fsync, see `Spool.flush`."""
+        while True:
+            await asyncio.sleep(self.spool.fsync_interval)
+
+            try:
+                await asyncio.to_thread(self.spool.flush)
+            except OSError as e:
+                print(f"Error syncing the spool in {self.spool.directory}: {e}")
+
+    def _replay_segment(self, segment: str) -> int:
+        # Two passes over the segment, so it is never held in memory: one to
+        # intern its header sets and collect its routes, one to stream its
+        # records
+        templates = set()
+
+        def collect_routes(records: Iterator[RequestLogRecord]):
+            for record in records:
+                templates.add(record.relo_route)
+                yield record
+
+        with get_session("writer") as db_session:
+            repository = RequestLogRepository(db_session)
+            interned = self.header_interner.intern(
+                repository, collect_routes(self._segment_records(segment))
+            )
+            self.route_cache.resolve(repository, templates)
+            written = repository.create_many(
+                self.route_cache.prepared(
+                    self.header_interner.prepared(self._segment_records(segment))
+                )
+            )
+
+        self.header_interner.remember(interned)
+        return written
+
+    def _segment_records(self, segment: str) -> Iterator[RequestLogRecord]:
+        for record in self.spool.read_segment(segment):
+            yield RequestLogRecord(**record)
+
+    async def _spill(self, records: List[RequestLogRecord]):
+        if self.spool is None:
+            self.dropped += len(records)
+            return
+
+        try:
+            # Appends write and may fsync: keep them off the event loop too
+            accepted = await asyncio.to_thread(
+                self.spool.append, [record.as_dict() for record in records]
+            )
+        except OSError as e:
+            print(f"Error spooling request logs to {self.spool.directory}: {e}")
+            accepted = 0
+
+        self.spilled += accepted
+        self.dropped += len(records) - accepted
+
+    async def _discard_pending(self):
+        pending = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+
+        await self._spill(pending)
+
+
+request_log_writer = RequestLogWriter(
+    flush_size=settings.LOG_WRITER_FLUSH_SIZE,
+    flush_interval=settings.LOG_WRITER_FLUSH_INTERVAL,
+    capacity=settings.LOG_WRITER_QUEUE_CAPACITY,
+    overflow_policy=settings.LOG_WRITER_OVERFLOW_POLICY,
+    spool=request_log_spool if settings.LOG_SPOOL_ENABLED else None,
+    retry_interval=settings.LOG_SPOOL_REPLAY_INTERVAL,
+    max_replay_attempts=settings.LOG_SPOOL_MAX_REPLAY_ATTEMPTS,
+)
+
+metrics_registry.gauge(
+    "request_log_queue_depth",
+    "Request logs waiting in the writer queue.",
+    request_log_writer.queue.qsize,
+)
+metrics_registry.counter(
+    "request_log_written_total",
+    "Request logs written to the database.",
+    lambda: request_log_writer.written,
+)
+metrics_registry.counter(
+    "request_log_dropped_total",
+    "Request logs dropped by the writer.",
+    lambda: request_log_writer.dropped,
+)
+metrics_registry.counter(
+    "request_log_spilled_total",
+    "Request logs spilled to the local spool.",
+    lambda: request_log_writer.spilled,
+)
+metrics_registry.counter(
+    "request_log_failed_total",
+    "Request logs lost after a failed write.",
+    lambda: request_log_writer.failed,
+)
+if request_log_writer.spool is not None:
+    metrics_registry.gauge(
+        "request_log_spool_depth",
+        "Request logs waiting in the local spool.",
+        lambda: request_log_writer.spool.depth,
+    )
+    metrics_registry.gauge(
+        "request_log_spool_bytes",
+        "Disk usage of the local spool.",
+        lambda: request_log_writer.spool.disk_usage,
+    )
+    metrics_registry.counter(
+        "request_log_spool_quarantined_total",
+        "Spooled request logs set aside after failing to be replayed.",
+        lambda: request_log_writer.spool.quarantined,
+    )
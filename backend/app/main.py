@@ -9,6 +9,9 @@ from slowapi.errors import RateLimitExceeded
 
 from backend.app.database.base import init_database
 from backend.app.middlewares.logs import AsyncRequestLoggingMiddleware
+from backend.app.ingestion.aggregator import request_aggregator
+from backend.app.ingestion.writer import request_log_writer
+from backend.app.metrics import metrics_registry
 from backend.app.scheduler.bundler import task_orchestrator
 from backend.app.routers.bundler import routers
 from backend.app.config import settings
@@ -18,10 +21,23 @@ from backend.app.config import settings
 async def lifespan(app: FastAPI):
     database = init_database()
 
+    request_log_writer.start()
+    print("Request log writer started!")
+
+    if settings.REQUEST_STATS_ENABLED:
+        request_aggregator.start()
+    metrics_registry.start()
+
     task_orchestrator.start()
     print("Scheduler started!")
 
     yield
+
+    # Drain buffered request logs while the database is still reachable
+    await request_log_writer.stop(settings.LOG_WRITER_SHUTDOWN_TIMEOUT)
+    await request_aggregator.stop()
+    await metrics_registry.stop()
+    await database.disconnect_async()
     database.disconnect()
 
     task_orchestrator.shutdown()
@@ -0,0 +1,320 @@
+import asyncio
+import json
+from bisect import bisect_left
+from os import getpid, listdir, makedirs, path, remove, replace
+from time import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.app.config import settings
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)  # fmt: skip
+OVERHEAD_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025,
+    0.0005, 0.001, 0.0025, 0.005, 0.01,
+)  # fmt: skip
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000, 100000000)
+BATCH_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 5000)
+POOL_WAIT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30,
+)  # fmt: skip
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Each label set owns a flat list of per-bucket counts followed by the sum
+    of the observations: an observation is a bisect and two list updates, no
+    lock and no allocation once the label set has been seen. Counts are made
+    cumulative only when rendered.
+    """
+
+    __slots__ = ("name", "documentation", "buckets", "label_names", "series")
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        counts = self.series.get(labels)
+        if counts is None:
+            # One slot per bucket, one for +Inf and one for the sum
+            counts = self.series[labels] = [0] * (len(self.buckets) + 2)
+
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class MetricsRegistry:
+    """
+    Registry of the application metrics, rendered in Prometheus text format.
+
+    Histograms, and the gauges and counters read from callbacks, are per
+    process. When `directory` is set, every worker
+    periodically writes a snapshot of its metrics to `<directory>/<pid>.json`
+    and rendering merges the snapshots of all workers that synced within
+    `stale_after` seconds, so any worker can answer a scrape for all of them.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        sync_interval: float = 5.0,
+        stale_after: float = 60.0,
+    ):
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.stale_after = stale_after
+
+        self.histograms: Dict[str, Histogram] = {}
+        self.values: Dict[str, Tuple[str, str, Callable[[], float]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str] = (),
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, buckets, label_names)
+        self.histograms[name] = histogram
+        return histogram
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], float],
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Register a gauge whose value is read from `collect` when rendered.
+
+        The series of a metric with several label sets are registered once
+        per label set, one after the other.
+        """
+        self.values[_series_name(name, labels)] = ("gauge", documentation, collect)
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], float],
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """Register a counter whose value is read from `collect` when rendered."""
+        self.values[_series_name(name, labels)] = ("counter", documentation, collect)
+
+    def start(self):
+        if self.directory is None or self._task is not None:
+            return
+
+        makedirs(self.directory, exist_ok=True)
+        self._task = asyncio.create_task(self._sync_periodically())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        self._task = None
+
+        try:
+            remove(self._snapshot_path())
+        except OSError:
+            pass
+
+    def snapshot(self) -> Dict[str, Dict]:
+        values = {}
+        for name, (_, _, collect) in self.values.items():
+            try:
+                values[name] = float(collect())
+            except Exception as e:
+                print(f"Error collecting metric {name}: {e}")
+
+        return {
+            "histograms": {
+                name: [
+                    [list(labels), list(counts)] for labels, counts in h.series.items()
+                ]
+                for name, h in self.histograms.items()
+            },
+            "values": values,
+        }
+
+    def sync(self):
+        """Write the snapshot of this worker atomically."""
+        snapshot_path = self._snapshot_path()
+        with open(f"{snapshot_path}.tmp", "w", encoding="utf-8") as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file)
+        replace(f"{snapshot_path}.tmp", snapshot_path)
+
+    def collect(self) -> Dict[str, Dict]:
+        """Merge the snapshots of every live worker, this one included."""
+        if self.directory is None:
+            return self.snapshot()
+
+        self.sync()
+
+        merged = {"histograms": {}, "values": {}}
+        for name in listdir(self.directory):
+            snapshot_path = path.join(self.directory, name)
+            if not name.endswith(".json"):
+                continue
+
+            try:
+                if time() - path.getmtime(snapshot_path) > self.stale_after:
+                    continue
+                with open(snapshot_path, encoding="utf-8") as snapshot_file:
+                    snapshot = json.load(snapshot_file)
+            except (OSError, ValueError):
+                continue
+
+            for metric, series in snapshot["histograms"].items():
+                merged_series = merged["histograms"].setdefault(metric, {})
+                for labels, counts in series:
+                    labels = tuple(labels)
+                    current = merged_series.get(labels)
+                    merged_series[labels] = (
+                        counts
+                        if current is None
+                        else [a + b for a, b in zip(current, counts)]
+                    )
+
+            for metric, value in snapshot["values"].items():
+                merged["values"][metric] = merged["values"].get(metric, 0) + value
+
+        merged["histograms"] = {
+            metric: list(series.items())
+            for metric, series in merged["histograms"].items()
+        }
+        return merged
+
+    def render(self) -> str:
+        collected = self.collect()
+        lines = []
+
+        for name, histogram in self.histograms.items():
+            lines.append(f"# HELP {name} {histogram.documentation}")
+            lines.append(f"# TYPE {name} histogram")
+
+            for labels, counts in collected["histograms"].get(name, []):
+                base = [
+                    f'{label}="{_escape(value)}"'
+                    for label, value in zip(histogram.label_names, labels)
+                ]
+
+                cumulative = 0
+                bounds = [*map(_format_number, histogram.buckets), "+Inf"]
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    labels_text = ",".join([*base, f'le="{bound}"'])
+                    lines.append(f"{name}_bucket{{{labels_text}}} {cumulative}")
+
+                labels_text = "{" + ",".join(base) + "}" if base else ""
+                lines.append(f"{name}_sum{labels_text} {_format_number(counts[-1])}")
+                lines.append(f"{name}_count{labels_text} {cumulative}")
+
+        described = set()
+        for name, (metric_type, documentation, _) in self.values.items():
+            if name not in collected["values"]:
+                continue
+
+            metric = name.split("{", 1)[0]
+            if metric not in described:
+                described.add(metric)
+                lines.append(f"# HELP {metric} {documentation}")
+                lines.append(f"# TYPE {metric} {metric_type}")
+            lines.append(f"{name} {_format_number(collected['values'][name])}")
+
+        return "\n".join(lines) + "\n"
+
+    async def _sync_periodically(self):
+        while True:
+            try:
+                self.sync()
+            except OSError as e:
+                print(f"Error syncing metrics to {self.directory}: {e}")
+
+            await asyncio.sleep(self.sync_interval)
+
+    def _snapshot_path(self) -> str:
+        return path.join(self.directory, f"{getpid()}.json")
+
+
+def _series_name(name: str, labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return name
+
+    labels_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return f"{name}{{{labels_text}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+metrics_registry = MetricsRegistry(
+    directory=settings.METRICS_DIR,
+    sync_interval=settings.METRICS_SYNC_INTERVAL,
+    stale_after=settings.METRICS_STALE_AFTER,
+)
+
+REQUEST_LABELS = ("route", "status")
+
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling requests, response streaming included.",
+    LATENCY_BUCKETS,
+    REQUEST_LABELS,
+)
+http_response_size = metrics_registry.histogram(
+    "http_response_size_bytes",
+    "Size of the response bodies.",
+    SIZE_BUCKETS,
+    REQUEST_LABELS,
+)
+request_log_capture_duration = metrics_registry.histogram(
+    "request_log_capture_seconds",
+    "Time the logging middleware spends capturing bodies and building records.",
+    OVERHEAD_BUCKETS,
+    REQUEST_LABELS,
+)
+request_log_enqueue_duration = metrics_registry.histogram(
+    "request_log_enqueue_seconds",
+    "Time the logging middleware spends handing records to the writer.",
+    OVERHEAD_BUCKETS,
+    REQUEST_LABELS,
+)
+request_log_write_duration = metrics_registry.histogram(
+    "request_log_write_seconds",
+    "Time the writer spends writing a batch of request logs to the database.",
+    LATENCY_BUCKETS,
+)
+request_log_write_batch_size = metrics_registry.histogram(
+    "request_log_write_batch_size",
+    "Number of request logs per database write.",
+    BATCH_BUCKETS,
+)
+db_pool_checkout_wait = metrics_registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection of the pool, opening it included.",
+    POOL_WAIT_BUCKETS,
+    ("pool",),
+)
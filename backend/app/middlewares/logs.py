@@ -1,57 +1,202 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, StreamingResponse
-from time import time, strftime, localtime
-from io import BytesIO
+from starlette.datastructures import Headers, URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from time import perf_counter, time
+from typing import Optional, Tuple
 
-from backend.app.schemas import RequestLogCreate
-from backend.app.repositories.logs import RequestLogRepository
-from backend.app.database.base import get_session
+from backend.app.config import settings
+from backend.app.ingestion.capture import (
+    BodyCapture,
+    BodyCapturePolicy,
+    body_capture_policy,
+)
+from backend.app.ingestion.aggregator import RequestAggregator, request_aggregator
+from backend.app.ingestion.record import RequestLogRecord
+from backend.app.ingestion.sampling import RequestLogSampler, request_log_sampler
+from backend.app.ingestion.writer import request_log_writer
+from backend.app.metrics import (
+    http_request_duration,
+    http_response_size,
+    request_log_capture_duration,
+    request_log_enqueue_duration,
+)
+from backend.app.utils.routes import route_template
 
 
-class AsyncRequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class AsyncRequestLoggingMiddleware:
+    """
+    Pure ASGI middleware that logs every HTTP request.
+
+    The request and response messages are passed through untouched: bodies
+    are read once, by the application, and the middleware only observes the
+    chunks on their way. At most the byte limits of the capture policy are
+    kept in memory, so uploads, downloads and streaming endpoints keep
+    constant memory and their first-byte latency.
+
+    Each request goes through the sampler: dropped requests are not logged
+    and kept ones carry their sample weight. Every request, sampled or not,
+    is counted in the latency and response size metrics and fed to the
+    request aggregator, and the time spent capturing and enqueueing logs in
+    the logging overhead metrics.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        capture_policy: Optional[BodyCapturePolicy] = None,
+        sampler: Optional[RequestLogSampler] = None,
+        capture_query_string: Optional[bool] = None,
+        aggregator: Optional[RequestAggregator] = None,
+    ):
+        self.app = app
+        self.capture_policy = capture_policy or body_capture_policy
+        self.sampler = sampler or request_log_sampler
+        self.capture_query_string = (
+            settings.LOG_CAPTURE_QUERY_STRING
+            if capture_query_string is None
+            else capture_query_string
+        )
+        if aggregator is None and settings.REQUEST_STATS_ENABLED:
+            aggregator = request_aggregator
+        self.aggregator = aggregator
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        head_weight = self.sampler.head(scope["method"], path)
+        logged = head_weight is not None
+
         start_time = time()
+        headers = Headers(scope=scope)
 
-        # Call the next middleware or endpoint
-        response: Response = await call_next(request)
+        if logged:
+            request_capture = self.capture_policy.request_capture(
+                path, headers.get("content-type")
+            )
+        else:
+            request_capture = BodyCapture(0, digest=False)
+        response_capture = BodyCapture(0, digest=False)
+        response = {"status_code": 500, "size": 0, "capture_time": 0.0}
 
-        process_time = time() - start_time
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                capture_start = perf_counter()
+                request_capture.feed(message.get("body", b""))
+                response["capture_time"] += perf_counter() - capture_start
+            return message
 
-        # Capture response body from StreamingResponse
-        response_body = b""
-        async for chunk in response.body_iterator:
-            response_body += chunk
+        async def send_wrapper(message: Message):
+            nonlocal response_capture
 
-        # Create a new StreamingResponse with the body content
-        response = StreamingResponse(
-            BytesIO(response_body),
-            headers=dict(response.headers),
-            status_code=response.status_code,
-            media_type=response.media_type,
-        )
-        response_size = len(response_body)
+            if message["type"] == "http.response.start":
+                response["status_code"] = message["status"]
+                if logged:
+                    content_type = Headers(raw=message.get("headers", [])).get(
+                        "content-type"
+                    )
+                    response_capture = self.capture_policy.response_capture(
+                        path, content_type
+                    )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                response["size"] += len(chunk)
+                capture_start = perf_counter()
+                response_capture.feed(chunk)
+                response["capture_time"] += perf_counter() - capture_start
+
+            await send(message)
 
-        log_data = {
-            "relo_method": request.method,
-            "relo_url": str(request.url),
-            "relo_body": (
-                (await request.body()).decode() if await request.body() else ""
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            process_time = time() - start_time
+            route = route_template(scope)
+            labels = (route or "unmatched", f"{response['status_code'] // 100}xx")
+            http_request_duration.observe(process_time, *labels)
+            http_response_size.observe(response["size"], *labels)
+            if self.aggregator is not None:
+                self.aggregator.observe(
+                    route, response["status_code"], process_time, response["size"]
+                )
+
+            sample_weight = None
+            if logged:
+                sample_weight = self.sampler.tail(
+                    scope["method"],
+                    route,
+                    response["status_code"],
+                    process_time,
+                    head_weight,
+                )
+            if sample_weight is not None:
+                await self.log_request(
+                    scope,
+                    headers,
+                    request_capture,
+                    response_capture,
+                    response["status_code"],
+                    response["size"],
+                    process_time,
+                    sample_weight,
+                    response["capture_time"],
+                    labels,
+                )
+
+    async def log_request(
+        self,
+        scope: Scope,
+        headers: Headers,
+        request_capture: BodyCapture,
+        response_capture: BodyCapture,
+        status_code: int,
+        response_size: int,
+        process_time: float,
+        sample_weight: float,
+        capture_time: float = 0.0,
+        labels: Tuple[str, str] = ("unmatched", "5xx"),
+    ):
+        build_start = perf_counter()
+        url = URL(scope=scope)
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        client = scope.get("client")
+
+        body, body_size, body_hash = request_capture.result()
+        if not body_size and headers.get("content-length", "").isdigit():
+            # The application did not read the body: trust the declared size
+            body_size = int(headers["content-length"])
+        response_body, _, response_body_hash = response_capture.result()
+
+        record = RequestLogRecord(
+            relo_method=scope["method"],
+            relo_url=url.path,
+            relo_body=body,
+            relo_body_size=body_size,
+            relo_body_hash=body_hash,
+            relo_response_body=response_body,
+            relo_response_body_hash=response_body_hash,
+            relo_headers=dict(headers),
+            relo_status_code=status_code,
+            relo_ip_address=client[0] if client else None,
+            relo_device_info=headers.get("user-agent", "Unknown"),
+            relo_absolute_path=str(url).split("?", 1)[0],
+            relo_query_string=(
+                query_string if query_string and self.capture_query_string else None
             ),
-            "relo_headers": dict(request.headers),
-            "relo_status_code": response.status_code,
-            "relo_ip_address": request.client.host,
-            "relo_device_info": request.headers.get("user-agent", "Unknown"),
-            "relo_absolute_path": str(request.url),
-            "relo_request_duration_seconds": f"{process_time:.6f}",
-            "relo_response_size": response_size,
-            "relo_inserted_at": strftime("%Y-%m-%d %H:%M:%S", localtime(start_time)),
-        }
-
-        log = RequestLogCreate(**log_data)
-
-        with get_session() as db_session:
-            log_repository = RequestLogRepository(db_session)
-            log_repository.create(log)
-
-        return response
+            relo_route=route_template(scope),
+            relo_request_duration_seconds=round(process_time, 6),
+            relo_response_size=response_size,
+            relo_sample_weight=sample_weight,
+        )
+
+        enqueue_start = perf_counter()
+        request_log_capture_duration.observe(
+            capture_time + enqueue_start - build_start, *labels
+        )
+
+        # Hand the record over to the background writer, which serializes it
+        # off the request path
+        await request_log_writer.enqueue(record)
+        request_log_enqueue_duration.observe(perf_counter() - enqueue_start, *labels)
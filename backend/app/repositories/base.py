@@ -1,8 +1,35 @@
+import base64
+import json
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
 
 
 class BaseRepository(ABC):
+    # Mapped class and (insertion time, id) column names used by get_page;
+    # the table needs an index on these two columns
+    MODEL: Any = None
+    CURSOR_COLUMNS: Tuple[str, str] = ()
+
     def __init__(self, session):
         self.session = session
 
@@ -25,3 +52,136 @@ class BaseRepository(ABC):
     @abstractmethod
     def get_all(self, limit: int = 100, offset: int = 0) -> List[Any]:
         pass
+
+    def get_page(self, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        """
+        The rows inserted before `cursor`, newest first.
+
+        Args:
+            limit (int): Maximum number of rows of the page.
+            cursor (str, optional): The `next_cursor` of the previous page,
+                None for the first page.
+
+        Returns:
+            Page: The rows and the cursor of the next page, None on the last
+                page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        return self.paginate(select(self.MODEL), limit, cursor)
+
+    def paginate(
+        self,
+        query: Select,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        transform: Optional[Callable[..., Any]] = None,
+    ) -> Page:
+        """
+        Keyset pagination of `query` on CURSOR_COLUMNS, descending.
+
+        Instead of skipping `offset` rows, each page starts with an index seek
+        right after the last row of the previous page, so every page costs
+        the same and rows inserted meanwhile do not shift the pages.
+
+        Args:
+            query (Select): A select led by MODEL.
+            transform (Callable, optional): Builds an item from the columns
+                of a result row; defaults to its first column.
+        """
+        if not self.CURSOR_COLUMNS:
+            raise NotImplementedError(f"{type(self).__name__} has no cursor columns")
+
+        keys = [getattr(self.MODEL, name) for name in self.CURSOR_COLUMNS]
+        if cursor is not None:
+            query = query.where(tuple_(*keys) < tuple_(*self._decode_cursor(cursor)))
+
+        rows = self.session.execute(
+            query.order_by(*(key.desc() for key in keys)).limit(limit + 1)
+        ).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1][0])
+
+        return Page(
+            [transform(*row) if transform else row[0] for row in rows], next_cursor
+        )
+
+    def _encode_cursor(self, item: Any) -> str:
+        # Items are mapped objects, or rows by column name
+        if isinstance(item, Mapping):
+            values = [item[name] for name in self.CURSOR_COLUMNS]
+        else:
+            values = [getattr(item, name) for name in self.CURSOR_COLUMNS]
+        payload = json.dumps(
+            [v.isoformat() if isinstance(v, datetime) else str(v) for v in values]
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            values = json.loads(
+                base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            )
+            if not isinstance(values, list) or len(values) != len(self.CURSOR_COLUMNS):
+                raise ValueError
+
+            decoded = []
+            for name, value in zip(self.CURSOR_COLUMNS, values):
+                python_type = getattr(self.MODEL, name).type.python_type
+                if python_type is datetime:
+                    decoded.append(datetime.fromisoformat(value))
+                else:
+                    decoded.append(python_type(value))
+            return decoded
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class AsyncBaseRepository(ABC):
+    """
+    Async variant of a repository, on an AsyncSession.
+
+    The queries are those of SYNC_REPOSITORY, run through
+    `AsyncSession.run_sync`: the synchronous session it hands over is bound
+    to the asyncpg connection, so each query is awaited on the event loop
+    without a worker thread. Returned objects are loaded; relationships that
+    were not loaded by the repository must not be accessed afterwards.
+    """
+
+    SYNC_REPOSITORY: Type[BaseRepository]
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def run_sync(self, method: str, *args, **kwargs) -> Any:
+        """Await a method of the synchronous repository on this session."""
+        return await self.session.run_sync(
+            lambda session: getattr(self.SYNC_REPOSITORY(session), method)(
+                *args, **kwargs
+            )
+        )
+
+    async def create(self, data: Dict[str, Any]) -> Any:
+        return await self.run_sync("create", data)
+
+    async def update(self, id: Any, data: Dict[str, Any]) -> Optional[Any]:
+        return await self.run_sync("update", id, data)
+
+    async def get_by_id(self, id: Any) -> Optional[Any]:
+        return await self.run_sync("get_by_id", id)
+
+    async def delete_by_id(self, id: Any) -> bool:
+        return await self.run_sync("delete_by_id", id)
+
+    async def get_all(self, limit: int = 100, offset: int = 0) -> List[Any]:
+        return await self.run_sync("get_all", limit=limit, offset=offset)
+
+    async def get_page(
+        self, limit: int = 100, cursor: Optional[str] = None, **kwargs
+    ) -> Page:
+        """See `BaseRepository.get_page`."""
+        return await self.run_sync("get_page", limit=limit, cursor=cursor, **kwargs)
@@ -1,20 +1,125 @@
 # app/repositories/request_log_repository.py
-from datetime import datetime, timedelta
-from sqlalchemy import delete
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import (
+    Float,
+    Select,
+    cast,
+    delete,
+    func,
+    insert,
+    text,
+    true,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array, insert as pg_insert
 from sqlalchemy.future import select
-from typing import Dict, Any, List, Annotated, Optional
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import (
+    Dict,
+    Any,
+    List,
+    Annotated,
+    Optional,
+    Iterable,
+    Iterator,
+    Callable,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Union,
+)
 from fastapi import Depends
 
 
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from backend.app.database.models.logs import TaskLog, RequestLog
-from backend.app.schemas import TaskLogCreate, RequestLogCreate
-from backend.app.database.base import get_session
-from backend.app.repositories.base import BaseRepository
+from backend.app.database.models.logs import (
+    ROLLUP_LATENCY_BUCKETS,
+    LogArchive,
+    TaskLog,
+    RequestLog,
+    RequestHeaderSet,
+    RequestLogRollup,
+    RequestStat,
+    Route,
+)
+from backend.app.database.models.tasks import JobWatermark
+from backend.app.config import settings
+from backend.app.database.indexes import request_log_indexes
+from backend.app.database.retention import (
+    RetentionPolicy,
+    compile_policies,
+    retention_horizon,
+)
+from backend.app.schemas import TaskLogCreate, RequestLogCreate, RequestLogFilters
+from backend.app.database.base import get_async_session, get_session
+from backend.app.ingestion.sketch import LatencySketch
+from backend.app.repositories.base import AsyncBaseRepository, BaseRepository, Page
+from backend.app.utils.archive import (
+    ArchiveFile,
+    read_newest,
+    remove_archive,
+    write_archive,
+)
+from backend.app.utils.database import (
+    DeletionProgress,
+    bulk_insert,
+    create_range_partition,
+    delete_in_batches,
+    drop_partition,
+    estimate_rows,
+    find_row_cutoff,
+    get_partitions,
+)
+
+LATENCY_PERCENTILES = (0.5, 0.9, 0.99)
+
+# Length and name suffix format of the request_logs partitions
+PARTITION_INTERVALS = {"day": timedelta(days=1), "hour": timedelta(hours=1)}
+PARTITION_SUFFIXES = {"day": "%Y%m%d", "hour": "%Y%m%d%H"}
+
+# Archived columns of request_logs: the headers are stored merged
+REQUEST_LOG_ARCHIVE_COLUMNS = [
+    archived
+    for archived in RequestLog.__table__.columns
+    if archived.key != "relo_headers_hash"
+]
+
+
+class ArchivePlan(NamedTuple):
+    """
+    The archive files to read to fill a page of request logs past the hot
+    table, see `RequestLogRepository.archive_plan`.
+    """
+
+    page: Page  # The page from the hot table
+    limit: int
+    files: List[Tuple[str, datetime]]  # Paths and newest row, newest first
+    filters: List[Tuple[str, str, Any]]
+    before: Optional[Tuple[datetime, str]]
+
+    def read(self) -> List[Dict[str, Any]]:
+        """The archived rows of the page, and one more if there is a next page."""
+        return read_newest(
+            self.files,
+            REQUEST_LOG_ARCHIVE_COLUMNS,
+            "relo_inserted_at",
+            "relo_id",
+            self.limit - len(self.page.items) + 1,
+            self.filters,
+            self.before,
+        )
 
 
 class RequestLogRepository(BaseRepository):
+    MODEL = RequestLog
+    CURSOR_COLUMNS = ("relo_inserted_at", "relo_id")
+
+    # Column order of the tuples accepted by create_many
+    COLUMNS = tuple(RequestLogCreate.model_fields)
+
     def create(self, log: RequestLogCreate) -> RequestLog:
         db_log = RequestLog(**log.model_dump())
         self.session.add(db_log)
@@ -22,12 +127,64 @@ class RequestLogRepository(BaseRepository):
         self.session.refresh(db_log)
         return db_log
 
+    def create_many(self, logs: Iterable[Union[Any, Dict[str, Any], Tuple]]) -> int:
+        """
+        Bulk insert request logs without building ORM instances.
+
+        Rows are streamed with COPY FROM STDIN on PostgreSQL and inserted
+        with multi-row INSERTs on other dialects.
+
+        Args:
+            logs (Iterable[Union[Any, Dict[str, Any], Tuple]]): Request logs as
+                dicts, tuples in `COLUMNS` order or objects with the column
+                attributes (`RequestLogCreate`, `RequestLogRecord`).
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        inserted = bulk_insert(
+            self.session,
+            RequestLog.__table__,
+            ("relo_id", *self.COLUMNS),
+            _log_rows(logs, self.COLUMNS, {"relo_sample_weight": 1.0}),
+        )
+        self.session.commit()
+        return inserted
+
     def update(self, id: UUID, data: Dict[str, Any]) -> Optional[RequestLog]:
         # Not typically used for RequestLog, but implemented for completeness
         return None
 
+    def create_header_sets(self, header_sets: Dict[str, Dict[str, str]]):
+        """
+        Insert the header sets that do not exist yet. The caller commits.
+
+        Args:
+            header_sets (Dict[str, Dict[str, str]]): Header sets by hash.
+        """
+        # Sorted so that concurrent writers lock the keys in the same order
+        statement = (
+            pg_insert(RequestHeaderSet)
+            .values(
+                [
+                    {"hese_hash": header_hash, "hese_headers": header_sets[header_hash]}
+                    for header_hash in sorted(header_sets)
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["hese_hash"])
+        )
+        self.session.execute(statement)
+
     def get_by_id(self, id: UUID) -> Optional[RequestLog]:
-        return self.session.get(RequestLog, id)
+        # The primary key also holds the partition key, relo_id alone is unique
+        log = self.session.scalars(
+            select(RequestLog).where(RequestLog.relo_id == id)
+        ).first()
+        if log is not None and log.header_set is not None:
+            _set_headers(
+                log, {**log.header_set.hese_headers, **(log.relo_headers or {})}
+            )
+        return log
 
     def delete_by_id(self, id: UUID) -> bool:
         log = self.get_by_id(id)
@@ -38,27 +195,1213 @@ class RequestLogRepository(BaseRepository):
         return True
 
     def get_all(self, limit: int = 100, offset: int = 0) -> List[RequestLog]:
-        result = self.session.execute(select(RequestLog).offset(offset).limit(limit))
-        return result.scalars().all()
+        result = self.session.execute(
+            select(RequestLog, expanded_headers())
+            .outerjoin(RequestLog.header_set)
+            .offset(offset)
+            .limit(limit)
+        )
+        return [_set_headers(log, headers) for log, headers in result]
+
+    def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[RequestLogFilters] = None,
+        archive: bool = True,
+    ) -> Page:
+        """
+        A page of request logs matching `filters`, see `BaseRepository.get_page`.
+
+        The filters compile to a single parameterized query under a server
+        side statement timeout, REQUEST_LOG_QUERY_TIMEOUT. With
+        LOG_ARCHIVE_ENABLED and `archive`, a page the hot table cannot fill
+        goes on with the archived logs, and so do the pages after it.
+
+        Raises:
+            ValueError: If the cursor is malformed or the filters would scan
+                too much, see `filter_clauses`.
+        """
+        query = select(RequestLog, expanded_headers()).outerjoin(RequestLog.header_set)
+        if filters is not None:
+            query = query.where(*self.filter_clauses(filters))
+
+        # Local to the transaction of the query
+        self.session.execute(
+            text("SELECT set_config('statement_timeout', :timeout, true)"),
+            {"timeout": settings.REQUEST_LOG_QUERY_TIMEOUT},
+        )
+        page = self.paginate(query, limit, cursor, _set_headers)
+        if not archive:
+            return page
+
+        plan = self.archive_plan(limit, cursor, filters, page)
+        if plan is None:
+            return page
+        return self.complete_page(plan, plan.read())
+
+    def archive_plan(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        filters: Optional[RequestLogFilters],
+        page: Page,
+    ) -> Optional[ArchivePlan]:
+        """
+        The archive files that may hold the rest of a page of `get_page`,
+        from the manifest: those overlapping the time range of the filters,
+        before the last row seen.
+
+        Returns:
+            Optional[ArchivePlan]: None if the page is full, archives are
+                disabled, or no archived row can match.
+        """
+        if page.next_cursor is not None or not settings.LOG_ARCHIVE_ENABLED:
+            return None
+
+        filters = filters or RequestLogFilters()
+        conditions = self.archive_filters(filters)
+        if conditions is None:
+            return None
+
+        if page.items:
+            before = (page.items[-1].relo_inserted_at, str(page.items[-1].relo_id))
+        elif cursor is not None:
+            inserted_at, id = self._decode_cursor(cursor)
+            before = (inserted_at, str(id))
+        else:
+            before = None
+
+        query = select(LogArchive.loar_path, LogArchive.loar_end).where(
+            LogArchive.loar_table == RequestLog.__tablename__
+        )
+        if before is not None:
+            query = query.where(LogArchive.loar_start <= before[0])
+        if filters.start is not None:
+            query = query.where(LogArchive.loar_end >= filters.start)
+        if filters.end is not None:
+            query = query.where(LogArchive.loar_start < filters.end)
+
+        files = self.session.execute(query.order_by(LogArchive.loar_end.desc())).all()
+        if not files:
+            return None
+
+        return ArchivePlan(
+            page, limit, [tuple(file) for file in files], conditions, before
+        )
+
+    def complete_page(self, plan: ArchivePlan, rows: List[Dict[str, Any]]) -> Page:
+        """The page of `plan` followed by its archived rows."""
+        items = plan.page.items + rows
+        if len(items) <= plan.limit:
+            return Page(items, None)
+
+        items = items[: plan.limit]
+        return Page(items, self._encode_cursor(items[-1]))
+
+    def archive_filters(
+        self, filters: RequestLogFilters
+    ) -> Optional[List[Tuple[str, str, Any]]]:
+        """
+        `filter_clauses` as filters of `utils.archive.read_archive`, None if
+        the route is unknown.
+        """
+        conditions = []
+        if filters.start is not None:
+            conditions.append(("relo_inserted_at", ">=", filters.start))
+        if filters.end is not None:
+            conditions.append(("relo_inserted_at", "<", filters.end))
+        if filters.method is not None:
+            conditions.append(("relo_method", "==", filters.method.upper()))
+        if filters.status_code is not None:
+            conditions.append(("relo_status_code", "==", filters.status_code))
+        if filters.status_class is not None:
+            conditions.append(("relo_status_code", ">=", filters.status_class * 100))
+            conditions.append(
+                ("relo_status_code", "<=", filters.status_class * 100 + 99)
+            )
+        if filters.route is not None:
+            route_id = self.session.scalar(
+                select(Route.rout_id).where(Route.rout_template == filters.route)
+            )
+            if route_id is None:
+                return None
+            conditions.append(("relo_route_id", "==", route_id))
+        if filters.ip_address is not None:
+            conditions.append(("relo_ip_address", "==", filters.ip_address))
+        if filters.min_duration is not None:
+            conditions.append(
+                ("relo_request_duration_seconds", ">=", filters.min_duration)
+            )
+        if filters.max_duration is not None:
+            conditions.append(
+                ("relo_request_duration_seconds", "<=", filters.max_duration)
+            )
+        if filters.min_response_size is not None:
+            conditions.append(("relo_response_size", ">=", filters.min_response_size))
+
+        return conditions
+
+    def export_query(self, filters: RequestLogFilters) -> Select:
+        """
+        Plain-row select of the request logs matching `filters`, newest
+        first, with their headers merged, see `utils.export`.
+
+        Raises:
+            ValueError: If the filters would scan too much.
+        """
+        return (
+            select(
+                *(
+                    selected
+                    for selected in RequestLog.__table__.columns
+                    if selected.key not in ("relo_headers", "relo_headers_hash")
+                ),
+                expanded_headers().label("relo_headers"),
+            )
+            .outerjoin(RequestLog.header_set)
+            .where(*self.filter_clauses(filters))
+            .order_by(RequestLog.relo_inserted_at.desc(), RequestLog.relo_id.desc())
+        )
+
+    def filter_clauses(self, filters: RequestLogFilters) -> List[Any]:
+        """
+        Compile filters to WHERE clauses, checking them against the indexes
+        of the profile.
+
+        Filters on the leading column of an index of the profile, and the
+        time range (partition pruning), are always accepted. Other filters
+        only narrow down the rows of the time range, which must then be at
+        most REQUEST_LOG_QUERY_MAX_SCAN_WINDOW long.
+
+        Raises:
+            ValueError: If unindexed filters come without a short enough
+                time range, or the range is empty.
+        """
+        clauses = []
+        columns = set()
+
+        def add(filtered_column, clause):
+            columns.add(filtered_column.key)
+            clauses.append(clause)
+
+        if filters.start is not None:
+            clauses.append(RequestLog.relo_inserted_at >= filters.start)
+        if filters.end is not None:
+            clauses.append(RequestLog.relo_inserted_at < filters.end)
+        if filters.method is not None:
+            add(
+                RequestLog.relo_method, RequestLog.relo_method == filters.method.upper()
+            )
+        if filters.status_code is not None:
+            add(
+                RequestLog.relo_status_code,
+                RequestLog.relo_status_code == filters.status_code,
+            )
+        if filters.status_class is not None:
+            # A range, to keep using the status code index
+            add(
+                RequestLog.relo_status_code,
+                RequestLog.relo_status_code.between(
+                    filters.status_class * 100, filters.status_class * 100 + 99
+                ),
+            )
+        if filters.route is not None:
+            add(
+                RequestLog.relo_route_id,
+                RequestLog.relo_route_id == _route_id_of(filters.route),
+            )
+        if filters.ip_address is not None:
+            add(
+                RequestLog.relo_ip_address,
+                RequestLog.relo_ip_address == filters.ip_address,
+            )
+        if filters.min_duration is not None:
+            add(
+                RequestLog.relo_request_duration_seconds,
+                RequestLog.relo_request_duration_seconds >= filters.min_duration,
+            )
+        if filters.max_duration is not None:
+            add(
+                RequestLog.relo_request_duration_seconds,
+                RequestLog.relo_request_duration_seconds <= filters.max_duration,
+            )
+        if filters.min_response_size is not None:
+            add(
+                RequestLog.relo_response_size,
+                RequestLog.relo_response_size >= filters.min_response_size,
+            )
+
+        if (
+            filters.start is not None
+            and filters.end is not None
+            and filters.start >= filters.end
+        ):
+            raise ValueError("start must be before end")
+
+        indexed = {index.columns[0] for index in request_log_indexes()}
+        unindexed = sorted(columns - indexed)
+        if unindexed:
+            window = timedelta(**settings.REQUEST_LOG_QUERY_MAX_SCAN_WINDOW)
+            if (
+                filters.start is None
+                or filters.end is None
+                or filters.end - filters.start > window
+            ):
+                raise ValueError(
+                    f"Filters on {', '.join(unindexed)} need start and end at most "
+                    f"{window} apart"
+                )
+
+        return clauses
+
+    def get_latency_percentiles(
+        self, start: datetime, end: datetime, route: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Latency percentiles per route over a time window, computed in SQL.
+
+        The percentiles of a route are computed in a single sort of its
+        durations. With the "query" index profile they are read from the
+        covering ix_request_logs_inserted_at index.
+        Sampled logs are not reweighted: the percentiles are those of the
+        logs that were kept.
+
+        Args:
+            start (datetime): Start of the window, inclusive.
+            end (datetime): End of the window, exclusive.
+            route (str, optional): Only compute the percentiles of this route.
+
+        Returns:
+            List[Dict[str, Any]]: Route, count, p50, p90, p99 and max duration
+                in seconds, per route.
+        """
+        duration = RequestLog.relo_request_duration_seconds
+        percentiles = func.percentile_cont(
+            array(LATENCY_PERCENTILES), type_=ARRAY(Float)
+        ).within_group(duration)
+
+        # Integer group-by on the route id, templates are joined afterwards
+        per_route = (
+            select(
+                RequestLog.relo_route_id,
+                func.count().label("count"),
+                percentiles.label("percentiles"),
+                func.max(duration).label("max"),
+            )
+            .where(
+                RequestLog.relo_inserted_at >= start,
+                RequestLog.relo_inserted_at < end,
+                duration.is_not(None),
+            )
+            .group_by(RequestLog.relo_route_id)
+        )
+        if route is not None:
+            per_route = per_route.where(
+                RequestLog.relo_route_id
+                == select(Route.rout_id)
+                .where(Route.rout_template == route)
+                .scalar_subquery()
+            )
+        per_route = per_route.subquery()
+
+        query = (
+            select(
+                Route.rout_template,
+                per_route.c.count,
+                per_route.c.percentiles,
+                per_route.c.max,
+            )
+            .select_from(per_route)
+            .outerjoin(Route, Route.rout_id == per_route.c.relo_route_id)
+            .order_by(Route.rout_template)
+        )
+
+        return [
+            {
+                "route": template,
+                "count": count,
+                "p50": p50,
+                "p90": p90,
+                "p99": p99,
+                "max": maximum,
+            }
+            for template, count, (p50, p90, p99), maximum in self.session.execute(query)
+        ]
+
+    def get_or_create_routes(self, templates: Iterable[str]) -> Dict[str, int]:
+        """
+        Insert the route templates that do not exist yet and commit.
+
+        Args:
+            templates (Iterable[str]): Route templates.
+
+        Returns:
+            Dict[str, int]: The id of each template.
+        """
+        templates = sorted(templates)
+        self.session.execute(
+            pg_insert(Route)
+            .values([{"rout_template": template} for template in templates])
+            .on_conflict_do_nothing(index_elements=["rout_template"])
+        )
+        self.session.commit()
+
+        result = self.session.execute(
+            select(Route.rout_template, Route.rout_id).where(
+                Route.rout_template.in_(templates)
+            )
+        )
+        return dict(result.all())
+
+    def create_partitions(self, interval: str, premake: int) -> List[str]:
+        """
+        Create the partition of the current interval and of the `premake`
+        next ones, skipping the intervals an existing partition overlaps.
+
+        Args:
+            interval (str): Partition granularity, "day" or "hour".
+            premake (int): The number of future partitions to create.
+
+        Returns:
+            List[str]: The names of the partitions created.
+        """
+        existing = [
+            partition
+            for partition in get_partitions(self.session, RequestLog.__tablename__)
+            if not partition.is_default
+        ]
+
+        created = []
+        lower = _truncate(datetime.now(timezone.utc), interval)
+        for _ in range(premake + 1):
+            upper = lower + PARTITION_INTERVALS[interval]
+            overlaps = any(
+                (partition.lower is None or partition.lower < upper)
+                and (partition.upper is None or lower < partition.upper)
+                for partition in existing
+            )
+            if not overlaps:
+                name = f"{RequestLog.__tablename__}_p{lower:{PARTITION_SUFFIXES[interval]}}"
+                try:
+                    create_range_partition(
+                        self.session, RequestLog.__tablename__, name, lower, upper
+                    )
+                    self.session.commit()
+                    created.append(name)
+                except Exception as e:
+                    # Typically rows of this interval already in the default
+                    # partition: the interval stays there
+                    self.session.rollback()
+                    print(f"Error creating partition {name}: {e}")
+
+            lower = upper
+
+        return created
+
+    def delete_old_logs(
+        self,
+        time_delta: timedelta,
+        batch_size: int = 5000,
+        pause: float = 0.1,
+        time_budget: Optional[float] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        archive_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Drop the partitions entirely older than the cutoff, then delete the
+        expired rows of the default partition in batches.
+
+        Retention is a metadata operation: a partition is dropped once its
+        upper bound has expired, so rows are kept up to one partition
+        interval longer than `time_delta`. The rows of the default partition
+        are deleted by `delete_in_batches`; a run that runs out of
+        `time_budget` records its position and the next run resumes from it.
+
+        Args:
+            time_delta (timedelta): Rows older than this are deleted.
+            batch_size (int): Rows deleted per transaction.
+            pause (float): Seconds to wait between batches.
+            time_budget (float, optional): Seconds after which no batch is
+                started.
+            progress (Callable, optional): Called with the progress after
+                each batch.
+            archive_dir (str, optional): Cold archive directory: the rows are
+                written there before they are deleted, see
+                `utils.archive.write_archive`.
+
+        Returns:
+            Dict[str, Any]: The partitions dropped and the progress of the
+                deletion from the default partition.
+        """
+        return self._delete_before(
+            datetime.now(timezone.utc) - time_delta,
+            False,
+            batch_size,
+            pause,
+            time_budget,
+            progress,
+            archive_dir,
+        )
+
+    def apply_retention(
+        self,
+        default_age: timedelta,
+        policies: Sequence[RetentionPolicy],
+        batch_size: int = 5000,
+        pause: float = 0.1,
+        time_budget: Optional[float] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        archive_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Delete the request logs older than the age of their retention policy,
+        and those no policy matches older than `default_age`, see
+        `database.retention.compile_policies`.
+
+        The partitions older than the longest age are dropped whole, as by
+        `delete_old_logs`. Each shorter policy then deletes its rows in
+        batches, partition by partition, from the partitions that start
+        before its cutoff; the rows of the longest policies wait for their
+        partition to be dropped. Each policy resumes a partition from where
+        its last run stopped, or from its last cutoff, and skips the
+        partitions a previous run already went past.
 
-    def delete_old_logs(self, time_delta: timedelta):
-        cutoff_date = datetime.now() - time_delta
-        delete_query = delete(RequestLog).where(
-            RequestLog.relo_inserted_at < cutoff_date
+        Args:
+            default_age (timedelta): The age of the logs no policy matches.
+            policies (Sequence[RetentionPolicy]): The retention policies,
+                see REQUEST_RETENTION_POLICIES.
+
+        Returns:
+            Dict[str, Any]: The partitions dropped, the progress of the
+                deletion past the longest age ("expired") and of each
+                shorter policy, and the totals.
+        """
+        now = datetime.now(timezone.utc)
+        horizon = retention_horizon(default_age, policies)
+
+        routes = {policy.route for policy in policies if policy.route is not None}
+        route_ids = {}
+        if routes:
+            route_ids = dict(
+                self.session.execute(
+                    select(Route.rout_template, Route.rout_id).where(
+                        Route.rout_template.in_(routes)
+                    )
+                ).all()
+            )
+        rules = compile_policies(default_age, policies, route_ids)
+
+        expired = self._delete_before(
+            now - horizon, False, batch_size, pause, time_budget, progress, archive_dir
+        )
+        result = {
+            "dropped_partitions": expired.pop("dropped_partitions"),
+            "expired": expired,
+            "policies": {},
+        }
+
+        archive = self._archiver(archive_dir)
+        dialect = self.session.get_bind().dialect
+        partitions = get_partitions(self.session, RequestLog.__tablename__)
+        watermarks = dict(
+            self.session.execute(
+                select(JobWatermark.jowa_name, JobWatermark.jowa_value).where(
+                    JobWatermark.jowa_name.like("retention:%")
+                )
+            ).all()
+        )
+        self.session.commit()
+
+        total = DeletionProgress(
+            expired["deleted_rows"],
+            expired["batches"],
+            expired["elapsed_seconds"],
+            None,
+            expired["completed"],
+        )
+        for rule in rules:
+            if rule.policy.age >= horizon:
+                continue
+
+            cutoff = now - rule.policy.age
+            deletion = DeletionProgress(0, 0, 0.0, None, True)
+            for partition in partitions:
+                if partition.lower is not None and partition.lower >= cutoff:
+                    continue
+                # Done up to its end by a previous run: new rows go to
+                # newer partitions
+                watermark = watermarks.get(
+                    _retention_watermark(
+                        partition.name, "relo_inserted_at", rule.policy.name
+                    )
+                )
+                if (
+                    watermark is not None
+                    and partition.upper is not None
+                    and watermark >= partition.upper
+                ):
+                    continue
+
+                budget = None
+                if time_budget is not None:
+                    budget = (
+                        time_budget - total.elapsed_seconds - deletion.elapsed_seconds
+                    )
+                    if budget <= 0:
+                        deletion = deletion._replace(completed=False)
+                        break
+
+                done = deletion
+
+                def report(state: DeletionProgress):
+                    if progress is not None:
+                        progress(
+                            {
+                                "policy": rule.policy.name,
+                                "table": partition.name,
+                                **_add_progress(done, state).as_dict(),
+                            }
+                        )
+
+                deletion = _add_progress(
+                    done,
+                    _delete_expired(
+                        self.session,
+                        partition.name,
+                        "relo_inserted_at",
+                        cutoff,
+                        batch_size,
+                        pause,
+                        budget,
+                        report,
+                        archive,
+                        rule.sql(dialect),
+                        rule.policy.name,
+                    ),
+                )
+
+            result["policies"][rule.policy.name] = {
+                "age": str(rule.policy.age),
+                "cutoff": cutoff.isoformat(),
+                **deletion.as_dict(),
+            }
+            total = _add_progress(total, deletion)
+
+        return {**result, **total._replace(position=None).as_dict()}
+
+    def delete_excess_logs(
+        self,
+        max_rows: int,
+        batch_size: int = 5000,
+        pause: float = 0.1,
+        time_budget: Optional[float] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        archive_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Delete the oldest request logs beyond about `max_rows` rows.
+
+        The row count is estimated from the planner statistics of the
+        partitions instead of counted, and the cutoff is the insertion time
+        of the oldest row to keep: the partitions wholly in the excess are
+        skipped by their estimates, and a single seek of
+        ix_request_logs_inserted_at in the partition the cutoff falls in
+        reads it, see `find_row_cutoff`. No other row is read, whatever the
+        size of the table. Partitions entirely before the cutoff are dropped
+        and the older rows of the others are deleted in batches, see
+        `delete_old_logs`.
+
+        The estimates are as fresh as the last (auto)analyze, so the table
+        can exceed the cap by the rows inserted since. The seek needs the
+        "query" index profile; under "ingest" it sorts the one partition.
+
+        Returns:
+            Dict[str, Any]: The estimated row count, the cutoff and the
+                progress of the deletion.
+        """
+        estimated_rows = estimate_rows(self.session, RequestLog.__tablename__)
+        excess = estimated_rows - max_rows
+        if excess <= 0:
+            return {"estimated_rows": estimated_rows, "cutoff": None}
+
+        cutoff = find_row_cutoff(
+            self.session, RequestLog.__tablename__, "relo_inserted_at", excess
+        )
+        self.session.commit()
+        if cutoff is None:
+            # Fewer rows than estimated
+            return {"estimated_rows": estimated_rows, "cutoff": None}
+
+        return {
+            "estimated_rows": estimated_rows,
+            "cutoff": cutoff.isoformat(),
+            **self._delete_before(
+                cutoff, True, batch_size, pause, time_budget, progress, archive_dir
+            ),
+        }
+
+    def _delete_before(
+        self,
+        cutoff: datetime,
+        within_partitions: bool,
+        batch_size: int,
+        pause: float,
+        time_budget: Optional[float],
+        progress: Optional[Callable[[Dict[str, Any]], None]],
+        archive_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Drop the partitions entirely before `cutoff`, and delete the older
+        rows of the default partition, and of the partition the cutoff falls
+        in when `within_partitions`.
+
+        With `archive_dir`, the rows of a partition are archived in the
+        transaction that drops it, and those deleted in batches with each
+        batch.
+        """
+        archive = self._archiver(archive_dir)
+
+        dropped, tables = [], []
+        for partition in get_partitions(self.session, RequestLog.__tablename__):
+            if partition.is_default:
+                tables.append(partition.name)
+                continue
+            if partition.upper is None or partition.upper > cutoff:
+                if within_partitions and (
+                    partition.lower is None or partition.lower < cutoff
+                ):
+                    tables.append(partition.name)
+                continue
+
+            try:
+                if archive is not None:
+                    self._archive_partition(partition.name, batch_size, archive)
+                drop_partition(self.session, RequestLog.__tablename__, partition.name)
+                self.session.commit()
+                dropped.append(partition.name)
+            except Exception as e:
+                # Most likely the lock timeout: the next run retries
+                self.session.rollback()
+                print(f"Error dropping partition {partition.name}: {e}")
+
+        deletion = DeletionProgress(0, 0, 0.0, None, True)
+        for table_name in tables:
+            done = deletion
+
+            def report(state: DeletionProgress):
+                if progress is not None:
+                    progress(
+                        {
+                            "dropped_partitions": dropped,
+                            "table": table_name,
+                            **_add_progress(done, state).as_dict(),
+                        }
+                    )
+
+            budget = None
+            if time_budget is not None:
+                budget = time_budget - deletion.elapsed_seconds
+                if budget <= 0:
+                    deletion = deletion._replace(completed=False)
+                    break
+
+            deletion = _add_progress(
+                done,
+                _delete_expired(
+                    self.session,
+                    table_name,
+                    "relo_inserted_at",
+                    cutoff,
+                    batch_size,
+                    pause,
+                    budget,
+                    report,
+                    archive,
+                ),
+            )
+
+        return {"dropped_partitions": dropped, **deletion.as_dict()}
+
+    def _archive_partition(
+        self,
+        partition_name: str,
+        batch_size: int,
+        archive: Callable[[Sequence[Mapping[str, Any]]], None],
+    ):
+        """Archive every row of a partition, `batch_size` rows per file."""
+        quote = self.session.get_bind().dialect.identifier_preparer.quote
+        result = self.session.execute(
+            text(f"SELECT * FROM {quote(partition_name)}").execution_options(
+                yield_per=batch_size
+            )
+        )
+        for rows in result.mappings().partitions():
+            archive(rows)
+
+    def _archiver(
+        self, archive_dir: Optional[str]
+    ) -> Optional[Callable[[Sequence[Mapping[str, Any]]], None]]:
+        """Archive of the deleted request logs, by day of insertion."""
+        if archive_dir is None:
+            return None
+
+        def archive(rows: Sequence[Mapping[str, Any]]):
+            LogArchiveRepository(self.session).record(
+                RequestLog.__tablename__,
+                write_archive(
+                    archive_dir,
+                    RequestLog.__tablename__,
+                    "relo_inserted_at",
+                    REQUEST_LOG_ARCHIVE_COLUMNS,
+                    self._archive_rows(rows),
+                ),
+            )
+
+        return archive
+
+    def _archive_rows(self, rows: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows of request_logs with their interned headers merged back."""
+        hashes = {row["relo_headers_hash"] for row in rows if row["relo_headers_hash"]}
+        header_sets = {}
+        if hashes:
+            header_sets = dict(
+                self.session.execute(
+                    select(
+                        RequestHeaderSet.hese_hash, RequestHeaderSet.hese_headers
+                    ).where(RequestHeaderSet.hese_hash.in_(hashes))
+                ).all()
+            )
+
+        return [
+            {
+                **row,
+                "relo_headers": {
+                    **header_sets.get(row["relo_headers_hash"], {}),
+                    **(row["relo_headers"] or {}),
+                },
+            }
+            for row in rows
+        ]
+
+
+class RequestLogRollupRepository(BaseRepository):
+    # Name of the high-water mark in job_watermarks
+    WATERMARK = "request_log_rollups"
+
+    def create(self, data: Dict[str, Any]) -> RequestLogRollup:
+        rollup = RequestLogRollup(**data)
+        self.session.add(rollup)
+        self.session.commit()
+        return rollup
+
+    def update(self, id: Tuple, data: Dict[str, Any]) -> Optional[RequestLogRollup]:
+        # Rollups are only maintained by refresh
+        return None
+
+    def get_by_id(self, id: Tuple) -> Optional[RequestLogRollup]:
+        return self.session.get(RequestLogRollup, id)
+
+    def delete_by_id(self, id: Tuple) -> bool:
+        rollup = self.get_by_id(id)
+        if not rollup:
+            return False
+        self.session.delete(rollup)
+        self.session.commit()
+        return True
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[RequestLogRollup]:
+        return (
+            self.session.execute(
+                select(RequestLogRollup)
+                .order_by(RequestLogRollup.rlup_bucket.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+
+    def refresh(self, settle_delay: timedelta, chunk: timedelta) -> Dict[str, Any]:
+        """
+        Aggregate the request logs inserted since the high-water mark.
+
+        Logs are aggregated one `chunk` of insertion time at a time, each
+        chunk in its own transaction along with the move of the high-water
+        mark, so every row is counted once and old rows are never rescanned.
+        The high-water mark row is locked while a chunk is aggregated, which
+        serializes concurrent runs of several workers.
+
+        Args:
+            settle_delay (timedelta): Logs inserted more recently than this
+                are left to the next run.
+            chunk (timedelta): Insertion time aggregated per transaction.
+
+        Returns:
+            Dict[str, Any]: The number of rollup rows upserted and the new
+                high-water mark.
+        """
+        upper = _truncate_minute(datetime.now(timezone.utc) - settle_delay)
+        self.session.execute(
+            pg_insert(JobWatermark)
+            .values(jowa_name=self.WATERMARK)
+            .on_conflict_do_nothing(index_elements=["jowa_name"])
         )
-        self.session.execute(delete_query)
         self.session.commit()
 
-    def delete_excess_logs(self, max_rows: int):
-        query = self.session.query(RequestLog).order_by(RequestLog.inserted_at)
-        total_rows = query.count()
-        if total_rows > max_rows:
-            delete_query = query.delete(synchronize_session="fetch")
-            self.session.execute(delete_query)
+        upserted = 0
+        while True:
+            watermark = self.session.execute(
+                select(JobWatermark)
+                .where(JobWatermark.jowa_name == self.WATERMARK)
+                .with_for_update()
+            ).scalar_one()
+
+            lower = watermark.jowa_value
+            if lower is None:
+                # First run: start from the oldest log
+                oldest = self.session.scalar(
+                    select(func.min(RequestLog.relo_inserted_at))
+                )
+                lower = _truncate_minute(oldest) if oldest is not None else upper
+
+            if lower >= upper:
+                self.session.rollback()
+                break
+
+            chunk_upper = min(lower + chunk, upper)
+            upserted += self.session.execute(
+                ROLLUP_UPSERT, {"lower": lower, "upper": chunk_upper}
+            ).rowcount
+            watermark.jowa_value = chunk_upper
             self.session.commit()
 
+        return {"upserted_rollups": upserted, "watermark": upper.isoformat()}
+
+    def delete_old_rollups(self, time_delta: timedelta) -> int:
+        cutoff = datetime.now(timezone.utc) - time_delta
+        deleted = self.session.execute(
+            delete(RequestLogRollup).where(RequestLogRollup.rlup_bucket < cutoff)
+        ).rowcount
+        self.session.commit()
+        return deleted
+
+    def get_summary(
+        self,
+        start: datetime,
+        end: datetime,
+        route: Optional[str] = None,
+        interval: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Request counts, errors, durations and bytes per route, method and
+        status class over a time window, read from the rollups.
+
+        Args:
+            start (datetime): Start of the window, inclusive.
+            end (datetime): End of the window, exclusive.
+            route (str, optional): Only summarize this route template.
+            interval (str, optional): "minute", "hour" or "day" to summarize
+                per time bucket instead of over the whole window.
+
+        Returns:
+            List[Dict[str, Any]]: One summary per group.
+        """
+        groups = [
+            RequestLogRollup.rlup_route_id,
+            RequestLogRollup.rlup_method,
+            RequestLogRollup.rlup_status_class,
+        ]
+        if interval is not None:
+            groups.insert(
+                0,
+                func.date_trunc(interval, RequestLogRollup.rlup_bucket).label("bucket"),
+            )
+
+        per_group = (
+            select(
+                *groups,
+                func.sum(RequestLogRollup.rlup_count).label("count"),
+                func.sum(RequestLogRollup.rlup_errors).label("errors"),
+                func.sum(RequestLogRollup.rlup_duration_sum).label("duration_sum"),
+                func.max(RequestLogRollup.rlup_duration_max).label("duration_max"),
+                func.sum(RequestLogRollup.rlup_bytes).label("bytes"),
+            )
+            .where(
+                RequestLogRollup.rlup_bucket >= start,
+                RequestLogRollup.rlup_bucket < end,
+            )
+            .group_by(*groups)
+        )
+        if route is not None:
+            per_group = per_group.where(
+                RequestLogRollup.rlup_route_id == _route_id_of(route)
+            )
+        per_group = per_group.subquery()
+
+        query = (
+            select(per_group, Route.rout_template)
+            .outerjoin(Route, Route.rout_id == per_group.c.rlup_route_id)
+            .order_by(
+                *([per_group.c.bucket] if interval is not None else []),
+                Route.rout_template,
+                per_group.c.rlup_method,
+                per_group.c.rlup_status_class,
+            )
+        )
+
+        summaries = []
+        for row in self.session.execute(query).mappings():
+            summary = {
+                "route": row["rout_template"],
+                "method": row["rlup_method"],
+                "status_class": f"{row['rlup_status_class']}xx",
+                "count": row["count"],
+                "errors": row["errors"],
+                "avg_duration": (
+                    row["duration_sum"] / row["count"] if row["count"] else None
+                ),
+                "max_duration": row["duration_max"],
+                "bytes": row["bytes"],
+            }
+            if interval is not None:
+                summary = {"bucket": row["bucket"], **summary}
+            summaries.append(summary)
+
+        return summaries
+
+    def get_latency_percentiles(
+        self, start: datetime, end: datetime, route: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Latency percentiles per route over a time window, estimated from the
+        rollup histograms by linear interpolation within their buckets.
+
+        Unlike `RequestLogRepository.get_latency_percentiles`, counts include
+        the sample weights and the window can reach past the raw log
+        retention.
+
+        Returns:
+            List[Dict[str, Any]]: Route, count, p50, p90, p99 and max duration
+                in seconds, per route.
+        """
+        window = [
+            RequestLogRollup.rlup_bucket >= start,
+            RequestLogRollup.rlup_bucket < end,
+        ]
+        if route is not None:
+            window.append(RequestLogRollup.rlup_route_id == _route_id_of(route))
+
+        totals = self.session.execute(
+            select(
+                RequestLogRollup.rlup_route_id,
+                func.sum(RequestLogRollup.rlup_count),
+                func.max(RequestLogRollup.rlup_duration_max),
+            )
+            .where(*window)
+            .group_by(RequestLogRollup.rlup_route_id)
+        ).all()
+
+        # Histograms summed bucket by bucket, in SQL
+        bins = func.unnest(RequestLogRollup.rlup_histogram).table_valued(
+            "value", with_ordinality="position"
+        )
+        histograms = {}
+        for route_id, position, value in self.session.execute(
+            select(
+                RequestLogRollup.rlup_route_id,
+                bins.c.position,
+                func.sum(bins.c.value),
+            )
+            .select_from(RequestLogRollup)
+            .join(bins, true())
+            .where(*window)
+            .group_by(RequestLogRollup.rlup_route_id, bins.c.position)
+        ):
+            counts = histograms.setdefault(
+                route_id, [0.0] * (len(ROLLUP_LATENCY_BUCKETS) + 1)
+            )
+            counts[position - 1] = value or 0.0
+
+        templates = dict(
+            self.session.execute(
+                select(Route.rout_id, Route.rout_template).where(
+                    Route.rout_id.in_([route_id for route_id, _, _ in totals])
+                )
+            ).all()
+        )
+
+        percentiles = []
+        for route_id, count, maximum in totals:
+            counts = histograms.get(route_id, [])
+            p50, p90, p99 = (
+                _histogram_quantile(counts, quantile, maximum)
+                for quantile in LATENCY_PERCENTILES
+            )
+            percentiles.append(
+                {
+                    "route": templates.get(route_id),
+                    "count": count,
+                    "p50": p50,
+                    "p90": p90,
+                    "p99": p99,
+                    "max": maximum,
+                }
+            )
+
+        return sorted(percentiles, key=lambda p: (p["route"] is None, p["route"] or ""))
+
+
+class RequestStatRepository(BaseRepository):
+    MODEL = RequestStat
+    CURSOR_COLUMNS = ("rsta_bucket", "rsta_id")
+
+    def create(self, data: Dict[str, Any]) -> RequestStat:
+        stat = RequestStat(**data)
+        self.session.add(stat)
+        self.session.commit()
+        self.session.refresh(stat)
+        return stat
+
+    def create_many(self, stats: List[Dict[str, Any]]) -> int:
+        if not stats:
+            return 0
+
+        self.session.execute(insert(RequestStat), stats)
+        self.session.commit()
+        return len(stats)
+
+    def update(self, id: int, data: Dict[str, Any]) -> Optional[RequestStat]:
+        # Flushed statistics are never modified
+        return None
+
+    def get_by_id(self, id: int) -> Optional[RequestStat]:
+        return self.session.get(RequestStat, id)
+
+    def delete_by_id(self, id: int) -> bool:
+        stat = self.get_by_id(id)
+        if not stat:
+            return False
+        self.session.delete(stat)
+        self.session.commit()
+        return True
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[RequestStat]:
+        return (
+            self.session.execute(
+                select(RequestStat)
+                .order_by(RequestStat.rsta_bucket.desc(), RequestStat.rsta_id.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+
+    def delete_old_stats(self, time_delta: timedelta) -> int:
+        cutoff = datetime.now(timezone.utc) - time_delta
+        deleted = self.session.execute(
+            delete(RequestStat).where(RequestStat.rsta_bucket < cutoff)
+        ).rowcount
+        self.session.commit()
+        return deleted
+
+    def get_stats(
+        self, start: datetime, end: datetime, route: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Request counts and latency percentiles per route and status code
+        over a time window, merged from the statistics flushed by every
+        worker.
+
+        Counts are exact, sampling and raw log retention aside; percentiles
+        come from the merged sketches, within their relative accuracy.
+
+        Returns:
+            List[Dict[str, Any]]: Route, status code, count, average, p50,
+                p90, p99 and max duration in seconds, and bytes.
+        """
+        query = (
+            select(
+                RequestStat.rsta_route_id,
+                RequestStat.rsta_status_code,
+                RequestStat.rsta_count,
+                RequestStat.rsta_duration_sum,
+                RequestStat.rsta_duration_max,
+                RequestStat.rsta_bytes,
+                RequestStat.rsta_sketch,
+            )
+            .where(RequestStat.rsta_bucket >= start, RequestStat.rsta_bucket < end)
+            .execution_options(yield_per=1000)
+        )
+        if route is not None:
+            query = query.where(RequestStat.rsta_route_id == _route_id_of(route))
+
+        # One merged sketch per group, whatever the number of rows
+        groups: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for row in self.session.execute(query):
+            group = groups.get((row.rsta_route_id, row.rsta_status_code))
+            if group is None:
+                group = groups[(row.rsta_route_id, row.rsta_status_code)] = {
+                    "count": 0,
+                    "duration_sum": 0.0,
+                    "max": row.rsta_duration_max,
+                    "bytes": 0,
+                    "sketch": LatencySketch.from_bytes(row.rsta_sketch),
+                }
+            else:
+                group["sketch"].merge(LatencySketch.from_bytes(row.rsta_sketch))
+                group["max"] = max(group["max"], row.rsta_duration_max)
+
+            group["count"] += row.rsta_count
+            group["duration_sum"] += row.rsta_duration_sum
+            group["bytes"] += row.rsta_bytes
+
+        templates = dict(
+            self.session.execute(
+                select(Route.rout_id, Route.rout_template).where(
+                    Route.rout_id.in_({route_id for route_id, _ in groups})
+                )
+            ).all()
+        )
+
+        stats = []
+        for (route_id, status_code), group in groups.items():
+            sketch = group.pop("sketch")
+            p50, p90, p99 = (
+                sketch.quantile(quantile) for quantile in LATENCY_PERCENTILES
+            )
+            stats.append(
+                {
+                    "route": templates.get(route_id),
+                    "status_code": status_code,
+                    "count": group["count"],
+                    "avg": (
+                        group["duration_sum"] / group["count"]
+                        if group["count"]
+                        else None
+                    ),
+                    "p50": p50,
+                    "p90": p90,
+                    "p99": p99,
+                    "max": group["max"],
+                    "bytes": group["bytes"],
+                }
+            )
+
+        return sorted(
+            stats,
+            key=lambda s: (s["route"] is None, s["route"] or "", s["status_code"]),
+        )
+
 
 class TaskLogRepository(BaseRepository):
+    MODEL = TaskLog
+    CURSOR_COLUMNS = ("talo_inserted_at", "talo_id")
+
+    # Column order of the tuples accepted by create_many
+    COLUMNS = ("talo_task_id", *TaskLogCreate.model_fields)
+
     def create(self, task_log_data: TaskLogCreate) -> TaskLog:
         task_log = TaskLog(**task_log_data)
         self.session.add(task_log)
@@ -66,6 +1409,28 @@ class TaskLogRepository(BaseRepository):
         self.session.refresh(task_log)
         return task_log
 
+    def create_many(
+        self, task_logs: Iterable[Union[TaskLogCreate, Dict[str, Any], Tuple]]
+    ) -> int:
+        """
+        Bulk insert task logs without building ORM instances.
+
+        Args:
+            task_logs (Iterable[Union[TaskLogCreate, Dict[str, Any], Tuple]]):
+                Task logs as schemas, dicts or tuples in `COLUMNS` order.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        inserted = bulk_insert(
+            self.session,
+            TaskLog.__table__,
+            ("talo_id", *self.COLUMNS),
+            _log_rows(task_logs, self.COLUMNS, {"talo_success": False}),
+        )
+        self.session.commit()
+        return inserted
+
     def update(self, id: UUID, data: TaskLogCreate) -> Optional[TaskLog]:
         task_log = self.get_by_id(id)
         if not task_log:
@@ -97,12 +1462,505 @@ class TaskLogRepository(BaseRepository):
             .all()
         )
 
-    def delete_old_logs(self, time_delta: timedelta):
-        cutoff_date = datetime.now() - time_delta
-        self.session.query(TaskLog).filter(
-            TaskLog.talo_start_time < cutoff_date
-        ).delete()
+    def export_query(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Select:
+        """Plain-row select of the task logs inserted in a time range, newest first."""
+        query = select(*TaskLog.__table__.columns).order_by(
+            TaskLog.talo_inserted_at.desc(), TaskLog.talo_id.desc()
+        )
+        if start is not None:
+            query = query.where(TaskLog.talo_inserted_at >= start)
+        if end is not None:
+            query = query.where(TaskLog.talo_inserted_at < end)
+        return query
+
+    def delete_old_logs(
+        self,
+        time_delta: timedelta,
+        batch_size: int = 5000,
+        pause: float = 0.1,
+        time_budget: Optional[float] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        archive_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Delete the task logs started before the cutoff in batches, see
+        `RequestLogRepository.delete_old_logs`.
+
+        Returns:
+            Dict[str, Any]: The progress of the deletion.
+        """
+        return _delete_expired(
+            self.session,
+            TaskLog.__tablename__,
+            "talo_start_time",
+            datetime.now(timezone.utc) - time_delta,
+            batch_size,
+            pause,
+            time_budget,
+            (lambda state: progress(state.as_dict())) if progress else None,
+            self._archiver(archive_dir),
+        ).as_dict()
+
+    def delete_excess_logs(
+        self,
+        max_rows: int,
+        batch_size: int = 5000,
+        pause: float = 0.1,
+        time_budget: Optional[float] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        archive_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Delete the oldest task logs beyond about `max_rows` rows, in batches.
+
+        The row count is estimated from the planner statistics and the
+        cutoff read by one seek of ix_task_logs_inserted_at_id, see
+        `RequestLogRepository.delete_excess_logs`.
+
+        Returns:
+            Dict[str, Any]: The estimated row count, the cutoff and the
+                progress of the deletion.
+        """
+        estimated_rows = estimate_rows(self.session, TaskLog.__tablename__)
+        excess = estimated_rows - max_rows
+        if excess <= 0:
+            return {"estimated_rows": estimated_rows, "cutoff": None}
+
+        cutoff = find_row_cutoff(
+            self.session, TaskLog.__tablename__, "talo_inserted_at", excess
+        )
+        self.session.commit()
+        if cutoff is None:
+            # Fewer rows than estimated
+            return {"estimated_rows": estimated_rows, "cutoff": None}
+
+        deletion = _delete_expired(
+            self.session,
+            TaskLog.__tablename__,
+            "talo_inserted_at",
+            cutoff,
+            batch_size,
+            pause,
+            time_budget,
+            (lambda state: progress(state.as_dict())) if progress else None,
+            self._archiver(archive_dir),
+        )
+        return {
+            "estimated_rows": estimated_rows,
+            "cutoff": cutoff.isoformat(),
+            **deletion.as_dict(),
+        }
+
+    def _archiver(
+        self, archive_dir: Optional[str]
+    ) -> Optional[Callable[[Sequence[Mapping[str, Any]]], None]]:
+        """Archive of the deleted task logs, by day of insertion."""
+        if archive_dir is None:
+            return None
+
+        def archive(rows: Sequence[Mapping[str, Any]]):
+            LogArchiveRepository(self.session).record(
+                TaskLog.__tablename__,
+                write_archive(
+                    archive_dir,
+                    TaskLog.__tablename__,
+                    "talo_inserted_at",
+                    list(TaskLog.__table__.columns),
+                    rows,
+                ),
+            )
+
+        return archive
+
+    def update_progress(self, id: UUID, progress: Dict[str, Any]):
+        """Set talo_details["progress"] of a running task, without loading it."""
+        self.session.execute(
+            text(
+                """
+                UPDATE task_logs
+                SET talo_details = COALESCE(talo_details, '{}'::jsonb)
+                    || jsonb_build_object('progress', CAST(:progress AS jsonb))
+                WHERE talo_id = :id
+            """
+            ),
+            {"id": id, "progress": json.dumps(progress, default=str)},
+        )
+        self.session.commit()
+
+
+class LogArchiveRepository(BaseRepository):
+    """The manifest of the cold archive files, see `utils.archive`."""
+
+    MODEL = LogArchive
+
+    def create(self, data: Dict[str, Any]) -> LogArchive:
+        archive = LogArchive(**data)
+        self.session.add(archive)
         self.session.commit()
+        self.session.refresh(archive)
+        return archive
+
+    def update(self, id: int, data: Dict[str, Any]) -> Optional[LogArchive]:
+        archive = self.get_by_id(id)
+        if not archive:
+            return None
+
+        for key, value in data.items():
+            setattr(archive, key, value)
+
+        self.session.commit()
+        self.session.refresh(archive)
+        return archive
+
+    def get_by_id(self, id: int) -> Optional[LogArchive]:
+        return self.session.get(LogArchive, id)
+
+    def delete_by_id(self, id: int) -> bool:
+        archive = self.get_by_id(id)
+        if not archive:
+            return False
+
+        self.session.delete(archive)
+        self.session.commit()
+        remove_archive(archive.loar_path)
+        return True
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[LogArchive]:
+        return (
+            self.session.execute(
+                select(LogArchive)
+                .order_by(LogArchive.loar_end.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+
+    def record(self, table_name: str, files: Iterable[ArchiveFile]):
+        """
+        Add the files written for `table_name` to the manifest, without
+        committing: they are recorded by the transaction deleting their rows,
+        so a rolled back deletion leaves no entry for them.
+        """
+        files = list(files)
+        if not files:
+            return
+
+        self.session.execute(
+            insert(LogArchive),
+            [
+                {
+                    "loar_table": table_name,
+                    "loar_day": file.day,
+                    "loar_path": file.path,
+                    "loar_start": file.start,
+                    "loar_end": file.end,
+                    "loar_rows": file.rows,
+                    "loar_bytes": file.size,
+                }
+                for file in files
+            ],
+        )
+
+    def delete_old_archives(
+        self, table_name: str, time_delta: timedelta
+    ) -> Dict[str, Any]:
+        """
+        Delete the archive files of `table_name` whose newest row is older
+        than `time_delta`, manifest entries first.
+
+        Returns:
+            Dict[str, Any]: The number of files and rows deleted.
+        """
+        deleted = self.session.execute(
+            delete(LogArchive)
+            .where(
+                LogArchive.loar_table == table_name,
+                LogArchive.loar_end < datetime.now(timezone.utc) - time_delta,
+            )
+            .returning(LogArchive.loar_path, LogArchive.loar_rows)
+        ).all()
+        self.session.commit()
+
+        for file_path, _ in deleted:
+            remove_archive(file_path)
+
+        return {
+            "deleted_files": len(deleted),
+            "deleted_rows": sum(rows for _, rows in deleted),
+        }
+
+
+class AsyncRequestLogRepository(AsyncBaseRepository):
+    SYNC_REPOSITORY = RequestLogRepository
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[RequestLogFilters] = None,
+    ) -> Page:
+        """See `RequestLogRepository.get_page`; archive files are read in a thread."""
+        page = await self.run_sync(
+            "get_page", limit=limit, cursor=cursor, filters=filters, archive=False
+        )
+        plan = await self.run_sync("archive_plan", limit, cursor, filters, page)
+        if plan is None:
+            return page
+
+        rows = await asyncio.to_thread(plan.read)
+        return RequestLogRepository(self.session.sync_session).complete_page(plan, rows)
+
+    async def get_latency_percentiles(
+        self, start: datetime, end: datetime, route: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.run_sync("get_latency_percentiles", start, end, route)
+
+    def export_query(self, filters: RequestLogFilters) -> Select:
+        # Only builds the query, which runs on its own session
+        return RequestLogRepository(self.session.sync_session).export_query(filters)
+
+
+class AsyncRequestLogRollupRepository(AsyncBaseRepository):
+    SYNC_REPOSITORY = RequestLogRollupRepository
+
+    async def get_summary(
+        self,
+        start: datetime,
+        end: datetime,
+        route: Optional[str] = None,
+        interval: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.run_sync("get_summary", start, end, route, interval)
+
+    async def get_latency_percentiles(
+        self, start: datetime, end: datetime, route: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.run_sync("get_latency_percentiles", start, end, route)
+
+
+class AsyncRequestStatRepository(AsyncBaseRepository):
+    SYNC_REPOSITORY = RequestStatRepository
+
+    async def get_stats(
+        self, start: datetime, end: datetime, route: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.run_sync("get_stats", start, end, route)
+
+
+class AsyncTaskLogRepository(AsyncBaseRepository):
+    SYNC_REPOSITORY = TaskLogRepository
+
+    def export_query(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Select:
+        # Only builds the query, which runs on its own session
+        return TaskLogRepository(self.session.sync_session).export_query(start, end)
+
+
+def _rollup_upsert():
+    thresholds = ", ".join(str(float(bound)) for bound in ROLLUP_LATENCY_BUCKETS)
+    bucket = f"width_bucket(relo_request_duration_seconds, ARRAY[{thresholds}])"
+    histogram = ", ".join(
+        f"COALESCE(sum(relo_sample_weight) FILTER (WHERE {bucket} = {index}), 0)"
+        for index in range(len(ROLLUP_LATENCY_BUCKETS) + 1)
+    )
+    return text(
+        f"""
+        INSERT INTO request_log_rollups (
+            rlup_bucket, rlup_route_id, rlup_method, rlup_status_class,
+            rlup_count, rlup_errors, rlup_duration_sum, rlup_duration_max,
+            rlup_histogram, rlup_bytes
+        )
+        SELECT
+            date_trunc('minute', relo_inserted_at),
+            COALESCE(relo_route_id, 0),
+            COALESCE(relo_method, ''),
+            COALESCE(relo_status_code / 100, 0),
+            sum(relo_sample_weight),
+            COALESCE(sum(relo_sample_weight) FILTER (WHERE relo_status_code >= 500), 0),
+            COALESCE(sum(relo_request_duration_seconds * relo_sample_weight), 0),
+            max(relo_request_duration_seconds),
+            ARRAY[{histogram}],
+            COALESCE(sum(relo_response_size * relo_sample_weight), 0)
+        FROM request_logs
+        WHERE relo_inserted_at >= :lower AND relo_inserted_at < :upper
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (rlup_bucket, rlup_route_id, rlup_method, rlup_status_class)
+        DO UPDATE SET
+            rlup_count = request_log_rollups.rlup_count + EXCLUDED.rlup_count,
+            rlup_errors = request_log_rollups.rlup_errors + EXCLUDED.rlup_errors,
+            rlup_duration_sum =
+                request_log_rollups.rlup_duration_sum + EXCLUDED.rlup_duration_sum,
+            rlup_duration_max = GREATEST(
+                request_log_rollups.rlup_duration_max, EXCLUDED.rlup_duration_max
+            ),
+            rlup_histogram = ARRAY(
+                SELECT old + new
+                FROM unnest(request_log_rollups.rlup_histogram, EXCLUDED.rlup_histogram)
+                    WITH ORDINALITY AS bins(old, new, position)
+                ORDER BY position
+            ),
+            rlup_bytes = request_log_rollups.rlup_bytes + EXCLUDED.rlup_bytes
+        """
+    )
+
+
+# Aggregates the logs inserted in [:lower, :upper) into the rollups; the
+# histogram bucket of a duration is given by width_bucket, 0 below the first
+# bound and len(ROLLUP_LATENCY_BUCKETS) above the last one
+ROLLUP_UPSERT = _rollup_upsert()
+
+
+def _delete_expired(
+    session,
+    table_name: str,
+    column_name: str,
+    cutoff: datetime,
+    batch_size: int,
+    pause: float,
+    time_budget: Optional[float],
+    progress: Optional[Callable[[DeletionProgress], None]],
+    archive: Optional[Callable[[Sequence[Mapping[str, Any]]], None]] = None,
+    condition: Optional[str] = None,
+    policy: Optional[str] = None,
+) -> DeletionProgress:
+    """
+    `delete_in_batches`, resumed from the position the last run stopped at,
+    kept in job_watermarks; one per `policy` if any. A run that completes
+    keeps its cutoff, so the next one starts from there.
+    """
+    watermark = _retention_watermark(table_name, column_name, policy)
+    start = session.scalar(
+        select(JobWatermark.jowa_value).where(JobWatermark.jowa_name == watermark)
+    )
+    if start is not None and start >= cutoff:
+        start = None
+
+    deletion = delete_in_batches(
+        session,
+        table_name,
+        column_name,
+        cutoff,
+        start,
+        batch_size,
+        pause,
+        time_budget,
+        progress,
+        archive,
+        condition,
+    )
+
+    position = cutoff if deletion.completed else deletion.position
+    session.execute(
+        pg_insert(JobWatermark)
+        .values(jowa_name=watermark, jowa_value=position)
+        .on_conflict_do_update(
+            index_elements=["jowa_name"],
+            set_={"jowa_value": position, "jowa_updated_at": func.now()},
+        )
+    )
+    session.commit()
+
+    return deletion
+
+
+def _retention_watermark(
+    table_name: str, column_name: str, policy: Optional[str] = None
+) -> str:
+    watermark = f"retention:{table_name}.{column_name}"
+    if policy is not None:
+        watermark += f":{policy}"
+    return watermark
+
+
+def _add_progress(done: DeletionProgress, state: DeletionProgress) -> DeletionProgress:
+    """Progress of a deletion over several tables, `done` before `state`."""
+    return DeletionProgress(
+        done.deleted_rows + state.deleted_rows,
+        done.batches + state.batches,
+        done.elapsed_seconds + state.elapsed_seconds,
+        state.position or done.position,
+        done.completed and state.completed,
+    )
+
+
+def _truncate_minute(moment: datetime) -> datetime:
+    return moment.replace(second=0, microsecond=0)
+
+
+def _route_id_of(template: str):
+    return (
+        select(Route.rout_id).where(Route.rout_template == template).scalar_subquery()
+    )
+
+
+def _histogram_quantile(
+    counts: List[float], quantile: float, maximum: Optional[float]
+) -> Optional[float]:
+    total = sum(counts)
+    if not total:
+        return None
+
+    rank = quantile * total
+    cumulative = 0.0
+    lower = 0.0
+    for index, count in enumerate(counts):
+        # The last bucket is open-ended: its observed maximum bounds it
+        if index < len(ROLLUP_LATENCY_BUCKETS):
+            upper = ROLLUP_LATENCY_BUCKETS[index]
+        else:
+            upper = maximum if maximum is not None else lower
+
+        if count and cumulative + count >= rank:
+            value = lower + (upper - lower) * (rank - cumulative) / count
+            return min(value, maximum) if maximum is not None else value
+
+        cumulative += count
+        lower = upper
+
+    return maximum
+
+
+def expanded_headers():
+    """The interned and volatile headers of a request log merged together."""
+    empty = cast("{}", JSONB)
+    return func.coalesce(RequestHeaderSet.hese_headers, empty).op(
+        "||", return_type=JSONB
+    )(func.coalesce(RequestLog.relo_headers, empty))
+
+
+def _set_headers(log: RequestLog, headers: Dict[str, str]) -> RequestLog:
+    # Loaded state, not a change: the session must not write it back
+    set_committed_value(log, "relo_headers", headers)
+    return log
+
+
+def _truncate(moment: datetime, interval: str) -> datetime:
+    if interval == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _log_rows(
+    logs: Iterable[Union[Any, Dict[str, Any], Tuple]],
+    columns: Tuple[str, ...],
+    defaults: Dict[str, Any],
+) -> Iterator[Tuple]:
+    """Turn objects, dicts or tuples into bulk insert rows led by a new primary key."""
+    for log in logs:
+        if isinstance(log, tuple):
+            values = log
+        elif isinstance(log, dict):
+            values = tuple(log.get(column, defaults.get(column)) for column in columns)
+        else:
+            values = tuple(getattr(log, column, None) for column in columns)
+
+        yield (uuid4(), *values)
 
 
 def get_request_logs_repository():
@@ -110,6 +1968,16 @@ def get_request_logs_repository():
         return RequestLogRepository(session)
 
 
+def get_request_log_rollups_repository():
+    with get_session() as session:
+        return RequestLogRollupRepository(session)
+
+
+def get_request_stats_repository():
+    with get_session() as session:
+        return RequestStatRepository(session)
+
+
 def get_task_logs_repository():
     with get_session() as session:
         return TaskLogRepository(session)
@@ -119,6 +1987,51 @@ RequestLogsRepositoryDependency = Annotated[
     RequestLogRepository, Depends(get_request_logs_repository)
 ]
 
+RequestLogRollupsRepositoryDependency = Annotated[
+    RequestLogRollupRepository, Depends(get_request_log_rollups_repository)
+]
+
+RequestStatsRepositoryDependency = Annotated[
+    RequestStatRepository, Depends(get_request_stats_repository)
+]
+
 TaskLogsRepositoryDependency = Annotated[
     TaskLogRepository, Depends(get_task_logs_repository)
 ]
+
+
+async def get_async_request_logs_repository():
+    async with get_async_session() as session:
+        yield AsyncRequestLogRepository(session)
+
+
+async def get_async_request_log_rollups_repository():
+    async with get_async_session() as session:
+        yield AsyncRequestLogRollupRepository(session)
+
+
+async def get_async_request_stats_repository():
+    async with get_async_session() as session:
+        yield AsyncRequestStatRepository(session)
+
+
+async def get_async_task_logs_repository():
+    async with get_async_session() as session:
+        yield AsyncTaskLogRepository(session)
+
+
+AsyncRequestLogsRepositoryDependency = Annotated[
+    AsyncRequestLogRepository, Depends(get_async_request_logs_repository)
+]
+
+AsyncRequestLogRollupsRepositoryDependency = Annotated[
+    AsyncRequestLogRollupRepository, Depends(get_async_request_log_rollups_repository)
+]
+
+AsyncRequestStatsRepositoryDependency = Annotated[
+    AsyncRequestStatRepository, Depends(get_async_request_stats_repository)
+]
+
+AsyncTaskLogsRepositoryDependency = Annotated[
+    AsyncTaskLogRepository, Depends(get_async_task_logs_repository)
+]
@@ -0,0 +1,271 @@
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Any, Dict, Iterable, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import delete, func, insert
+from sqlalchemy.future import select
+
+from backend.app.database.base import get_async_session
+from backend.app.database.models.storage import StorageSnapshot
+from backend.app.repositories.base import AsyncBaseRepository, BaseRepository
+from backend.app.utils.database import get_table_size, get_table_stats, vacuum_table
+
+
+class StorageSnapshotRepository(BaseRepository):
+    MODEL = StorageSnapshot
+    CURSOR_COLUMNS = ("stsn_taken_at", "stsn_id")
+
+    def create(self, data: Dict[str, Any]) -> StorageSnapshot:
+        snapshot = StorageSnapshot(**data)
+        self.session.add(snapshot)
+        self.session.commit()
+        self.session.refresh(snapshot)
+        return snapshot
+
+    def update(self, id: int, data: Dict[str, Any]) -> Optional[StorageSnapshot]:
+        snapshot = self.get_by_id(id)
+        if not snapshot:
+            return None
+
+        for key, value in data.items():
+            setattr(snapshot, key, value)
+
+        self.session.commit()
+        self.session.refresh(snapshot)
+        return snapshot
+
+    def get_by_id(self, id: int) -> Optional[StorageSnapshot]:
+        return self.session.get(StorageSnapshot, id)
+
+    def delete_by_id(self, id: int) -> bool:
+        snapshot = self.get_by_id(id)
+        if not snapshot:
+            return False
+
+        self.session.delete(snapshot)
+        self.session.commit()
+        return True
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[StorageSnapshot]:
+        return (
+            self.session.execute(select(StorageSnapshot).offset(offset).limit(limit))
+            .scalars()
+            .all()
+        )
+
+    def maintain(
+        self,
+        table_names: Iterable[str],
+        vacuum_dead_ratio: float = 0.1,
+        analyze_modified_ratio: float = 0.1,
+        min_tuples: int = 10000,
+    ) -> Dict[str, Any]:
+        """
+        Record a snapshot of the sizes and dead tuples of the tables, then
+        vacuum or analyze the relations past the thresholds.
+
+        Each partition of a partitioned table is looked at on its own:
+        retention deletes from a few partitions and drops the others.
+
+        - VACUUM (ANALYZE) when at least `min_tuples` tuples are dead and
+          they are `vacuum_dead_ratio` of the tuples or more.
+        - ANALYZE when at least `min_tuples` tuples changed since the last
+          analyze and they are `analyze_modified_ratio` of the live tuples
+          or more: the planner estimates are off, `estimate_rows` included.
+
+        Args:
+            table_names (Iterable[str]): The tables to watch.
+            vacuum_dead_ratio (float): Dead tuple ratio past which a relation
+                is vacuumed.
+            analyze_modified_ratio (float): Ratio of tuples changed since the
+                last analyze past which a relation is analyzed.
+            min_tuples (int): Tuples below which small relations are left to
+                autovacuum.
+
+        Returns:
+            Dict[str, Any]: The relations recorded, vacuumed and analyzed.
+        """
+        taken_at = datetime.now(timezone.utc)
+        snapshots = []
+        for table_name in table_names:
+            for stats in get_table_stats(self.session, table_name):
+                snapshots.append(
+                    {
+                        "stsn_taken_at": taken_at,
+                        "stsn_table": table_name,
+                        **{f"stsn_{key}": value for key, value in stats.items()},
+                        "stsn_action": _maintenance_action(
+                            stats, vacuum_dead_ratio, analyze_modified_ratio, min_tuples
+                        ),
+                    }
+                )
+        # Ends the read transaction before the long-running statements
+        self.session.commit()
+
+        vacuumed, analyzed = [], []
+        with self.session.get_bind().connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            for snapshot in snapshots:
+                action = snapshot["stsn_action"]
+                if action is None:
+                    continue
+
+                relation = snapshot["stsn_relation"]
+                try:
+                    vacuum_table(connection, relation, analyze_only=action == "analyze")
+                except Exception as e:
+                    # Most likely the relation was dropped meanwhile
+                    snapshot["stsn_action"] = None
+                    print(f"Error running {action} on {relation}: {e}")
+                    continue
+
+                (vacuumed if action == "vacuum_analyze" else analyzed).append(relation)
+
+        if snapshots:
+            self.session.execute(insert(StorageSnapshot), snapshots)
+            self.session.commit()
+
+        return {
+            "taken_at": taken_at.isoformat(),
+            "relations": len(snapshots),
+            "vacuumed": vacuumed,
+            "analyzed": analyzed,
+        }
+
+    def get_history(
+        self,
+        start: datetime,
+        end: datetime,
+        table_name: Optional[str] = None,
+        relations: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        The snapshots taken in [start, end), oldest first.
+
+        Args:
+            table_name (str, optional): Only the snapshots of this table.
+            relations (bool): One row per partition, instead of one per table
+                summing its partitions.
+
+        Returns:
+            List[Dict[str, Any]]: The sizes in bytes, tuple counts, dead tuple
+                ratio and maintenance of each table at each snapshot.
+        """
+        where = [
+            StorageSnapshot.stsn_taken_at >= start,
+            StorageSnapshot.stsn_taken_at < end,
+        ]
+        if table_name is not None:
+            where.append(StorageSnapshot.stsn_table == table_name)
+
+        if relations:
+            rows = self.session.execute(
+                select(*StorageSnapshot.__table__.columns)
+                .where(*where)
+                .order_by(
+                    StorageSnapshot.stsn_taken_at,
+                    StorageSnapshot.stsn_table,
+                    StorageSnapshot.stsn_relation,
+                )
+            ).mappings()
+            return [
+                {key.removeprefix("stsn_"): value for key, value in row.items()}
+                for row in rows
+            ]
+
+        live = func.sum(StorageSnapshot.stsn_live_tuples)
+        dead = func.sum(StorageSnapshot.stsn_dead_tuples)
+        query = (
+            select(
+                StorageSnapshot.stsn_taken_at.label("taken_at"),
+                StorageSnapshot.stsn_table.label("table"),
+                func.count().label("relations"),
+                func.sum(StorageSnapshot.stsn_table_bytes).label("table_bytes"),
+                func.sum(StorageSnapshot.stsn_indexes_bytes).label("indexes_bytes"),
+                func.sum(StorageSnapshot.stsn_toast_bytes).label("toast_bytes"),
+                live.label("live_tuples"),
+                dead.label("dead_tuples"),
+                func.coalesce(dead * 1.0 / func.nullif(live + dead, 0), 0.0).label(
+                    "dead_ratio"
+                ),
+                func.count()
+                .filter(StorageSnapshot.stsn_action == "vacuum_analyze")
+                .label("vacuumed"),
+                func.count()
+                .filter(StorageSnapshot.stsn_action == "analyze")
+                .label("analyzed"),
+            )
+            .where(*where)
+            .group_by(StorageSnapshot.stsn_taken_at, StorageSnapshot.stsn_table)
+            .order_by(StorageSnapshot.stsn_taken_at, StorageSnapshot.stsn_table)
+        )
+        return [
+            {**row, "dead_ratio": float(row["dead_ratio"])}
+            for row in self.session.execute(query).mappings()
+        ]
+
+    def get_table_sizes(self, table_names: Iterable[str]) -> Dict[str, Any]:
+        """The current sizes of the tables, see `get_table_size`."""
+        sizes = {}
+        for table_name in table_names:
+            try:
+                sizes[table_name] = get_table_size(self.session, table_name)
+            except ValueError:
+                sizes[table_name] = None
+        return sizes
+
+    def delete_old_snapshots(self, time_delta: timedelta) -> int:
+        """Delete the snapshots older than `time_delta`."""
+        result = self.session.execute(
+            delete(StorageSnapshot).where(
+                StorageSnapshot.stsn_taken_at < datetime.now(timezone.utc) - time_delta
+            )
+        )
+        self.session.commit()
+        return result.rowcount
+
+
+class AsyncStorageSnapshotRepository(AsyncBaseRepository):
+    SYNC_REPOSITORY = StorageSnapshotRepository
+
+    async def get_history(
+        self,
+        start: datetime,
+        end: datetime,
+        table_name: Optional[str] = None,
+        relations: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return await self.run_sync("get_history", start, end, table_name, relations)
+
+    async def get_table_sizes(self, table_names: Iterable[str]) -> Dict[str, Any]:
+        return await self.run_sync("get_table_sizes", table_names)
+
+
+def _maintenance_action(
+    stats: Dict[str, Any],
+    vacuum_dead_ratio: float,
+    analyze_modified_ratio: float,
+    min_tuples: int,
+) -> Optional[str]:
+    """What `StorageSnapshotRepository.maintain` runs on a relation, if anything."""
+    if stats["dead_tuples"] >= min_tuples and stats["dead_ratio"] >= vacuum_dead_ratio:
+        return "vacuum_analyze"
+
+    modified = stats["modified_since_analyze"]
+    if modified >= min_tuples and modified >= analyze_modified_ratio * max(
+        stats["live_tuples"], 1
+    ):
+        return "analyze"
+
+    return None
+
+
+async def get_async_storage_snapshots_repository():
+    async with get_async_session() as session:
+        yield AsyncStorageSnapshotRepository(session)
+
+
+AsyncStorageSnapshotsRepositoryDependency = Annotated[
+    AsyncStorageSnapshotRepository, Depends(get_async_storage_snapshots_repository)
+]
@@ -5,12 +5,15 @@ from sqlalchemy.dialects.postgresql import UUID
 
 from typing import Dict, List, Any, Annotated, Optional
 
-from backend.app.database.base import get_session
+from backend.app.database.base import get_async_session, get_session
 from backend.app.database.models.tasks import Task
-from backend.app.repositories.base import BaseRepository
+from backend.app.repositories.base import AsyncBaseRepository, BaseRepository
 
 
 class TaskRepository(BaseRepository):
+    MODEL = Task
+    CURSOR_COLUMNS = ("task_created_at", "task_id")
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -60,6 +63,17 @@ class TaskRepository(BaseRepository):
             .all()
         )
 
+    def get_tasks_by_scheduler(self, schedule_type: str) -> List[Task]:
+        return (
+            self.session.execute(
+                select(Task)
+                .where(Task.task_schedule_type == schedule_type)
+                .order_by(Task.task_name)
+            )
+            .scalars()
+            .all()
+        )
+
     def delete_by_id(self, id: UUID) -> bool:
         log = self.get_by_id(id)
         if not log:
@@ -69,9 +83,26 @@ class TaskRepository(BaseRepository):
         return True
 
 
+class AsyncTaskRepository(AsyncBaseRepository):
+    SYNC_REPOSITORY = TaskRepository
+
+    async def get_tasks_by_scheduler(self, schedule_type: str) -> List[Task]:
+        return await self.run_sync("get_tasks_by_scheduler", schedule_type)
+
+
 def get_task_repository():
     with get_session() as session:
         return TaskRepository(session)
 
 
 TaskRepositoryDependency = Annotated[TaskRepository, Depends(get_task_repository)]
+
+
+async def get_async_task_repository():
+    async with get_async_session() as session:
+        yield AsyncTaskRepository(session)
+
+
+AsyncTaskRepositoryDependency = Annotated[
+    AsyncTaskRepository, Depends(get_async_task_repository)
+]
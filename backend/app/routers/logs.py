@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Request
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import UUID4
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Dict, Any, Literal, Optional, Tuple
 
 from backend.app.repositories.logs import (
-    RequestLogsRepositoryDependency,
-    TaskLogsRepositoryDependency,
+    AsyncRequestLogsRepositoryDependency,
+    AsyncRequestLogRollupsRepositoryDependency,
+    AsyncRequestStatsRepositoryDependency,
+    AsyncTaskLogsRepositoryDependency,
 )
+from backend.app.ingestion.writer import request_log_writer
+from backend.app.schemas import RequestLogFilters
 from backend.app.rate_limiter import limiter
 from backend.app.config import settings
+from backend.app.utils.export import export_response
+from backend.app.utils.pagination import get_page
 
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
@@ -17,7 +25,7 @@ router = APIRouter(prefix="/logs", tags=["Logs"])
 def create_log(
     request: Request,
     data: Dict[str, Any],
-    request_log_repository: RequestLogsRepositoryDependency,
+    request_log_repository: AsyncRequestLogsRepositoryDependency,
 ):
     return data
 
@@ -26,19 +34,145 @@ def create_log(
 @limiter.limit(settings.DEFAULT_RATE_LIMIT)
 async def read_request_logs(
     request: Request,
-    request_log_repository: RequestLogsRepositoryDependency,
-    offset: int = 0,
+    request_log_repository: AsyncRequestLogsRepositoryDependency,
+    filters: Annotated[RequestLogFilters, Depends()],
     limit: int = 100,
+    cursor: Optional[str] = None,
 ):
-    return request_log_repository.get_all(offset=offset, limit=limit)
+    logs, next_cursor = await get_page(
+        request_log_repository, limit, cursor, filters=filters
+    )
+    return {"logs": logs, "next_cursor": next_cursor}
+
+
+@router.get("/requests/export")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def export_request_logs(
+    request: Request,
+    request_log_repository: AsyncRequestLogsRepositoryDependency,
+    filters: Annotated[RequestLogFilters, Depends()],
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+):
+    try:
+        return export_response(
+            request_log_repository.export_query(filters),
+            format,
+            "request_logs",
+            settings.LOG_EXPORT_BATCH_SIZE,
+            settings.REQUEST_LOG_QUERY_TIMEOUT,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/requests/latency")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def read_request_latency(
+    request: Request,
+    request_log_repository: AsyncRequestLogsRepositoryDependency,
+    request_log_rollup_repository: AsyncRequestLogRollupsRepositoryDependency,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    route: Optional[str] = None,
+    exact: bool = False,
+):
+    start, end = _window(start, end)
+
+    # Exact percentiles need the raw logs, estimates come from the rollups
+    if exact:
+        return await request_log_repository.get_latency_percentiles(start, end, route)
+
+    return await request_log_rollup_repository.get_latency_percentiles(
+        start, end, route
+    )
+
+
+@router.get("/requests/summary")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def read_request_summary(
+    request: Request,
+    request_log_rollup_repository: AsyncRequestLogRollupsRepositoryDependency,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    route: Optional[str] = None,
+    interval: Optional[Literal["minute", "hour", "day"]] = None,
+):
+    start, end = _window(start, end)
+    return await request_log_rollup_repository.get_summary(start, end, route, interval)
+
+
+@router.get("/requests/stats")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def read_request_stats(
+    request: Request,
+    request_stat_repository: AsyncRequestStatsRepositoryDependency,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    route: Optional[str] = None,
+):
+    start, end = _window(start, end)
+    return await request_stat_repository.get_stats(start, end, route)
+
+
+@router.get("/requests/{relo_id}")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def read_request_log(
+    request: Request,
+    request_log_repository: AsyncRequestLogsRepositoryDependency,
+    relo_id: UUID4,
+):
+    log = await request_log_repository.get_by_id(relo_id)
+    if not log:
+        raise HTTPException(status_code=404, detail="Request log not found")
+
+    return log
+
+
+@router.get("/writer")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def read_writer_stats(request: Request):
+    return request_log_writer.stats()
 
 
 @router.get("/tasks")
 @limiter.limit(settings.DEFAULT_RATE_LIMIT)
 async def read_logs(
-        request: Request,
-        task_log_repository: TaskLogsRepositoryDependency, 
-        offset: int = 0, limit: int = 100
-    ):
-    return task_log_repository.get_all(offset=offset, limit=limit)
+    request: Request,
+    task_log_repository: AsyncTaskLogsRepositoryDependency,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    logs, next_cursor = await get_page(task_log_repository, limit, cursor)
+    return {"logs": logs, "next_cursor": next_cursor}
+
+
+@router.get("/tasks/export")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def export_task_logs(
+    request: Request,
+    task_log_repository: AsyncTaskLogsRepositoryDependency,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+):
+    try:
+        return export_response(
+            task_log_repository.export_query(start, end),
+            format,
+            "task_logs",
+            settings.LOG_EXPORT_BATCH_SIZE,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _window(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    # Defaults to the last hour
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
 
+    return start, end
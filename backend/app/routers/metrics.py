@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from backend.app.metrics import metrics_registry
+from backend.app.rate_limiter import limiter
+from backend.app.config import settings
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+def get_metrics(request: Request):
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
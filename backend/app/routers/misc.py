@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Request
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
 
 from backend.app.rate_limiter import limiter
 from backend.app.config import settings
+from backend.app.database.pools import pool_stats
+from backend.app.repositories.storage import AsyncStorageSnapshotsRepositoryDependency
 
 router = APIRouter(prefix="/misc", tags=["Miscelaneous"])
 
@@ -10,3 +15,41 @@ router = APIRouter(prefix="/misc", tags=["Miscelaneous"])
 @limiter.limit(settings.DEFAULT_RATE_LIMIT)
 def hello(request: Request):
     return {"hello": "world"}
+
+
+@router.get("/pools")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+def read_pool_stats(request: Request):
+    return [stats.stats() for stats in pool_stats.values()]
+
+
+@router.get("/storage")
+@limiter.limit(settings.DEFAULT_RATE_LIMIT)
+async def read_storage(
+    request: Request,
+    storage_repository: AsyncStorageSnapshotsRepositoryDependency,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    table: Optional[str] = None,
+    relations: bool = False,
+):
+    """
+    Current sizes of the watched tables, and the snapshots of the storage
+    maintenance task, by default over the last 7 days; with `relations`, one
+    row per partition.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=7)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    tables = settings.STORAGE_MAINTENANCE_TABLES
+    if table is not None:
+        if table not in tables:
+            raise HTTPException(status_code=404, detail="Table not watched")
+        tables = [table]
+
+    return {
+        "sizes": await storage_repository.get_table_sizes(tables),
+        "history": await storage_repository.get_history(start, end, table, relations),
+    }
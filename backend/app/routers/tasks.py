@@ -2,17 +2,19 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from pydantic import UUID4
 from jinja2 import Template
+from typing import Optional
 
 from backend.app.repositories.logs import (
-    TaskLogsRepositoryDependency,
+    AsyncTaskLogsRepositoryDependency,
 )
 
 from backend.app.repositories.tasks import (
-    TaskRepositoryDependency,
+    AsyncTaskRepositoryDependency,
 )
 from backend.app.schemas import TaskLogCreate
 from backend.app.rate_limiter import limiter
 from backend.app.config import settings
+from backend.app.utils.pagination import get_page
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -21,22 +23,22 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
 @limiter.limit(settings.DEFAULT_RATE_LIMIT)
 async def list_tasks(
     request: Request,
-    task_repository: TaskRepositoryDependency,
+    task_repository: AsyncTaskRepositoryDependency,
     limit: int = 100,
-    offset: int = 0,
+    cursor: Optional[str] = None,
 ):
-    tasks = task_repository.get_all(limit=limit, offset=offset)
-    return {"tasks": tasks}
+    tasks, next_cursor = await get_page(task_repository, limit, cursor)
+    return {"tasks": tasks, "next_cursor": next_cursor}
 
 
 @router.post("/")
 @limiter.limit(settings.DEFAULT_RATE_LIMIT)
 async def create_task(
     request: Request,
-    task_repository: TaskRepositoryDependency,
+    task_repository: AsyncTaskRepositoryDependency,
     task_data: TaskLogCreate,
 ):
-    task = task_repository.create(task_data.model_dump())
+    task = await task_repository.create(task_data.model_dump())
     return {"task_id": task.task_id, "message": "Task created successfully"}
 
 
@@ -44,17 +46,19 @@ async def create_task(
 @limiter.limit(settings.DEFAULT_RATE_LIMIT)
 async def read_logs(
     request: Request,
-    task_log_repository: TaskLogsRepositoryDependency,
-    offset: int = 0,
+    task_log_repository: AsyncTaskLogsRepositoryDependency,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ):
-    logs = task_log_repository.get_all(offset=offset, limit=limit)
+    logs, next_cursor = await get_page(task_log_repository, limit, cursor)
 
-    return {"logs": logs}
+    return {"logs": logs, "next_cursor": next_cursor}
 
 
 @router.get("/admin", response_class=HTMLResponse)
-async def admin_interface(request: Request, task_repository: TaskRepositoryDependency):
+async def admin_interface(
+    request: Request, task_repository: AsyncTaskRepositoryDependency
+):
     try:
         schedulers = ["background", "asyncio"]
         tasks_by_scheduler = {}
@@ -78,9 +82,9 @@ def get_admin_template() -> str:
 @router.get("/{task_id}")
 @limiter.limit("10/minute")
 async def read_task(
-    request: Request, task_repository: TaskRepositoryDependency, task_id: UUID4
+    request: Request, task_repository: AsyncTaskRepositoryDependency, task_id: UUID4
 ):
-    task = task_repository.get_by_id(task_id)
+    task = await task_repository.get_by_id(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -8,9 +8,12 @@ from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.base import BaseScheduler
 from apscheduler.executors.pool import ThreadPoolExecutor, ProcessPoolExecutor
 
-from typing import Dict, List, Any, Callable
+from contextvars import ContextVar
+from typing import Dict, List, Any, Callable, Optional
 from datetime import datetime
+from uuid import UUID
 import copy
+import json
 import traceback
 import asyncio
 import inspect
@@ -18,10 +21,34 @@ import inspect
 from backend.app.database.base import get_session, init_database, Database
 from backend.app.database.models.logs import TaskLog
 from backend.app.schemas import TaskConfig
+from backend.app.repositories.logs import TaskLogRepository
 from backend.app.repositories.tasks import TaskRepository
 from backend.app.schemas import TaskCreate
 
 
+# Id of the TaskLog of the task running in this context, see report_progress
+running_task_log: ContextVar[Optional[UUID]] = ContextVar(
+    "running_task_log", default=None
+)
+
+
+def report_progress(progress: Dict[str, Any]):
+    """
+    Record the progress of the running task in the `progress` key of the
+    details of its TaskLog, committed right away so that long tasks can be
+    followed while they run. Does nothing outside of a scheduled task.
+    """
+    talo_id = running_task_log.get()
+    if talo_id is None:
+        return
+
+    try:
+        with get_session() as session:
+            TaskLogRepository(session).update_progress(talo_id, progress)
+    except Exception as e:
+        print(f"Error reporting the progress of task log {talo_id}: {e}")
+
+
 # Custom exception for invalid scheduling parameters
 class InvalidScheduleParameter(Exception):
     pass
@@ -157,6 +184,8 @@ class ScheduledTask:
             session.add(task_log)
             session.commit()
 
+            running = running_task_log.set(task_log.talo_id)
+            result = None
             try:
                 if inspect.iscoroutinefunction(self.task_config.task_callable):
                     result = asyncio.run(
@@ -171,7 +200,6 @@ class ScheduledTask:
 
                 task_log.talo_success = True
                 task_log.talo_status = "success"
-                task_log.talo_details["result"] = result
 
             except Exception as e:
                 task_log.talo_success = False
@@ -180,7 +208,15 @@ class ScheduledTask:
                 task_log.talo_error_trace = traceback.format_exc()
 
             finally:
+                running_task_log.reset(running)
                 task_log.talo_end_time = datetime.now()
+
+                # Keep the progress reported meanwhile, see report_progress
+                session.refresh(task_log, ["talo_details"])
+                details = dict(task_log.talo_details or {})
+                if task_log.talo_success:
+                    details["result"] = json.loads(json.dumps(result, default=str))
+                task_log.talo_details = details
                 session.commit()
 
     async def schedule(self, scheduler):
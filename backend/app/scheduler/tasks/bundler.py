@@ -1,4 +1,10 @@
-from backend.app.scheduler.tasks.logs import cleanup_request_config, cleanup_task_config
+from backend.app.scheduler.tasks.logs import (
+    cleanup_request_config,
+    cleanup_task_config,
+    partition_request_config,
+    rollup_request_config,
+)
+from backend.app.scheduler.tasks.storage import maintain_storage_config
 from backend.app.scheduler.tasks.misc import (
     print_empty_task_config,
     print_full_task_config,
@@ -7,6 +13,9 @@ from backend.app.scheduler.tasks.misc import (
 task_configs = [
     cleanup_request_config,
     cleanup_task_config,
+    partition_request_config,
+    rollup_request_config,
+    maintain_storage_config,
     print_empty_task_config,
     print_full_task_config,
 ]
@@ -1,42 +1,184 @@
 from datetime import timedelta
+from typing import Optional, Sequence
 from uuid import uuid4
 
 from backend.app.database.base import get_session
-from backend.app.repositories.logs import RequestLogRepository, TaskLogRepository
+from backend.app.database.retention import (
+    RetentionPolicy,
+    request_retention_policies,
+    retention_horizon,
+)
+from backend.app.repositories.logs import (
+    LogArchiveRepository,
+    RequestLogRepository,
+    RequestLogRollupRepository,
+    RequestStatRepository,
+    TaskLogRepository,
+)
+from backend.app.scheduler.base import report_progress
 from backend.app.schemas import TaskConfig
 from backend.app.config import settings
 
+# Archive directory of the retention tasks, None when archives are disabled
+ARCHIVE_DIR = settings.LOG_ARCHIVE_DIR if settings.LOG_ARCHIVE_ENABLED else None
+ARCHIVE_RETENTION = (
+    timedelta(**settings.LOG_ARCHIVE_RETENTION)
+    if settings.LOG_ARCHIVE_ENABLED
+    else None
+)
 
-async def cleanup_request_logs(time_delta: timedelta, max_rows: int = None):
+
+def cleanup_request_logs(
+    time_delta: timedelta,
+    max_rows: Optional[int] = None,
+    batch_size: int = 5000,
+    pause: float = 0.1,
+    time_budget: Optional[float] = None,
+    archive_dir: Optional[str] = None,
+    archive_retention: Optional[timedelta] = None,
+    policies: Sequence[RetentionPolicy] = (),
+):
     """
-    Cleans up requests logs based on either time or table row count.
+    Cleans up requests logs past their retention policy, then beyond `max_rows` rows.
 
     Args:
-        time_delta (timedelta): The time difference from now. Logs older than this will be deleted.
-        max_rows (int, optional): The maximum number of rows to retain. If specified, logs will be deleted based on their creation time and this count.
+        time_delta (timedelta): The time difference from now. Logs no policy matches older than this will be deleted.
+        max_rows (int, optional): The approximate maximum number of rows to retain. If specified, the oldest logs beyond this count are deleted.
+        batch_size (int): Rows deleted per transaction.
+        pause (float): Seconds to wait between batches.
+        time_budget (float, optional): Seconds after which the run stops; the next run resumes where it stopped.
+        archive_dir (str, optional): If specified, the logs are archived to Parquet files in this directory before they are deleted.
+        archive_retention (timedelta, optional): Archive files older than this are deleted.
+        policies (Sequence[RetentionPolicy]): Retention policies by status class, duration and route, see REQUEST_RETENTION_POLICIES.
     """
     with get_session() as db_session:
         request_log_repository = RequestLogRepository(db_session)
+        result = {
+            "retention": request_log_repository.apply_retention(
+                time_delta,
+                policies,
+                batch_size,
+                pause,
+                time_budget,
+                report_progress,
+                archive_dir,
+            )
+        }
         if max_rows is not None:
-            await request_log_repository.delete_excess_logs(max_rows)
-        else:
-            await request_log_repository.delete_old_logs(time_delta)
+            if time_budget is not None:
+                time_budget -= result["retention"]["elapsed_seconds"]
+            result["max_rows"] = request_log_repository.delete_excess_logs(
+                max_rows, batch_size, pause, time_budget, report_progress, archive_dir
+            )
+        if archive_retention is not None:
+            result["archives"] = LogArchiveRepository(db_session).delete_old_archives(
+                "request_logs", archive_retention
+            )
 
+    return result
 
-async def cleanup_task_logs(time_delta: timedelta, max_rows: int = None):
+
+def cleanup_task_logs(
+    time_delta: timedelta,
+    max_rows: Optional[int] = None,
+    batch_size: int = 5000,
+    pause: float = 0.1,
+    time_budget: Optional[float] = None,
+    archive_dir: Optional[str] = None,
+    archive_retention: Optional[timedelta] = None,
+):
     """
-    Cleans up tasks logs based on either time or table row count.
+    Cleans up tasks logs older than `time_delta`, then beyond `max_rows` rows.
 
     Args:
         time_delta (timedelta): The time difference from now. Logs older than this will be deleted.
-        max_rows (int, optional): The maximum number of rows to retain. If specified, logs will be deleted based on their creation time and this count.
+        max_rows (int, optional): The approximate maximum number of rows to retain. If specified, the oldest logs beyond this count are deleted.
+        batch_size (int): Rows deleted per transaction.
+        pause (float): Seconds to wait between batches.
+        time_budget (float, optional): Seconds after which the run stops; the next run resumes where it stopped.
+        archive_dir (str, optional): If specified, the logs are archived to Parquet files in this directory before they are deleted.
+        archive_retention (timedelta, optional): Archive files older than this are deleted.
     """
     with get_session() as db_session:
         task_log_repository = TaskLogRepository(db_session)
+        result = {
+            "age": task_log_repository.delete_old_logs(
+                time_delta, batch_size, pause, time_budget, report_progress, archive_dir
+            )
+        }
         if max_rows is not None:
-            await task_log_repository.delete_excess_logs(max_rows)
-        else:
-            await task_log_repository.delete_old_logs(time_delta)
+            if time_budget is not None:
+                time_budget -= result["age"]["elapsed_seconds"]
+            result["max_rows"] = task_log_repository.delete_excess_logs(
+                max_rows, batch_size, pause, time_budget, report_progress, archive_dir
+            )
+        if archive_retention is not None:
+            result["archives"] = LogArchiveRepository(db_session).delete_old_archives(
+                "task_logs", archive_retention
+            )
+
+    return result
+
+
+def maintain_request_log_partitions(
+    time_delta: timedelta,
+    interval: str = "day",
+    premake: int = 3,
+    batch_size: int = 5000,
+    pause: float = 0.1,
+    time_budget: Optional[float] = None,
+    archive_dir: Optional[str] = None,
+):
+    """
+    Creates the request logs partitions ahead of time and drops the expired ones.
+
+    Args:
+        time_delta (timedelta): The time difference from now. Partitions entirely older than this are detached and dropped.
+        interval (str): Partition granularity, "day" or "hour".
+        premake (int): The number of future partitions to keep ready.
+        batch_size (int): Rows of the default partition deleted per transaction.
+        pause (float): Seconds to wait between batches.
+        time_budget (float, optional): Seconds after which the deletion stops; the next run resumes where it stopped.
+        archive_dir (str, optional): If specified, the logs are archived to Parquet files in this directory before they are dropped.
+    """
+    with get_session() as db_session:
+        request_log_repository = RequestLogRepository(db_session)
+        created = request_log_repository.create_partitions(interval, premake)
+        deleted = request_log_repository.delete_old_logs(
+            time_delta, batch_size, pause, time_budget, report_progress, archive_dir
+        )
+
+    return {"created_partitions": created, **deleted}
+
+
+def rollup_request_logs(
+    settle_seconds: int = 60,
+    chunk_minutes: int = 60,
+    retention: timedelta = None,
+    stats_retention: timedelta = None,
+):
+    """
+    Aggregates the request logs inserted since the last run into the per-minute rollups.
+
+    Args:
+        settle_seconds (int): Logs inserted more recently than this are left to the next run.
+        chunk_minutes (int): Minutes of logs aggregated per transaction.
+        retention (timedelta, optional): Rollups older than this are deleted.
+        stats_retention (timedelta, optional): Request statistics older than this are deleted.
+    """
+    with get_session() as db_session:
+        rollup_repository = RequestLogRollupRepository(db_session)
+        result = rollup_repository.refresh(
+            timedelta(seconds=settle_seconds), timedelta(minutes=chunk_minutes)
+        )
+        if retention is not None:
+            result["deleted_rollups"] = rollup_repository.delete_old_rollups(retention)
+        if stats_retention is not None:
+            result["deleted_stats"] = RequestStatRepository(
+                db_session
+            ).delete_old_stats(stats_retention)
+
+    return result
 
 
 # Schedule the task to run at regular intervals
@@ -48,8 +190,14 @@ cleanup_request_config = TaskConfig(
     task_type="cron",
     task_callable=cleanup_request_logs,
     task_args=[
-        settings.REQUEST_CLEANUP_AGE,
+        timedelta(**settings.REQUEST_CLEANUP_AGE),
         settings.REQUEST_CLEANUP_MAX_ROWS,
+        settings.RETENTION_BATCH_SIZE,
+        settings.RETENTION_BATCH_PAUSE,
+        settings.RETENTION_TIME_BUDGET,
+        ARCHIVE_DIR,
+        ARCHIVE_RETENTION,
+        request_retention_policies(),
     ],
 )
 
@@ -62,7 +210,49 @@ cleanup_task_config = TaskConfig(
     task_type="cron",
     task_callable=cleanup_task_logs,
     task_args=[
-        settings.REQUEST_CLEANUP_AGE,
-        settings.REQUEST_CLEANUP_MAX_ROWS,
+        settings.TASK_CLEANUP_AGE,
+        settings.TASK_CLEANUP_MAX_ROWS,
+        settings.RETENTION_BATCH_SIZE,
+        settings.RETENTION_BATCH_PAUSE,
+        settings.RETENTION_TIME_BUDGET,
+        ARCHIVE_DIR,
+        ARCHIVE_RETENTION,
+    ],
+)
+
+# Schedule the task to run at regular intervals
+partition_request_config = TaskConfig(
+    task_id=uuid4(),
+    schedule_type="asyncio",
+    schedule_params=settings.REQUEST_LOG_PARTITION_SCHEDULE_KWARGS,
+    task_name=f"Maintain request log partitions with schedule period {settings.REQUEST_LOG_PARTITION_SCHEDULE_KWARGS}",
+    task_type="interval",
+    task_callable=maintain_request_log_partitions,
+    task_args=[
+        retention_horizon(
+            timedelta(**settings.REQUEST_CLEANUP_AGE), request_retention_policies()
+        ),
+        settings.REQUEST_LOG_PARTITION_INTERVAL,
+        settings.REQUEST_LOG_PARTITION_PREMAKE,
+        settings.RETENTION_BATCH_SIZE,
+        settings.RETENTION_BATCH_PAUSE,
+        settings.RETENTION_TIME_BUDGET,
+        ARCHIVE_DIR,
+    ],
+)
+
+# Schedule the task to run at regular intervals
+rollup_request_config = TaskConfig(
+    task_id=uuid4(),
+    schedule_type="asyncio",
+    schedule_params=settings.REQUEST_ROLLUP_SCHEDULE_KWARGS,
+    task_name=f"Rollup request logs with schedule period {settings.REQUEST_ROLLUP_SCHEDULE_KWARGS}",
+    task_type="interval",
+    task_callable=rollup_request_logs,
+    task_args=[
+        settings.REQUEST_ROLLUP_SETTLE_SECONDS,
+        settings.REQUEST_ROLLUP_CHUNK_MINUTES,
+        timedelta(**settings.REQUEST_ROLLUP_RETENTION),
+        timedelta(**settings.REQUEST_STATS_RETENTION),
     ],
 )
@@ -0,0 +1,54 @@
+from datetime import timedelta
+from typing import List, Optional
+from uuid import uuid4
+
+from backend.app.database.base import get_session
+from backend.app.repositories.storage import StorageSnapshotRepository
+from backend.app.schemas import TaskConfig
+from backend.app.config import settings
+
+
+def maintain_storage(
+    table_names: List[str],
+    vacuum_dead_ratio: float = 0.1,
+    analyze_modified_ratio: float = 0.1,
+    min_tuples: int = 10000,
+    retention: Optional[timedelta] = None,
+):
+    """
+    Records the sizes and dead tuples of the tables, then vacuums or analyzes the relations past the thresholds.
+
+    Args:
+        table_names (List[str]): The tables to watch; partitioned tables are recorded and maintained partition by partition.
+        vacuum_dead_ratio (float): Dead tuple ratio past which a relation is vacuumed.
+        analyze_modified_ratio (float): Ratio of the live tuples changed since the last analyze past which a relation is analyzed.
+        min_tuples (int): Relations with fewer dead or changed tuples are left to autovacuum.
+        retention (timedelta, optional): Snapshots older than this are deleted.
+    """
+    with get_session() as db_session:
+        repository = StorageSnapshotRepository(db_session)
+        result = repository.maintain(
+            table_names, vacuum_dead_ratio, analyze_modified_ratio, min_tuples
+        )
+        if retention is not None:
+            result["deleted_snapshots"] = repository.delete_old_snapshots(retention)
+
+    return result
+
+
+# Schedule the task to run at regular intervals
+maintain_storage_config = TaskConfig(
+    task_id=uuid4(),
+    schedule_type="asyncio",
+    schedule_params=settings.STORAGE_MAINTENANCE_CRON_KWARGS,
+    task_name=f"Maintain storage with schedule period {settings.STORAGE_MAINTENANCE_CRON_KWARGS}",
+    task_type="cron",
+    task_callable=maintain_storage,
+    task_args=[
+        settings.STORAGE_MAINTENANCE_TABLES,
+        settings.STORAGE_VACUUM_DEAD_RATIO,
+        settings.STORAGE_ANALYZE_MODIFIED_RATIO,
+        settings.STORAGE_MAINTENANCE_MIN_TUPLES,
+        timedelta(**settings.STORAGE_SNAPSHOT_RETENTION),
+    ],
+)
@@ -9,25 +9,66 @@ class RequestLogBase(BaseModel):
     relo_method: str
     relo_url: str
     relo_body: Optional[str] = None
-    relo_headers: dict
+    relo_body_size: Optional[int] = Field(
+        None, description="Size of the request body in bytes"
+    )
+    relo_body_hash: Optional[str] = Field(
+        None, description="Hash of the request body when it was not captured"
+    )
+    relo_response_body: Optional[str] = Field(
+        None, description="Captured response body"
+    )
+    relo_response_body_hash: Optional[str] = Field(
+        None, description="Hash of the response body when it was not captured"
+    )
+    relo_headers: Optional[dict] = None
+    relo_headers_hash: Optional[str] = Field(
+        None, description="Hash of the interned header set"
+    )
     relo_status_code: int
     relo_ip_address: Optional[str] = Field(None, description="Client's IP address")
     relo_device_info: Optional[str] = Field(None, description="Device information")
     relo_absolute_path: Optional[str] = Field(
         None, description="Absolute path of the request"
     )
+    relo_query_string: Optional[str] = Field(
+        None, description="Query string of the request"
+    )
+    relo_route_id: Optional[int] = Field(
+        None, description="Id of the route template that handled the request"
+    )
     relo_request_duration_seconds: Optional[float] = Field(
         None, description="Duration of the request in seconds"
     )
     relo_response_size: Optional[int] = Field(
         None, description="Size of the response in bytes"
     )
+    relo_sample_weight: float = Field(
+        1.0, description="Number of requests this sampled log stands for"
+    )
 
 
 class RequestLogCreate(RequestLogBase):
     pass
 
 
+class RequestLogFilters(BaseModel):
+    """Filters of the request log listing, all optional and combined with AND."""
+
+    start: Optional[datetime] = Field(None, description="Inserted at or after")
+    end: Optional[datetime] = Field(None, description="Inserted before")
+    method: Optional[str] = None
+    status_code: Optional[int] = Field(None, ge=100, le=599)
+    status_class: Optional[int] = Field(
+        None, ge=1, le=5, description="First digit of the status code, e.g. 5 for 5xx"
+    )
+    route: Optional[str] = Field(None, description="Route template")
+    ip_address: Optional[str] = Field(None, description="Client's IP address")
+    min_duration: Optional[float] = Field(None, ge=0, description="In seconds")
+    max_duration: Optional[float] = Field(None, ge=0, description="In seconds")
+    min_response_size: Optional[int] = Field(None, ge=0, description="In bytes")
+
+
 class TaskLogCreate(BaseModel):
     talo_name: str
     talo_status: str
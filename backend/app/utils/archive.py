@@ -0,0 +1,180 @@
+import json
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from os import fsync, makedirs, path, remove, replace
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from sqlalchemy import Column
+from sqlalchemy.types import JSON
+
+from backend.app.utils.export import ParquetEncoder, pyarrow
+
+if pyarrow is not None:
+    import pyarrow.parquet
+
+
+class ArchiveFile(NamedTuple):
+    path: str
+    day: date
+    start: datetime  # Oldest row
+    end: datetime  # Newest row
+    rows: int
+    size: int  # Bytes
+
+
+def write_archive(
+    directory: str,
+    table_name: str,
+    time_column: str,
+    columns: Sequence[Column],
+    rows: Sequence[Mapping[str, Any]],
+) -> List[ArchiveFile]:
+    """
+    Write rows to zstd-compressed Parquet files, one per day of `time_column`
+    (UTC), under `<directory>/<table_name>/day=<YYYY-MM-DD>/`.
+
+    Each file is written under a temporary name, synced to disk and renamed,
+    so a file that exists is complete: callers delete the rows from the
+    database only afterwards.
+
+    Args:
+        directory (str): Root directory of the archive.
+        table_name (str): Name of the archived table, also the name of its
+            archive directory.
+        time_column (str): The timestamp column that partitions the files.
+        columns (Sequence[Column]): The archived columns; their types give
+            the Parquet schema and JSON columns are stored as JSON text.
+        rows (Sequence[Mapping[str, Any]]): The rows, by column name.
+
+    Returns:
+        List[ArchiveFile]: The files written, to record in the manifest.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+    if pyarrow is None:
+        raise RuntimeError("Log archives need pyarrow to be installed")
+
+    names = [column.name for column in columns]
+    days: Dict[date, List[Tuple]] = defaultdict(list)
+    for row in rows:
+        moment = row[time_column].astimezone(timezone.utc)
+        days[moment.date()].append(tuple(row.get(name) for name in names))
+
+    time_index = names.index(time_column)
+    files = []
+    for day, day_rows in sorted(days.items()):
+        times = [row[time_index] for row in day_rows]
+        folder = path.join(directory, table_name, f"day={day:%Y-%m-%d}")
+        makedirs(folder, exist_ok=True)
+        file_path = path.join(folder, f"{min(times):%H%M%S}-{uuid4().hex[:12]}.parquet")
+
+        encoder = ParquetEncoder(names, [column.type for column in columns])
+        data = encoder.start() + encoder.encode(day_rows) + encoder.finish()
+        with open(f"{file_path}.tmp", "wb") as archive_file:
+            archive_file.write(data)
+            archive_file.flush()
+            fsync(archive_file.fileno())
+        replace(f"{file_path}.tmp", file_path)
+
+        files.append(
+            ArchiveFile(
+                file_path, day, min(times), max(times), len(day_rows), len(data)
+            )
+        )
+
+    return files
+
+
+def read_archive(
+    file_path: str,
+    columns: Sequence[Column],
+    filters: Optional[List[Tuple[str, str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Read the rows of an archive file matching `filters`.
+
+    Args:
+        file_path (str): A file written by `write_archive`.
+        columns (Sequence[Column]): The archived columns, to decode the JSON
+            ones.
+        filters (List[Tuple[str, str, Any]], optional): Conditions combined
+            with AND, e.g. ("relo_status_code", ">=", 500). Parquet keeps
+            min/max statistics per row group, so row groups that cannot match
+            are not read.
+
+    Returns:
+        List[Dict[str, Any]]: The rows, by column name.
+    """
+    if pyarrow is None:
+        raise RuntimeError("Log archives need pyarrow to be installed")
+
+    # The day=YYYY-MM-DD folder is a layout detail, not a column of the rows
+    rows = pyarrow.parquet.read_table(
+        file_path, filters=filters or None, partitioning=None
+    ).to_pylist()
+
+    json_columns = [column.name for column in columns if isinstance(column.type, JSON)]
+    for row in rows:
+        for name in json_columns:
+            if row.get(name) is not None:
+                row[name] = json.loads(row[name])
+
+    return rows
+
+
+def read_newest(
+    files: Sequence[Tuple[str, datetime]],
+    columns: Sequence[Column],
+    time_column: str,
+    id_column: str,
+    count: int,
+    filters: Optional[List[Tuple[str, str, Any]]] = None,
+    before: Optional[Tuple[datetime, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    The `count` newest rows of archive files matching `filters`, newest
+    first by (`time_column`, `id_column`).
+
+    Args:
+        files (Sequence[Tuple[str, datetime]]): The files and the time of
+            their newest row, newest first. Reading stops once `count` rows
+            are newer than the next file.
+        before (Tuple[datetime, str], optional): Only rows before this
+            (time, id) key, the last row of the previous page.
+    """
+
+    def key(row: Dict[str, Any]) -> Tuple[datetime, str]:
+        return row[time_column], str(row[id_column])
+
+    filters = list(filters or [])
+    if before is not None:
+        filters.append((time_column, "<=", before[0]))
+
+    rows: List[Dict[str, Any]] = []
+    for index, (file_path, _) in enumerate(files):
+        rows.extend(
+            row
+            for row in read_archive(file_path, columns, filters)
+            if before is None or key(row) < before
+        )
+        rows.sort(key=key, reverse=True)
+        del rows[count:]
+
+        if (
+            len(rows) == count
+            and index + 1 < len(files)
+            and rows[-1][time_column] > files[index + 1][1]
+        ):
+            break
+
+    return rows
+
+
+def remove_archive(file_path: str):
+    """Delete an archive file, if it still exists."""
+    try:
+        remove(file_path)
+    except FileNotFoundError:
+        pass
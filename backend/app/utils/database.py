@@ -1,5 +1,25 @@
-from sqlalchemy import text
+import io
+import json
+import re
+from datetime import datetime, timezone
+from itertools import islice
+from time import monotonic, sleep
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from sqlalchemy import JSON, Boolean, Connection, DateTime, Integer, Table, insert, text
 from sqlalchemy.orm import Session
+from sqlalchemy.types import TypeEngine
 
 
 def get_table_size(
@@ -8,27 +28,37 @@ def get_table_size(
     """
     Get the size of a PostgreSQL table including its indexes and the total size.
 
+    The sizes of a partitioned table are the sums over its partitions.
+
     Args:
         session (Session): SQLAlchemy session object.
         table_name (str): The name of the table to measure.
         schema_name (str): The schema where the table resides. Defaults to 'public'.
 
     Returns:
-        dict: A dictionary with keys 'table_size', 'indexes_size', and 'total_size' containing human-readable size strings.
+        dict: A dictionary with keys 'table_size', 'indexes_size', 'toast_size' and 'total_size' containing human-readable size strings.
     """
     query = text(
         """
         SELECT 
-            pg_size_pretty(pg_table_size(c.oid)) AS table_size,
-            pg_size_pretty(pg_indexes_size(c.oid)) AS indexes_size,
-            pg_size_pretty(pg_total_relation_size(c.oid)) AS total_size
+            pg_size_pretty(SUM(pg_relation_size(tree.relid))) AS table_size,
+            pg_size_pretty(SUM(pg_indexes_size(tree.relid))) AS indexes_size,
+            pg_size_pretty(SUM(COALESCE(pg_total_relation_size(
+                NULLIF(c.reltoastrelid, 0)), 0))) AS toast_size,
+            pg_size_pretty(SUM(pg_total_relation_size(tree.relid))) AS total_size
         FROM 
-            pg_class c
-        LEFT JOIN 
-            pg_namespace n ON n.oid = c.relnamespace
+            pg_class p
+        JOIN 
+            pg_namespace n ON n.oid = p.relnamespace
+        CROSS JOIN 
+            pg_partition_tree(p.oid) tree
+        JOIN 
+            pg_class c ON c.oid = tree.relid
         WHERE 
             n.nspname = :schema_name 
-            AND c.relname = :table_name
+            AND p.relname = :table_name
+            AND tree.isleaf
+        GROUP BY p.oid
     """
     )
 
@@ -40,7 +70,504 @@ def get_table_size(
         return {
             "table_size": result.table_size,
             "indexes_size": result.indexes_size,
+            "toast_size": result.toast_size,
             "total_size": result.total_size,
         }
     else:
         raise ValueError(f"Table {table_name} not found in schema {schema_name}")
+
+
+def get_table_stats(
+    session: Session, table_name: str, schema_name: str = "public"
+) -> List[Dict[str, Any]]:
+    """
+    Sizes in bytes and tuple counts of a table, or of each partition of a
+    partitioned table, from pg_stat_user_tables.
+
+    The counts are the cumulative statistics of the server, updated by
+    autovacuum and ANALYZE: estimates, but free to read.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per relation, with its name
+            ("relation"), "table_bytes" (main fork), "indexes_bytes",
+            "toast_bytes", "live_tuples", "dead_tuples", "dead_ratio",
+            "modified_since_analyze", "last_vacuum" and "last_analyze".
+    """
+    query = text(
+        """
+        SELECT
+            s.relname AS relation,
+            pg_relation_size(s.relid) AS table_bytes,
+            pg_indexes_size(s.relid) AS indexes_bytes,
+            COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0)
+                AS toast_bytes,
+            s.n_live_tup AS live_tuples,
+            s.n_dead_tup AS dead_tuples,
+            COALESCE(
+                s.n_dead_tup::float / NULLIF(s.n_live_tup + s.n_dead_tup, 0), 0
+            ) AS dead_ratio,
+            s.n_mod_since_analyze AS modified_since_analyze,
+            GREATEST(s.last_vacuum, s.last_autovacuum) AS last_vacuum,
+            GREATEST(s.last_analyze, s.last_autoanalyze) AS last_analyze
+        FROM pg_partition_tree(CAST(:table_name AS regclass)) tree
+        JOIN pg_stat_user_tables s ON s.relid = tree.relid
+        JOIN pg_class c ON c.oid = tree.relid
+        WHERE tree.isleaf AND s.schemaname = :schema_name
+        ORDER BY s.relname
+    """
+    )
+
+    return [
+        dict(row)
+        for row in session.execute(
+            query, {"schema_name": schema_name, "table_name": table_name}
+        ).mappings()
+    ]
+
+
+def vacuum_table(connection: Connection, table_name: str, analyze_only: bool = False):
+    """
+    Run VACUUM (ANALYZE) on a table, or only ANALYZE.
+
+    VACUUM marks the space of dead tuples reusable without locking out
+    reads or writes; it does not give the space back to the system.
+
+    Args:
+        connection (Connection): A connection in AUTOCOMMIT isolation level,
+            VACUUM cannot run in a transaction.
+    """
+    quote = connection.dialect.identifier_preparer.quote
+    statement = "ANALYZE" if analyze_only else "VACUUM (ANALYZE)"
+    connection.execute(text(f"{statement} {quote(table_name)}"))
+
+
+def estimate_rows(session: Session, table_name: str) -> int:
+    """
+    Estimate the rows of a table, partitions included, from the planner
+    statistics (pg_class.reltuples) rather than counting them.
+
+    No row is read: the estimate is as fresh as the last vacuum or analyze
+    of each partition, and partitions never analyzed count as empty.
+    """
+    return sum(estimate_partition_rows(session, table_name).values())
+
+
+def estimate_partition_rows(session: Session, table_name: str) -> Dict[str, int]:
+    """The planner row estimate of each leaf partition, see `estimate_rows`."""
+    query = text(
+        """
+        SELECT c.relname, CAST(GREATEST(c.reltuples, 0) AS bigint)
+        FROM pg_partition_tree(CAST(:table_name AS regclass)) tree
+        JOIN pg_class c ON c.oid = tree.relid
+        WHERE tree.isleaf
+    """
+    )
+
+    return dict(session.execute(query, {"table_name": table_name}).all())
+
+
+class Partition(NamedTuple):
+    name: str
+    lower: Optional[datetime]  # None for MINVALUE and the default partition
+    upper: Optional[datetime]  # None for MAXVALUE and the default partition
+    is_default: bool
+
+
+_RANGE_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def get_partitions(session: Session, table_name: str) -> List[Partition]:
+    """
+    List the partitions of a table partitioned by range on a timestamp.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        table_name (str): The partitioned table.
+
+    Returns:
+        List[Partition]: The partitions, ordered by lower bound.
+    """
+    query = text(
+        """
+        SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table_name
+    """
+    )
+
+    partitions = []
+    for name, bound in session.execute(query, {"table_name": table_name}):
+        match = _RANGE_BOUND.search(bound)
+        if match is None:
+            partitions.append(Partition(name, None, None, True))
+            continue
+
+        lower, upper = (_parse_bound(value) for value in match.groups())
+        partitions.append(Partition(name, lower, upper, False))
+
+    # Bounds are timezone-aware: MINVALUE must be too to compare with them
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(partitions, key=lambda p: (p.is_default, p.lower or oldest))
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def find_row_cutoff(
+    session: Session, table_name: str, column_name: str, offset: int
+) -> Optional[Any]:
+    """
+    The `column_name` of the row at `offset` in ascending order of that
+    column, without reading the rows before it.
+
+    The leaf partitions are walked by range (the default partition last: it
+    holds the rows past the newest partition), skipping `offset` rows by
+    their planner estimates (pg_class.reltuples), down to the partition the
+    row falls in. One seek of its index on the column then reads the row:
+    the cost is bounded by the size of that partition, not of the table. A
+    table that is not partitioned is its own only partition.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        table_name (str): A table partitioned by range on `column_name`, or
+            not partitioned.
+        column_name (str): The indexed column.
+        offset (int): Rows before the cutoff.
+
+    Returns:
+        Optional[Any]: The value, None when the estimates exceed the rows
+            actually there.
+    """
+    estimates = estimate_partition_rows(session, table_name)
+    leaves = [partition.name for partition in get_partitions(session, table_name)] or [
+        table_name
+    ]
+
+    for leaf in leaves:
+        estimate = estimates.get(leaf, 0)
+        if offset < estimate or leaf == leaves[-1]:
+            break
+        offset -= estimate
+
+    quote = session.get_bind().dialect.identifier_preparer.quote
+    return session.scalar(
+        text(
+            f"SELECT {quote(column_name)} FROM {quote(leaf)} "
+            f"ORDER BY {quote(column_name)} OFFSET :offset LIMIT 1"
+        ),
+        {"offset": offset},
+    )
+
+
+def create_range_partition(
+    session: Session,
+    table_name: str,
+    partition_name: str,
+    lower: datetime,
+    upper: datetime,
+):
+    """
+    Create the partition of `table_name` for [lower, upper). The caller commits.
+    """
+    quote = session.get_bind().dialect.identifier_preparer.quote
+    session.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {quote(partition_name)} "
+            f"PARTITION OF {quote(table_name)} "
+            "FOR VALUES FROM (:lower) TO (:upper)"
+        ),
+        {"lower": lower, "upper": upper},
+    )
+
+
+def drop_partition(
+    session: Session, table_name: str, partition_name: str, lock_timeout: str = "5s"
+):
+    """
+    Detach a partition, then drop it. The caller commits.
+
+    The detach briefly takes an exclusive lock on the parent table;
+    `lock_timeout` bounds the wait for it so that inserts never queue behind
+    a retention run for long.
+    """
+    quote = session.get_bind().dialect.identifier_preparer.quote
+    session.execute(
+        text("SELECT set_config('lock_timeout', :timeout, true)"),
+        {"timeout": lock_timeout},
+    )
+    session.execute(
+        text(
+            f"ALTER TABLE {quote(table_name)} DETACH PARTITION {quote(partition_name)}"
+        )
+    )
+    session.execute(text(f"DROP TABLE {quote(partition_name)}"))
+
+
+class DeletionProgress(NamedTuple):
+    deleted_rows: int
+    batches: int
+    elapsed_seconds: float
+    position: Optional[datetime]  # Time of the last row deleted
+    completed: bool  # False while expired rows may remain
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **self._asdict(),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "position": self.position.isoformat() if self.position else None,
+        }
+
+
+def delete_in_batches(
+    session: Session,
+    table_name: str,
+    column_name: str,
+    cutoff: datetime,
+    start: Optional[datetime] = None,
+    batch_size: int = 5000,
+    pause: float = 0.1,
+    time_budget: Optional[float] = None,
+    progress: Optional[Callable[[DeletionProgress], None]] = None,
+    archive: Optional[Callable[[Sequence[Mapping[str, Any]]], None]] = None,
+    condition: Optional[str] = None,
+) -> DeletionProgress:
+    """
+    Delete the rows of a table older than `cutoff`, oldest first, in batches
+    of `batch_size` rows, each batch in its own transaction.
+
+    Each batch is found by an index seek on `column_name` from the position
+    the previous batch reached, and deleted by tuple id (ctid): no statement
+    holds its locks or writes WAL for more than one batch, and the `pause`
+    between batches lets vacuum, replicas and concurrent inserts catch up.
+    No batch is started once `time_budget` seconds have passed.
+
+    Args:
+        session (Session): SQLAlchemy session object, committed after each
+            batch.
+        table_name (str): A plain table or a partition, not a partitioned
+            table.
+        column_name (str): An indexed timestamp column.
+        cutoff (datetime): Rows before this time are deleted.
+        start (datetime, optional): The position of a previous run that did
+            not complete: rows before it were deleted already.
+        progress (Callable, optional): Called after each batch.
+        archive (Callable, optional): Called with the rows of each batch,
+            all their columns, before the batch is committed; an exception
+            rolls the batch back.
+        condition (str, optional): SQL condition on the rows to delete, on
+            top of the cutoff; the others are kept.
+
+    Returns:
+        DeletionProgress: The rows deleted, and the position to resume from
+            when the run did not complete.
+    """
+    quote = session.get_bind().dialect.identifier_preparer.quote
+    table, column = quote(table_name), quote(column_name)
+    batch = f"""
+        DELETE FROM {table}
+        WHERE ctid = ANY(ARRAY(
+            SELECT ctid FROM {table}
+            WHERE {column} >= :start AND {column} < :cutoff
+            {f"AND ({condition})" if condition else ""}
+            ORDER BY {column}
+            LIMIT :batch_size
+        ))
+        AND {column} < :cutoff
+    """
+    if archive is None:
+        statement = text(
+            f"WITH deleted AS ({batch} RETURNING {column}) "
+            f"SELECT count(*), max({column}) FROM deleted"
+        )
+    else:
+        statement = text(f"{batch} RETURNING *")
+
+    started = monotonic()
+    state = DeletionProgress(0, 0, 0.0, start, False)
+    while True:
+        result = session.execute(
+            statement,
+            {
+                "start": state.position or datetime.min,
+                "cutoff": cutoff,
+                "batch_size": batch_size,
+            },
+        )
+        if archive is None:
+            deleted, position = result.one()
+        else:
+            rows = result.mappings().all()
+            deleted = len(rows)
+            position = max((row[column_name] for row in rows), default=None)
+            if rows:
+                # Before the commit: rows that fail to be archived are kept
+                archive(rows)
+        session.commit()
+
+        state = DeletionProgress(
+            state.deleted_rows + deleted,
+            state.batches + 1,
+            monotonic() - started,
+            position or state.position,
+            deleted < batch_size,
+        )
+        if progress is not None:
+            progress(state)
+
+        if state.completed:
+            return state
+        if time_budget is not None and state.elapsed_seconds + pause >= time_budget:
+            return state
+
+        sleep(pause)
+
+
+def bulk_insert(
+    session: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Insert rows into a table without building ORM instances.
+
+    On PostgreSQL with psycopg2 the rows are streamed through
+    `COPY ... FROM STDIN` in text format; on other dialects they are inserted
+    with multi-row INSERT statements of `chunk_size` rows. The caller commits.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        table (Table): The table to insert into.
+        columns (Sequence[str]): The column names, in the order of each row.
+        rows (Iterable[Sequence[Any]]): The rows to insert. Consumed lazily.
+        chunk_size (int): Rows per INSERT statement on the fallback path.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+    connection = session.connection()
+    dialect = connection.dialect
+
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        return _copy_rows(connection, table, columns, rows)
+
+    return _insert_rows(connection, table, columns, rows, chunk_size)
+
+
+def _insert_rows(
+    connection: Connection,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    chunk_size: int,
+) -> int:
+    inserted = 0
+    rows = iter(rows)
+
+    while chunk := [dict(zip(columns, row)) for row in islice(rows, chunk_size)]:
+        connection.execute(insert(table).values(chunk))
+        inserted += len(chunk)
+
+    return inserted
+
+
+def _copy_rows(
+    connection: Connection,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> int:
+    quote = connection.dialect.identifier_preparer.quote
+    statement = "COPY {} ({}) FROM STDIN".format(
+        quote(table.name), ", ".join(quote(column) for column in columns)
+    )
+
+    encoders = [_copy_encoder(table.c[column].type) for column in columns]
+    stream = _CopyStream(
+        "\t".join(
+            "\\N" if value is None else _copy_escape(encode(value))
+            for encode, value in zip(encoders, row)
+        )
+        + "\n"
+        for row in rows
+    )
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(statement, stream)
+    finally:
+        cursor.close()
+
+    return stream.lines
+
+
+def _copy_encoder(column_type: TypeEngine) -> Callable[[Any], str]:
+    if isinstance(column_type, JSON):
+        return lambda value: json.dumps(value, default=str)
+
+    if isinstance(column_type, Boolean):
+        return lambda value: "t" if value else "f"
+
+    if isinstance(column_type, Integer):
+        # COPY does not apply the assignment casts an INSERT would
+        return lambda value: (
+            str(round(value)) if isinstance(value, float) else str(value)
+        )
+
+    if isinstance(column_type, DateTime):
+        return lambda value: (
+            value.isoformat() if isinstance(value, datetime) else str(value)
+        )
+
+    return str
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_escape(value: str) -> str:
+    return value.translate(_COPY_ESCAPES)
+
+
+class _CopyStream(io.RawIOBase):
+    """
+    Read-only file object over an iterator of COPY text lines, so psycopg2 can
+    stream them to the server without the whole payload being materialized.
+    """
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = b""
+        self.lines = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self._buffer]
+        length = len(self._buffer)
+
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+
+            encoded = line.encode()
+            chunks.append(encoded)
+            length += len(encoded)
+            self.lines += 1
+
+        data = b"".join(chunks)
+        if size < 0:
+            self._buffer = b""
+            return data
+
+        self._buffer = data[size:]
+        return data[:size]
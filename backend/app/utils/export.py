@@ -0,0 +1,239 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, text
+
+from backend.app.database.base import get_async_session
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet exports are optional
+    pyarrow = None
+
+# Media type and file extension of each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def export_response(
+    query: Select,
+    export_format: str,
+    filename: str,
+    batch_size: int = 5000,
+    statement_timeout: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Stream the rows of `query` as a file download.
+
+    Rows are fetched `batch_size` at a time from a server-side cursor, as
+    plain rows rather than ORM objects, and each batch is encoded and sent
+    before the next one is fetched: memory stays at one batch whatever the
+    number of rows. Parquet files get one row group per batch.
+
+    The query runs on its own async session, open until the last row is
+    sent.
+
+    Args:
+        query (Select): A Core select; its column names and types give the
+            fields of the export.
+        export_format (str): "ndjson", "csv" or "parquet".
+        filename (str): Name of the download, without extension.
+        batch_size (int): Rows per fetch, and per Parquet row group.
+        statement_timeout (str, optional): Server-side limit of each fetch.
+
+    Raises:
+        ValueError: If the format is unknown or not available.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {export_format}")
+    if export_format == "parquet" and pyarrow is None:
+        raise ValueError("Parquet exports need pyarrow to be installed")
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    encoders = {
+        "ndjson": _NdjsonEncoder,
+        "csv": _CsvEncoder,
+        "parquet": ParquetEncoder,
+    }
+
+    async def content() -> AsyncIterator[bytes]:
+        async with get_async_session() as session:
+            if statement_timeout is not None:
+                await session.execute(
+                    text("SELECT set_config('statement_timeout', :timeout, true)"),
+                    {"timeout": statement_timeout},
+                )
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+
+            encoder = encoders[export_format](
+                list(result.keys()), [column.type for column in query.selected_columns]
+            )
+            yield encoder.start()
+            async for batch in result.partitions():
+                yield encoder.encode(batch)
+            yield encoder.finish()
+
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"'
+        },
+    )
+
+
+class _NdjsonEncoder:
+    def __init__(self, names: List[str], types: List[Any]):
+        self.names = names
+
+    def start(self) -> bytes:
+        return b""
+
+    def encode(self, batch: Sequence) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(self.names, row)), default=_json_default) + "\n"
+            for row in batch
+        ).encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _CsvEncoder:
+    def __init__(self, names: List[str], types: List[Any]):
+        self.names = names
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def start(self) -> bytes:
+        self.writer.writerow(self.names)
+        return self._drain()
+
+    def encode(self, batch: Sequence) -> bytes:
+        self.writer.writerows([[_csv_value(value) for value in row] for row in batch])
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+    def _drain(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+class ParquetEncoder:
+    def __init__(self, names: List[str], types: List[Any]):
+        fields, self.converters = [], []
+        for name, column_type in zip(names, types):
+            arrow_type, converter = _arrow_type(column_type)
+            fields.append(pyarrow.field(name, arrow_type))
+            self.converters.append(converter)
+        self.schema = pyarrow.schema(fields)
+
+        self.sink = _ChunkSink()
+        self.writer = pyarrow.parquet.ParquetWriter(
+            self.sink, self.schema, compression="zstd"
+        )
+
+    def start(self) -> bytes:
+        return self.sink.drain()
+
+    def encode(self, batch: Sequence) -> bytes:
+        columns = [
+            pyarrow.array(
+                (
+                    [convert(row[index]) for row in batch]
+                    if convert
+                    else [row[index] for row in batch]
+                ),
+                type=field.type,
+            )
+            for index, (field, convert) in enumerate(zip(self.schema, self.converters))
+        ]
+        # One row group per batch
+        self.writer.write_table(pyarrow.Table.from_arrays(columns, schema=self.schema))
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        # The footer is written on close
+        self.writer.close()
+        return self.sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting the bytes written since the last drain."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_type(column_type) -> tuple:
+    """Arrow type of a column type, and the conversion of its values if any."""
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        python_type = str
+
+    if python_type is bool:
+        return pyarrow.bool_(), None
+    if python_type is int:
+        return pyarrow.int64(), None
+    if python_type is float:
+        return pyarrow.float64(), None
+    if python_type is datetime:
+        return pyarrow.timestamp("us", tz="UTC"), None
+    if python_type in (dict, list):
+        return pyarrow.string(), _json_or_none
+    return pyarrow.string(), _str_or_none
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _json_or_none(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, default=_json_default)
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, UUID):
+        return str(value)
+    return value
@@ -0,0 +1,42 @@
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError
+
+from backend.app.repositories.base import AsyncBaseRepository, Page
+
+MAX_PAGE_SIZE = 1000
+
+
+# SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+
+async def get_page(
+    repository: AsyncBaseRepository, limit: int, cursor: Optional[str], **filters: Any
+) -> Page:
+    """
+    Get a page of a listing endpoint, see `BaseRepository.get_page`.
+
+    Raises:
+        HTTPException: 400 if the limit is out of range, or the cursor or
+            the filters are rejected by the repository; 503 if the query
+            hit the statement timeout.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}"
+        )
+
+    try:
+        return await repository.get_page(limit=limit, cursor=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DBAPIError as e:
+        if getattr(e.orig, "pgcode", None) != QUERY_CANCELED:
+            raise
+
+        await repository.session.rollback()
+        raise HTTPException(
+            status_code=503, detail="Query timed out, narrow down the filters"
+        )
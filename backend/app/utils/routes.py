@@ -0,0 +1,21 @@
+from typing import Optional
+
+from starlette.types import Scope
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """
+    Get the path template of the route that handled a request.
+
+    The router stores the matched route in the ASGI scope, so this is only
+    available once the request went through it (e.g. after the response).
+
+    Args:
+        scope (Scope): The ASGI scope of the request.
+
+    Returns:
+        Optional[str]: The route path template, e.g. '/api/tasks/{task_id}',
+            or None when no route matched.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None)
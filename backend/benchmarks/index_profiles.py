@@ -0,0 +1,134 @@
+"""
+Insert throughput of request_logs under each index profile.
+
+Each profile is measured on a scratch copy of request_logs with the same
+columns and primary key, not partitioned, holding only the indexes of the
+profile. Rows go through the COPY path of the request log writer, in batches
+of the writer's flush size. "legacy" is the one-index-per-column layout that
+preceded the profiles.
+
+Usage (from the repository root, with the database of the settings
+reachable):
+    python -m backend.benchmarks.index_profiles [rows]
+"""
+
+import random
+import sys
+from time import perf_counter
+from typing import List, Sequence
+
+from sqlalchemy import MetaData, Table, text
+
+from backend.app.config import settings
+from backend.app.database.base import get_session, init_database
+from backend.app.database.indexes import (
+    REQUEST_LOG_INDEX_PROFILES,
+    IndexSpec,
+    request_log_indexes,
+)
+from backend.app.database.models.tasks import Task  # noqa: F401
+from backend.app.ingestion.record import RequestLogRecord
+from backend.app.repositories.logs import RequestLogRepository, _log_rows
+from backend.app.utils.database import bulk_insert
+
+BENCH_TABLE = "request_logs_index_bench"
+
+LEGACY_INDEXES = [
+    IndexSpec(f"ix_{column}", (column,))
+    for column in (
+        "relo_id",
+        "relo_inserted_at",
+        "relo_method",
+        "relo_url",
+        "relo_status_code",
+        "relo_ip_address",
+        "relo_request_duration_seconds",
+        "relo_response_size",
+    )
+]
+
+ROUTES = ["/api/misc/hello", "/api/logs/requests", "/api/tasks/{task_id}", None]
+STATUSES = [200] * 90 + [201] * 3 + [404] * 4 + [429] * 2 + [500]
+
+
+def make_records(count: int) -> List[RequestLogRecord]:
+    records = []
+    for n in range(count):
+        route = random.choice(ROUTES)
+        path = route or "/missing"
+        records.append(
+            RequestLogRecord(
+                relo_method=random.choice(("GET", "GET", "GET", "POST")),
+                relo_url=path,
+                relo_headers={"content-length": "0"},
+                relo_status_code=random.choice(STATUSES),
+                relo_body_size=0,
+                relo_ip_address=f"10.0.{random.randrange(256)}.{random.randrange(256)}",
+                relo_device_info="Mozilla/5.0 (X11; Linux x86_64)",
+                relo_absolute_path=f"http://localhost:8000{path}",
+                relo_query_string=f"page={n % 50}",
+                relo_route_id=ROUTES.index(route) + 1 if route else None,
+                relo_request_duration_seconds=random.lognormvariate(-5, 1),
+                relo_response_size=random.randrange(20, 20000),
+            )
+        )
+    return records
+
+
+def measure(
+    database, profile: str, indexes: Sequence[IndexSpec], records, batch_size: int
+):
+    with database.engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        connection.execute(
+            text(f"CREATE TABLE {BENCH_TABLE} (LIKE request_logs INCLUDING DEFAULTS)")
+        )
+        connection.execute(
+            text(
+                f"ALTER TABLE {BENCH_TABLE} ADD PRIMARY KEY (relo_id, relo_inserted_at)"
+            )
+        )
+        for number, index in enumerate(indexes):
+            connection.execute(
+                text(index.create_sql(BENCH_TABLE, f"{BENCH_TABLE}_{number}"))
+            )
+
+    table = Table(BENCH_TABLE, MetaData(), autoload_with=database.engine)
+    columns = RequestLogRepository.COLUMNS
+
+    try:
+        start = perf_counter()
+        with get_session() as session:
+            for offset in range(0, len(records), batch_size):
+                bulk_insert(
+                    session,
+                    table,
+                    ("relo_id", *columns),
+                    _log_rows(records[offset : offset + batch_size], columns, {}),
+                )
+                session.commit()
+        elapsed = perf_counter() - start
+    finally:
+        with database.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+    print(
+        f"{profile:<8} {len(indexes) + 1:3d} indexes "
+        f"{len(records) / elapsed:10.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    database = init_database()
+    records = make_records(rows)
+
+    profiles = {"legacy": LEGACY_INDEXES, **REQUEST_LOG_INDEX_PROFILES}
+    if settings.REQUEST_LOG_CUSTOM_INDEXES:
+        profiles["custom"] = request_log_indexes("custom")
+
+    for profile, indexes in profiles.items():
+        measure(database, profile, indexes, records, settings.LOG_WRITER_FLUSH_SIZE)
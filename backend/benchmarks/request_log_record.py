@@ -0,0 +1,85 @@
+"""
+Per-request cost of building a request log, before and after RequestLogRecord.
+
+The legacy path builds a dict, validates it with RequestLogCreate, dumps it
+back to a dict and builds a RequestLog ORM instance. The new path fills a
+RequestLogRecord in the middleware and turns it into a bulk insert row in the
+writer.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.request_log_record
+"""
+
+import timeit
+import tracemalloc
+from typing import Callable
+
+from backend.app.database.models.logs import RequestLog
+from backend.app.database.models.tasks import Task  # noqa: F401
+from backend.app.ingestion.record import RequestLogRecord
+from backend.app.repositories.logs import RequestLogRepository, _log_rows
+from backend.app.schemas import RequestLogCreate
+
+HEADERS = {
+    "host": "localhost:8000",
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/131.0",
+    "accept": "application/json",
+    "accept-encoding": "gzip, deflate, br",
+    "accept-language": "en-US,en;q=0.5",
+    "connection": "keep-alive",
+}
+
+
+def legacy_path():
+    log_data = {
+        "relo_method": "GET",
+        "relo_url": "http://localhost:8000/api/misc/hello",
+        "relo_body": None,
+        "relo_body_size": 0,
+        "relo_headers": dict(HEADERS),
+        "relo_status_code": 200,
+        "relo_ip_address": "127.0.0.1",
+        "relo_device_info": HEADERS["user-agent"],
+        "relo_absolute_path": "http://localhost:8000/api/misc/hello",
+        "relo_request_duration_seconds": f"{0.001234:.6f}",
+        "relo_response_size": 17,
+    }
+    log = RequestLogCreate(**log_data)
+    return RequestLog(**log.model_dump())
+
+
+def record_path():
+    record = RequestLogRecord(
+        relo_method="GET",
+        relo_url="http://localhost:8000/api/misc/hello",
+        relo_body_size=0,
+        relo_headers=dict(HEADERS),
+        relo_status_code=200,
+        relo_ip_address="127.0.0.1",
+        relo_device_info=HEADERS["user-agent"],
+        relo_absolute_path="http://localhost:8000/api/misc/hello",
+        relo_request_duration_seconds=round(0.001234, 6),
+        relo_response_size=17,
+    )
+    return next(_log_rows([record], RequestLogRepository.COLUMNS, {}))
+
+
+def measure(name: str, build: Callable, number: int = 20000):
+    build()  # Warm up caches and lazy imports
+
+    seconds = min(timeit.repeat(build, number=number, repeat=5)) / number
+
+    tracemalloc.start()
+    kept = [build() for _ in range(1000)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    print(f"{name:<8} {seconds * 1e6:8.2f} us/request {size / 1000:10.0f} B/request")
+    return seconds
+
+
+if __name__ == "__main__":
+    legacy = measure("legacy", legacy_path)
+    record = measure("record", record_path)
+    print(f"speedup  {legacy / record:8.2f}x")
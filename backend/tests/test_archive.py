@@ -0,0 +1,143 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from os import listdir, path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+pytest.importorskip("pyarrow")
+
+from backend.app.utils import archive  # noqa: E402
+from backend.app.utils.archive import (  # noqa: E402
+    read_archive,
+    read_newest,
+    write_archive,
+)
+
+COLUMNS = list(
+    Table(
+        "logs",
+        MetaData(),
+        Column("id", UUID(as_uuid=True)),
+        Column("inserted_at", DateTime(timezone=True)),
+        Column("status", Integer),
+        Column("headers", JSONB),
+    ).columns
+)
+DAY = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def row(minutes: int, status: int = 200, headers=None):
+    return {
+        "id": uuid.UUID(int=minutes),
+        "inserted_at": DAY + timedelta(minutes=minutes),
+        "status": status,
+        "headers": headers,
+    }
+
+
+def write(directory, rows):
+    return write_archive(str(directory), "logs", "inserted_at", COLUMNS, rows)
+
+
+def expected(source):
+    return {**source, "id": str(source["id"])}
+
+
+def test_rows_split_per_utc_day(tmp_path):
+    late = {
+        **row(0),
+        # 23:30 UTC on the first day, although the next day in UTC+2
+        "inserted_at": datetime(2026, 1, 2, 1, 30, tzinfo=timezone(timedelta(hours=2))),
+    }
+    rows = [row(60 * 24 + 5), row(10), late]
+
+    files = write(tmp_path, rows)
+
+    assert [(f.day.isoformat(), f.rows) for f in files] == [
+        ("2026-01-01", 2),
+        ("2026-01-02", 1),
+    ]
+    assert files[0].start == DAY + timedelta(minutes=10)
+    assert files[0].end == late["inserted_at"]
+    assert sorted(listdir(tmp_path / "logs")) == ["day=2026-01-01", "day=2026-01-02"]
+    for archive_file in files:
+        # Written under a temporary name, then renamed
+        assert listdir(path.dirname(archive_file.path)) == [
+            path.basename(archive_file.path)
+        ]
+        assert path.getsize(archive_file.path) == archive_file.size
+
+
+def test_json_columns_round_trip(tmp_path):
+    rows = [row(1, headers={"accept": "*/*", "x-ids": [1, 2]}), row(2)]
+    (archive_file,) = write(tmp_path, rows)
+
+    assert read_archive(archive_file.path, COLUMNS) == [expected(r) for r in rows]
+
+
+def test_read_archive_filters(tmp_path):
+    (archive_file,) = write(tmp_path, [row(1, 200), row(2, 503), row(3, 404)])
+
+    rows = read_archive(archive_file.path, COLUMNS, [("status", ">=", 500)])
+
+    assert rows == [expected(row(2, 503))]
+
+
+def test_rename_failure_leaves_no_archive(tmp_path):
+    with patch.object(archive, "replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            write(tmp_path, [row(1)])
+
+    (folder,) = listdir(tmp_path / "logs")
+    assert all(name.endswith(".tmp") for name in listdir(tmp_path / "logs" / folder))
+
+
+def archive_files(tmp_path):
+    # Two files of the same day, newest first as in the manifest
+    older = write(tmp_path, [row(minutes) for minutes in range(0, 10)])[0]
+    newer = write(tmp_path, [row(minutes) for minutes in range(10, 20)])[0]
+    return [(newer.path, newer.end), (older.path, older.end)]
+
+
+def test_read_newest_pages_across_files(tmp_path):
+    files = archive_files(tmp_path)
+
+    first = read_newest(files, COLUMNS, "inserted_at", "id", 12)
+    last = first[-1]
+    second = read_newest(
+        files,
+        COLUMNS,
+        "inserted_at",
+        "id",
+        12,
+        before=(last["inserted_at"], last["id"]),
+    )
+
+    assert [r["id"] for r in first] == [str(row(m)["id"]) for m in range(19, 7, -1)]
+    assert [r["id"] for r in second] == [str(row(m)["id"]) for m in range(7, -1, -1)]
+
+
+def test_read_newest_cursor_breaks_ties_on_id(tmp_path):
+    moment = DAY + timedelta(minutes=5)
+    rows = [{**row(i), "inserted_at": moment} for i in range(3)]
+    (archive_file,) = write(tmp_path, rows)
+    files = [(archive_file.path, archive_file.end)]
+
+    page = read_newest(
+        files, COLUMNS, "inserted_at", "id", 10, before=(moment, str(row(2)["id"]))
+    )
+
+    assert [r["id"] for r in page] == [str(row(1)["id"]), str(row(0)["id"])]
+
+
+def test_read_newest_stops_before_older_files(tmp_path):
+    files = archive_files(tmp_path)
+
+    with patch.object(archive, "read_archive", wraps=read_archive) as reader:
+        rows = read_newest(files, COLUMNS, "inserted_at", "id", 5)
+
+    assert len(rows) == 5
+    assert reader.call_count == 1
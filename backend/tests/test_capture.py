@@ -0,0 +1,94 @@
+from hashlib import blake2b
+
+from backend.app.ingestion.capture import BodyCapture, BodyCapturePolicy
+
+
+def digest(body: bytes) -> str:
+    return blake2b(body, digest_size=16).hexdigest()
+
+
+def test_body_within_limit_is_stored():
+    capture = BodyCapture(10)
+    capture.feed(b"hello ")
+    capture.feed(b"you")
+
+    assert capture.result() == ("hello you", 9, None)
+
+
+def test_body_over_limit_keeps_size_and_digest():
+    capture = BodyCapture(4)
+    capture.feed(b"hello ")
+    capture.feed(b"world")
+
+    assert len(capture.buffer) == 4
+    assert capture.result() == (None, 11, digest(b"hello world"))
+
+
+def test_empty_body():
+    capture = BodyCapture(10)
+    capture.feed(b"")
+
+    assert capture.result() == (None, 0, None)
+
+
+def test_body_with_nul_is_only_hashed():
+    capture = BodyCapture(10)
+    capture.feed(b"a\x00b")
+
+    assert capture.result() == (None, 3, digest(b"a\x00b"))
+
+
+def test_invalid_utf8_is_replaced():
+    capture = BodyCapture(10)
+    capture.feed(b"caf\xe9")
+
+    assert capture.result() == ("caf�", 4, None)
+
+
+def test_disabled_digest():
+    capture = BodyCapture(0, digest=False)
+    capture.feed(b"hello")
+
+    assert capture.result() == (None, 5, None)
+
+
+def test_zero_limit_keeps_digest():
+    policy = BodyCapturePolicy(max_request_bytes=100, max_response_bytes=0)
+    capture = policy.response_capture("/api/items", "application/json")
+    capture.feed(b"[]")
+
+    assert capture.result() == (None, 2, digest(b"[]"))
+
+
+def test_content_type_lists():
+    policy = BodyCapturePolicy(
+        max_request_bytes=100,
+        max_response_bytes=100,
+        allowlist=["text/*", "application/json"],
+        denylist=["text/csv"],
+    )
+
+    assert policy.allows("application/json; charset=utf-8")
+    assert policy.allows("TEXT/plain")
+    assert not policy.allows("text/csv")
+    assert not policy.allows("image/png")
+    assert not policy.allows(None)
+
+    capture = policy.request_capture("/upload", "image/png")
+    capture.feed(b"\x89PNG")
+    assert capture.result() == (None, 4, digest(b"\x89PNG"))
+
+
+def test_longest_route_override_wins():
+    policy = BodyCapturePolicy(
+        max_request_bytes=100,
+        max_response_bytes=100,
+        route_overrides={
+            "/api": {"max_request_bytes": 10},
+            "/api/upload": {"max_request_bytes": 0},
+        },
+    )
+
+    assert policy.request_capture("/api/items", None).limit == 10
+    assert policy.request_capture("/api/upload/file", None).limit == 0
+    assert policy.response_capture("/api/upload/file", None).limit == 100
@@ -0,0 +1,110 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+import backend.app.database.models.tasks  # noqa: F401
+from backend.app.database.models.logs import RequestLog
+from backend.app.repositories.logs import RequestLogRepository
+from backend.app.repositories.tasks import TaskRepository
+
+INSERTED_AT = datetime(2026, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+IDS = [uuid.UUID(int=i) for i in range(5)]
+
+
+def encode(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    repository = RequestLogRepository(MagicMock())
+    log = SimpleNamespace(relo_inserted_at=INSERTED_AT, relo_id=IDS[4])
+
+    cursor = repository._encode_cursor(log)
+
+    assert "=" not in cursor
+    assert repository._decode_cursor(cursor) == [INSERTED_AT, IDS[4]]
+
+
+def test_cursor_of_a_mapping():
+    repository = RequestLogRepository(MagicMock())
+    row = {"relo_inserted_at": INSERTED_AT, "relo_id": IDS[4], "relo_url": "/"}
+
+    cursor = repository._encode_cursor(row)
+
+    assert repository._decode_cursor(cursor) == [INSERTED_AT, IDS[4]]
+
+
+def test_task_cursor_round_trip():
+    repository = TaskRepository(MagicMock())
+    task_id = uuid.uuid4()
+    task = SimpleNamespace(task_created_at=INSERTED_AT, task_id=task_id)
+
+    cursor = repository._encode_cursor(task)
+
+    assert repository._decode_cursor(cursor) == [INSERTED_AT, task_id]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        encode({"relo_id": 1}),
+        encode([INSERTED_AT.isoformat()]),
+        encode([INSERTED_AT.isoformat(), "1", "2"]),
+        encode(["yesterday", "1"]),
+        encode([INSERTED_AT.isoformat(), "one"]),
+        encode([None, "1"]),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    repository = RequestLogRepository(MagicMock())
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        repository._decode_cursor(cursor)
+
+
+def test_paginate_seeks_after_cursor():
+    session = MagicMock()
+    logs = [
+        SimpleNamespace(relo_inserted_at=INSERTED_AT, relo_id=IDS[i]) for i in (3, 2, 1)
+    ]
+    session.execute.return_value.all.return_value = [(log,) for log in logs]
+    repository = RequestLogRepository(session)
+    cursor = repository._encode_cursor(
+        SimpleNamespace(relo_inserted_at=INSERTED_AT, relo_id=IDS[4])
+    )
+
+    page = repository.paginate(select(RequestLog), 2, cursor)
+
+    assert page.items == logs[:2]
+    assert repository._decode_cursor(page.next_cursor) == [INSERTED_AT, IDS[2]]
+
+    (query,), _ = session.execute.call_args
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert (
+        "(request_logs.relo_inserted_at, request_logs.relo_id) < "
+        "(%(param_1)s, %(param_2)s::UUID)" in sql
+    )
+    assert (
+        "ORDER BY request_logs.relo_inserted_at DESC, request_logs.relo_id DESC" in sql
+    )
+    assert "LIMIT %(param_3)s" in sql
+
+
+def test_last_page_has_no_cursor():
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        (SimpleNamespace(relo_inserted_at=INSERTED_AT, relo_id=IDS[1]),)
+    ]
+
+    page = RequestLogRepository(session).paginate(select(RequestLog), 2)
+
+    assert page.next_cursor is None
@@ -0,0 +1,15 @@
+from unittest.mock import patch
+
+from backend.app.database import base
+
+
+def test_init_database_creates_one_database_per_process():
+    with patch.object(base, "database", None), patch.object(
+        base, "Database"
+    ) as database_class:
+        first = base.init_database()
+        second = base.init_database()
+
+        assert first is second
+        database_class.assert_called_once()
+        first.init.assert_called_once()
@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import Boolean, DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from backend.app.utils.export import ParquetEncoder, _CsvEncoder, _NdjsonEncoder
+
+NAMES = ["id", "inserted_at", "status", "duration", "cached", "url", "headers"]
+TYPES = [
+    UUID(as_uuid=True),
+    DateTime(timezone=True),
+    Integer(),
+    Float(),
+    Boolean(),
+    String(),
+    JSONB(),
+]
+ID = uuid.UUID("12345678-1234-5678-1234-567812345678")
+INSERTED_AT = datetime(2026, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+ROWS = [
+    (ID, INSERTED_AT, 200, 0.25, True, "/items?a=1,b", {"accept": "*/*"}),
+    (uuid.UUID(int=0), None, None, None, None, None, None),
+]
+
+
+def encode(encoder_class, batches):
+    encoder = encoder_class(NAMES, TYPES)
+    return (
+        encoder.start()
+        + b"".join(encoder.encode(batch) for batch in batches)
+        + encoder.finish()
+    )
+
+
+def test_ndjson_encoding():
+    lines = encode(_NdjsonEncoder, [ROWS[:1], ROWS[1:]]).decode().splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {
+            "id": str(ID),
+            "inserted_at": "2026-01-01T12:30:15.123456+00:00",
+            "status": 200,
+            "duration": 0.25,
+            "cached": True,
+            "url": "/items?a=1,b",
+            "headers": {"accept": "*/*"},
+        },
+        {
+            "id": "00000000-0000-0000-0000-000000000000",
+            "inserted_at": None,
+            "status": None,
+            "duration": None,
+            "cached": None,
+            "url": None,
+            "headers": None,
+        },
+    ]
+
+
+def test_csv_encoding():
+    data = encode(_CsvEncoder, [ROWS[:1], ROWS[1:]]).decode()
+
+    assert list(csv.reader(io.StringIO(data))) == [
+        NAMES,
+        [
+            str(ID),
+            "2026-01-01T12:30:15.123456+00:00",
+            "200",
+            "0.25",
+            "True",
+            "/items?a=1,b",
+            '{"accept": "*/*"}',
+        ],
+        ["00000000-0000-0000-0000-000000000000", "", "", "", "", "", ""],
+    ]
+
+
+def test_parquet_encoding():
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    data = encode(ParquetEncoder, [ROWS[:1], ROWS[1:]])
+    parquet_file = parquet.ParquetFile(pyarrow.BufferReader(data))
+
+    # One row group per batch
+    assert parquet_file.metadata.num_row_groups == 2
+    assert parquet_file.schema_arrow.field("inserted_at").type == pyarrow.timestamp(
+        "us", tz="UTC"
+    )
+    assert parquet_file.read().to_pylist() == [
+        {
+            "id": str(ID),
+            "inserted_at": INSERTED_AT,
+            "status": 200,
+            "duration": 0.25,
+            "cached": True,
+            "url": "/items?a=1,b",
+            "headers": '{"accept": "*/*"}',
+        },
+        {
+            "id": "00000000-0000-0000-0000-000000000000",
+            "inserted_at": None,
+            "status": None,
+            "duration": None,
+            "cached": None,
+            "url": None,
+            "headers": None,
+        },
+    ]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+import backend.app.database.models.logs  # noqa: F401
+import backend.app.database.models.tasks  # noqa: F401
+from backend.app.repositories.logs import RequestLogRepository
+
+END = datetime(2026, 1, 1, tzinfo=timezone.utc)
+START = END - timedelta(hours=1)
+
+
+def compiled(session: MagicMock) -> str:
+    (query,), _ = session.execute.call_args
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_latency_percentiles_per_route():
+    session = MagicMock()
+    session.execute.return_value = [
+        ("/items/{id}", 10, [0.01, 0.05, 0.2], 0.3),
+        (None, 2, [1.0, 1.5, 1.9], 2.0),
+    ]
+
+    percentiles = RequestLogRepository(session).get_latency_percentiles(START, END)
+
+    assert percentiles == [
+        {
+            "route": "/items/{id}",
+            "count": 10,
+            "p50": 0.01,
+            "p90": 0.05,
+            "p99": 0.2,
+            "max": 0.3,
+        },
+        {"route": None, "count": 2, "p50": 1.0, "p90": 1.5, "p99": 1.9, "max": 2.0},
+    ]
+
+    sql = compiled(session)
+    # All the percentiles of a route come from one sort of its durations
+    assert sql.count("percentile_cont") == 1
+    assert "WITHIN GROUP (ORDER BY request_logs.relo_request_duration_seconds)" in sql
+    assert "GROUP BY request_logs.relo_route_id" in sql
+    assert "routes.rout_template =" not in sql
+
+
+def test_latency_percentiles_of_one_route():
+    session = MagicMock()
+    session.execute.return_value = []
+
+    percentiles = RequestLogRepository(session).get_latency_percentiles(
+        START, END, route="/items/{id}"
+    )
+
+    assert percentiles == []
+    assert "routes.rout_template =" in compiled(session)
@@ -0,0 +1,90 @@
+import json
+from os import listdir, utime
+from time import time
+from unittest.mock import patch
+
+from backend.app.metrics import MetricsRegistry
+
+
+def make_registry(directory=None) -> MetricsRegistry:
+    registry = MetricsRegistry(str(directory) if directory else None)
+    registry.histogram(
+        "request_seconds", "Time spent.", (0.1, 1), label_names=("route",)
+    )
+    return registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = make_registry()
+    histogram = registry.histograms["request_seconds"]
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "/items")
+
+    assert registry.render() == (
+        "# HELP request_seconds Time spent.\n"
+        "# TYPE request_seconds histogram\n"
+        'request_seconds_bucket{route="/items",le="0.1"} 2\n'
+        'request_seconds_bucket{route="/items",le="1"} 3\n'
+        'request_seconds_bucket{route="/items",le="+Inf"} 4\n'
+        'request_seconds_sum{route="/items"} 2.65\n'
+        'request_seconds_count{route="/items"} 4\n'
+    )
+
+
+def test_label_values_are_escaped():
+    registry = make_registry()
+    registry.histograms["request_seconds"].observe(0.5, 'a"b\\c')
+
+    assert 'route="a\\"b\\\\c",le="1"' in registry.render()
+
+
+def test_gauges_and_counters():
+    registry = MetricsRegistry()
+    registry.gauge("pool_size", "Connections.", lambda: 5, labels={"pool": "api"})
+    registry.gauge("pool_size", "Connections.", lambda: 2, labels={"pool": "writer"})
+    registry.counter("written_total", "Rows written.", lambda: 10)
+    registry.counter("broken_total", "Raises.", lambda: 1 / 0)
+
+    assert registry.render() == (
+        "# HELP pool_size Connections.\n"
+        "# TYPE pool_size gauge\n"
+        'pool_size{pool="api"} 5.0\n'
+        'pool_size{pool="writer"} 2.0\n'
+        "# HELP written_total Rows written.\n"
+        "# TYPE written_total counter\n"
+        "written_total 10.0\n"
+    )
+
+
+def test_snapshots_of_workers_are_merged(tmp_path):
+    first, second = make_registry(tmp_path), make_registry(tmp_path)
+    first.counter("written_total", "Rows written.", lambda: 10)
+    second.counter("written_total", "Rows written.", lambda: 5)
+    first.histograms["request_seconds"].observe(0.05, "/items")
+    second.histograms["request_seconds"].observe(0.5, "/items")
+    second.histograms["request_seconds"].observe(0.5, "/users")
+
+    with patch("backend.app.metrics.getpid", return_value=2):
+        second.sync()
+    with patch("backend.app.metrics.getpid", return_value=1):
+        rendered = first.render()
+
+    assert sorted(listdir(tmp_path)) == ["1.json", "2.json"]
+    assert 'request_seconds_bucket{route="/items",le="0.1"} 1\n' in rendered
+    assert 'request_seconds_bucket{route="/items",le="1"} 2\n' in rendered
+    assert 'request_seconds_sum{route="/items"} 0.55\n' in rendered
+    assert 'request_seconds_count{route="/users"} 1\n' in rendered
+    assert "written_total 15.0\n" in rendered
+
+
+def test_stale_and_broken_snapshots_are_left_out(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.counter("written_total", "Rows written.", lambda: 10)
+
+    stale = tmp_path / "2.json"
+    stale.write_text(json.dumps({"histograms": {}, "values": {"written_total": 100.0}}))
+    utime(stale, (time() - 120, time() - 120))
+    (tmp_path / "3.json").write_text("{not json")
+
+    with patch("backend.app.metrics.getpid", return_value=1):
+        assert "written_total 10.0\n" in registry.render()
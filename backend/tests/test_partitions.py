@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.utils.database import Partition, find_row_cutoff, get_partitions
+
+
+def test_partitions_ordered_by_lower_bound_default_last():
+    session = MagicMock()
+    session.execute.return_value = [
+        ("request_logs_default", "DEFAULT"),
+        (
+            "request_logs_p20261019",
+            "FOR VALUES FROM ('2026-10-19 00:00:00+00') TO ('2026-10-20 00:00:00+00')",
+        ),
+        (
+            "request_logs_legacy",
+            "FOR VALUES FROM (MINVALUE) TO ('2026-10-19 00:00:00+00')",
+        ),
+    ]
+    boundary = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+    assert get_partitions(session, "request_logs") == [
+        Partition("request_logs_legacy", None, boundary, False),
+        Partition(
+            "request_logs_p20261019",
+            boundary,
+            datetime(2026, 10, 20, tzinfo=timezone.utc),
+            False,
+        ),
+        Partition("request_logs_default", None, None, True),
+    ]
+
+
+def cutoff_session(estimates, partitions):
+    session = MagicMock()
+    session.execute.side_effect = [
+        MagicMock(all=MagicMock(return_value=list(estimates.items()))),
+        partitions,
+    ]
+    session.get_bind.return_value.dialect = postgresql.dialect()
+    return session
+
+
+def seek(session):
+    (statement, parameters), _ = session.scalar.call_args
+    return str(statement), parameters["offset"]
+
+
+PARTITIONS = [
+    ("request_logs_default", "DEFAULT"),
+    (
+        "request_logs_p20261019",
+        "FOR VALUES FROM ('2026-10-19 00:00:00+00') TO ('2026-10-20 00:00:00+00')",
+    ),
+    ("request_logs_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-10-19 00:00:00+00')"),
+]
+
+
+def test_cutoff_seeks_in_boundary_partition_only():
+    session = cutoff_session(
+        {
+            "request_logs_legacy": 1000,
+            "request_logs_p20261019": 500,
+            "request_logs_default": 10,
+        },
+        PARTITIONS,
+    )
+
+    find_row_cutoff(session, "request_logs", "relo_inserted_at", 1200)
+
+    assert seek(session) == (
+        "SELECT relo_inserted_at FROM request_logs_p20261019 "
+        "ORDER BY relo_inserted_at OFFSET :offset LIMIT 1",
+        200,
+    )
+
+
+def test_cutoff_in_first_partition():
+    session = cutoff_session(
+        {"request_logs_legacy": 1000, "request_logs_p20261019": 500}, PARTITIONS
+    )
+
+    find_row_cutoff(session, "request_logs", "relo_inserted_at", 999)
+
+    assert seek(session)[1] == 999
+    assert "FROM request_logs_legacy " in seek(session)[0]
+
+
+def test_cutoff_past_estimates_seeks_in_newest_partition():
+    session = cutoff_session({"request_logs_legacy": 1000}, PARTITIONS)
+
+    find_row_cutoff(session, "request_logs", "relo_inserted_at", 1005)
+
+    assert seek(session) == (
+        "SELECT relo_inserted_at FROM request_logs_default "
+        "ORDER BY relo_inserted_at OFFSET :offset LIMIT 1",
+        5,
+    )
+
+
+def test_cutoff_of_unpartitioned_table():
+    session = cutoff_session({"task_logs": 300}, [])
+
+    find_row_cutoff(session, "task_logs", "talo_inserted_at", 120)
+
+    assert seek(session) == (
+        "SELECT talo_inserted_at FROM task_logs "
+        "ORDER BY talo_inserted_at OFFSET :offset LIMIT 1",
+        120,
+    )
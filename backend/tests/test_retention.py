@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+
+import backend.app.database.models.logs  # noqa: F401
+import backend.app.database.models.tasks  # noqa: F401
+from backend.app.database.retention import RetentionPolicy, compile_policies
+from backend.app.repositories.logs import RequestLogRepository, _delete_expired
+from backend.app.utils.database import DeletionProgress, Partition
+
+CUTOFF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+DONE = DeletionProgress(0, 0, 0.0, None, True)
+
+
+def saved_watermark(session: MagicMock):
+    (statement,), _ = session.execute.call_args
+    return statement.compile(dialect=postgresql.dialect()).params["jowa_value"]
+
+
+def delete_expired(session: MagicMock, deletion: DeletionProgress):
+    with patch(
+        "backend.app.repositories.logs.delete_in_batches", return_value=deletion
+    ) as delete:
+        _delete_expired(
+            session, "request_logs_p1", "relo_inserted_at", CUTOFF, 100, 0, None, None
+        )
+    return delete
+
+
+def test_completed_run_keeps_its_cutoff():
+    session = MagicMock()
+    session.scalar.return_value = None
+
+    delete_expired(session, DONE._replace(position=CUTOFF - timedelta(hours=1)))
+
+    assert saved_watermark(session) == CUTOFF
+
+
+def test_next_run_starts_from_last_cutoff():
+    session = MagicMock()
+    session.scalar.return_value = CUTOFF - timedelta(days=1)
+    position = CUTOFF - timedelta(hours=12)
+
+    delete = delete_expired(session, DONE._replace(position=position, completed=False))
+
+    (_, _, _, _, start, *_), _ = delete.call_args
+    assert start == CUTOFF - timedelta(days=1)
+    assert saved_watermark(session) == position
+
+
+def test_watermark_past_cutoff_is_ignored():
+    session = MagicMock()
+    session.scalar.return_value = CUTOFF + timedelta(days=1)
+
+    delete = delete_expired(session, DONE)
+
+    (_, _, _, _, start, *_), _ = delete.call_args
+    assert start is None
+
+
+def test_policies_skip_partitions_done_by_previous_runs():
+    now = datetime.now(timezone.utc)
+
+    def partition(name: str, days: int) -> Partition:
+        return Partition(
+            name, now - timedelta(days=days), now - timedelta(days=days - 1), False
+        )
+
+    partitions = [
+        partition("p60", 60),
+        partition("p32", 32),
+        partition("p1", 1),
+        Partition("default", None, None, True),
+    ]
+    session = MagicMock()
+    session.get_bind.return_value.dialect = postgresql.dialect()
+    session.execute.return_value.all.return_value = [
+        ("retention:p60.relo_inserted_at:errors", now - timedelta(days=40)),
+        ("retention:p32.relo_inserted_at:other", now - timedelta(days=20)),
+    ]
+
+    with patch.object(
+        RequestLogRepository,
+        "_delete_before",
+        return_value={"dropped_partitions": [], **DONE.as_dict()},
+    ), patch(
+        "backend.app.repositories.logs.get_partitions", return_value=partitions
+    ), patch(
+        "backend.app.repositories.logs._delete_expired", return_value=DONE
+    ) as delete:
+        RequestLogRepository(session).apply_retention(
+            timedelta(days=90),
+            [RetentionPolicy("errors", timedelta(days=30), status_class=5)],
+        )
+
+    # p1 is within the 30 days of the policy, p60 was done up to its end
+    assert [args[1] for args, _ in delete.call_args_list] == ["p32", "default"]
+
+
+ROUTE_IDS = {"/health": 1, "/items": 2}
+POLICIES = [
+    RetentionPolicy("errors", timedelta(days=90), status_class=5),
+    RetentionPolicy("slow", timedelta(days=30), min_duration=1.0),
+    RetentionPolicy("health", timedelta(days=1), route="/health"),
+    RetentionPolicy(
+        "health_errors", timedelta(days=7), status_class=5, route="/health"
+    ),
+    RetentionPolicy("ghost", timedelta(days=365), route="/missing"),
+]
+# status code, duration, route id, and the rule expected to expire the row
+ROWS = [
+    (500, 0.1, 2, "errors"),
+    (200, 2.0, 2, "slow"),
+    (503, 2.0, 2, "errors"),  # The longest of the matching policies
+    (200, 0.1, 2, "default"),
+    (200, 2.0, 1, "health"),  # Routes override the other policies
+    (503, 2.0, 1, "health_errors"),
+    (None, 2.0, 2, "slow"),
+    (None, None, None, "default"),
+    (500, None, None, "errors"),
+]
+
+
+def rule_rows(rules) -> dict:
+    """The ids of the ROWS each rule expires, evaluated by SQLite."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE logs (id INTEGER, relo_status_code INTEGER, "
+                "relo_request_duration_seconds REAL, relo_route_id INTEGER)"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO logs VALUES (:id, :status, :duration, :route)"),
+            [
+                {"id": index, "status": status, "duration": duration, "route": route}
+                for index, (status, duration, route, _) in enumerate(ROWS)
+            ],
+        )
+        return {
+            rule.policy.name: connection.execute(
+                text(f"SELECT id FROM logs WHERE {rule.sql(engine.dialect) or 1}")
+            )
+            .scalars()
+            .all()
+            for rule in rules
+        }
+
+
+def test_every_row_falls_under_one_rule():
+    rules = compile_policies(timedelta(days=14), POLICIES, ROUTE_IDS)
+
+    assert [(rule.policy.name, rule.policy.age.days) for rule in rules] == [
+        ("health", 1),
+        ("health_errors", 7),
+        ("default", 14),
+        ("slow", 30),
+        ("errors", 90),
+    ]
+    expected = {rule.policy.name: [] for rule in rules}
+    for index, (*_, name) in enumerate(ROWS):
+        expected[name].append(index)
+    assert rule_rows(rules) == expected
+
+
+def test_without_policies_default_expires_every_row():
+    (rule,) = compile_policies(timedelta(days=14), [], ROUTE_IDS)
+
+    assert rule.policy.name == "default"
+    assert rule.condition is None
+    assert rule_rows([rule]) == {"default": list(range(len(ROWS)))}
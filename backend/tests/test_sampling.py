@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.ingestion import sampling
+from backend.app.ingestion.sampling import RequestLogSampler, SamplingRule
+
+RULES = [
+    {"route": "/api/health", "rate": 0},
+    {"status_class": 5, "rate": 1},
+    {"min_duration": 1.0, "rate": 1},
+    {"route": "/api/items/*", "methods": ["get"], "rate": 0.25},
+]
+
+
+def test_tail_keeps_errors_and_slow_requests():
+    sampler = RequestLogSampler(RULES, default_rate=0)
+
+    assert sampler.tail("GET", "/api/other", 503, 0.01) == 1.0
+    assert sampler.tail("GET", "/api/other", 200, 2.5) == 1.0
+    assert sampler.tail("GET", "/api/other", 200, 0.01) is None
+
+
+def test_first_matching_rule_wins():
+    sampler = RequestLogSampler(RULES, default_rate=1)
+
+    # The health rule comes before the 5xx rule
+    assert sampler.tail("GET", "/api/health", 503, 0.01) is None
+
+
+def test_partial_rate_weights_kept_rows():
+    sampler = RequestLogSampler(RULES, default_rate=1)
+
+    with patch.object(sampling, "random", return_value=0.1):
+        assert sampler.tail("GET", "/api/items/{id}", 200, 0.01) == 4.0
+    with patch.object(sampling, "random", return_value=0.5):
+        assert sampler.tail("GET", "/api/items/{id}", 200, 0.01) is None
+
+    # The method does not match: default rate
+    assert sampler.tail("POST", "/api/items/{id}", 200, 0.01) == 1.0
+
+
+def test_head_mode_ignores_tail_rules():
+    sampler = RequestLogSampler(RULES, default_rate=1, mode="head")
+
+    assert all(not rule.is_tail for rule in sampler.rules)
+    assert sampler.head("GET", "/api/health") is None
+    assert sampler.head("GET", "/api/other") == 1.0
+    # The head decision stands once the response is known
+    assert sampler.tail("GET", "/api/other", 500, 0.01, head_weight=4.0) == 4.0
+
+
+def test_tail_mode_logs_every_request_head():
+    sampler = RequestLogSampler(RULES, default_rate=0)
+
+    assert sampler.head("GET", "/api/health") == 1.0
+
+
+def test_candidate_cache_is_bounded():
+    sampler = RequestLogSampler(RULES)
+    sampler.MAX_CACHED_KEYS = 2
+
+    for index in range(5):
+        sampler.tail("GET", f"/raw/{index}", 200, 0.01)
+
+    assert len(sampler._candidates) <= 2
+
+
+def test_invalid_rules():
+    with pytest.raises(ValueError):
+        SamplingRule.from_dict({"rate": 2})
+    with pytest.raises(ValueError):
+        SamplingRule.from_dict({"path": "/api"})
+    with pytest.raises(ValueError):
+        RequestLogSampler([], mode="sideways")
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from backend.app.ingestion.sketch import SKETCH_MAX_VALUE, LatencySketch
+
+
+def exact_quantile(values, quantile):
+    ordered = sorted(values)
+    return ordered[int(quantile * (len(ordered) - 1))]
+
+
+def durations(count, seed=0):
+    generator = random.Random(seed)
+    return [generator.lognormvariate(-3, 1.5) for _ in range(count)]
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_quantiles_within_relative_accuracy(relative_accuracy):
+    values = durations(10000)
+    sketch = LatencySketch(relative_accuracy)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    for quantile in (0.0, 0.5, 0.9, 0.99, 1.0):
+        exact = exact_quantile(values, quantile)
+        estimate = sketch.quantile(quantile)
+        assert abs(estimate - exact) <= relative_accuracy * exact
+
+
+def test_empty_sketch_has_no_quantile():
+    assert LatencySketch().quantile(0.5) is None
+
+
+def test_out_of_range_values_are_clamped():
+    sketch = LatencySketch()
+    sketch.add(0.0)
+    sketch.add(SKETCH_MAX_VALUE * 10)
+
+    assert sketch.count == 2
+    assert sketch.quantile(0.0) > 0
+    assert sketch.quantile(1.0) == pytest.approx(SKETCH_MAX_VALUE, rel=0.01)
+
+
+def test_merge_equals_sketch_of_all_values():
+    first_values, second_values = durations(5000, seed=1), durations(5000, seed=2)
+    first, second, combined = LatencySketch(), LatencySketch(), LatencySketch()
+    for value in first_values:
+        first.add(value)
+        combined.add(value)
+    for value in second_values:
+        second.add(value)
+        combined.add(value)
+
+    first.merge(second)
+
+    assert first.counts == combined.counts
+
+
+def test_merge_another_accuracy():
+    values = durations(5000)
+    coarse = LatencySketch(0.05)
+    for value in values:
+        coarse.add(value)
+
+    sketch = LatencySketch(0.01)
+    sketch.merge(coarse)
+
+    assert sketch.count == len(values)
+    # Re-binned values keep the error of the coarser sketch, plus the finer one
+    exact = exact_quantile(values, 0.9)
+    assert abs(sketch.quantile(0.9) - exact) <= 0.061 * exact
+
+
+def test_bytes_round_trip():
+    sketch = LatencySketch()
+    for value in durations(1000):
+        sketch.add(value)
+
+    restored = LatencySketch.from_bytes(sketch.to_bytes())
+
+    assert restored.relative_accuracy == sketch.relative_accuracy
+    assert restored.counts == sketch.counts
+    assert len(sketch.to_bytes()) < len(sketch.counts) * 4
+
+
+def test_invalid_relative_accuracy():
+    with pytest.raises(ValueError):
+        LatencySketch(0)
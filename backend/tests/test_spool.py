@@ -0,0 +1,115 @@
+from os import listdir
+
+import pytest
+
+from backend.app.ingestion.spool import RECORD_HEADER, Spool
+
+
+def make_spool(directory, **kwargs) -> Spool:
+    options = {"segment_size": 1024, "max_disk_usage": 64 * 1024}
+    options.update(kwargs)
+    spool = Spool(str(directory), **options)
+    spool.open()
+    return spool
+
+
+def records(count: int, start: int = 0):
+    return [{"relo_id": i, "relo_path": f"/items/{i}"} for i in range(start, count)]
+
+
+def test_append_rotate_read_round_trip(tmp_path):
+    spool = make_spool(tmp_path)
+
+    assert spool.append(records(3)) == 3
+    assert spool.sealed_segments() == []
+    assert spool.depth == 3
+
+    spool.rotate()
+    (segment,) = spool.sealed_segments()
+    assert list(spool.read_segment(segment)) == records(3)
+
+    spool.remove_segment(segment)
+    assert spool.depth == 0
+    assert spool.disk_usage == 0
+    assert spool.replayed == 3
+    assert listdir(tmp_path) == []
+
+
+def test_segments_rotate_at_segment_size(tmp_path):
+    spool = make_spool(tmp_path, segment_size=200)
+
+    spool.append(records(10))
+    spool.rotate()
+
+    segments = spool.sealed_segments()
+    assert len(segments) > 1
+    assert [r for s in segments for r in spool.read_segment(s)] == records(10)
+
+
+def test_disk_cap_rejects_records(tmp_path):
+    record_size = RECORD_HEADER.size + len(b'{"relo_id": 0, "relo_path": "/items/0"}')
+    spool = make_spool(tmp_path, max_disk_usage=record_size * 2)
+
+    assert spool.append(records(5)) == 2
+    assert spool.rejected == 3
+    assert spool.disk_usage <= spool.max_disk_usage
+
+
+def test_open_recovers_sealed_segments(tmp_path):
+    spool = make_spool(tmp_path)
+    spool.append(records(4))
+    spool.close()
+
+    recovered = make_spool(tmp_path)
+    assert recovered.depth == 4
+    assert recovered.disk_usage == spool.disk_usage
+
+    # New segments do not overwrite the recovered ones
+    recovered.append(records(6, start=4))
+    recovered.rotate()
+    assert [
+        r for s in recovered.sealed_segments() for r in recovered.read_segment(s)
+    ] == records(6)
+
+
+def test_truncated_record_ends_segment(tmp_path):
+    spool = make_spool(tmp_path)
+    spool.append(records(2))
+    spool.rotate()
+    (segment,) = spool.sealed_segments()
+
+    with open(segment, "ab") as segment_file:
+        segment_file.write(RECORD_HEADER.pack(100) + b'{"relo_id"')
+
+    assert list(spool.read_segment(segment)) == records(2)
+
+
+def test_quarantine_sets_segment_aside(tmp_path):
+    spool = make_spool(tmp_path)
+    spool.append(records(2))
+    spool.rotate()
+    (segment,) = spool.sealed_segments()
+
+    quarantined = spool.quarantine(segment)
+
+    assert spool.sealed_segments() == []
+    assert spool.depth == 0
+    assert spool.quarantined == 2
+    assert list(spool.read_segment(quarantined)) == records(2)
+    assert make_spool(tmp_path).depth == 0
+
+
+def test_flush_writes_buffered_tail(tmp_path):
+    spool = make_spool(tmp_path, fsync_interval=3600)
+    spool.append(records(1))  # Within the interval of the initial fsync
+    (segment,) = listdir(tmp_path)
+    assert list(spool.read_segment(str(tmp_path / segment))) == []
+
+    spool.flush()
+
+    assert list(spool.read_segment(str(tmp_path / segment))) == records(1)
+
+
+def test_invalid_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        Spool(str(tmp_path), 1024, 1024, fsync_policy="sometimes")